@@ -5,7 +5,15 @@ import secrets
 from datetime import timedelta
 from backend.api.auth import auth_bp
 from backend.api.learning import learning_bp
-from backend.config.config import CORS_CONFIG
+from backend.api.admin import admin_bp
+from backend.api import metrics
+from backend.config.config import CORS_CONFIG, LEADERBOARD_CONFIG, SEARCH_CONFIG
+from backend.database import database, query_stats
+from backend.cli import register_commands
+from backend.business_layer import container
+from backend.utils import profiler
+from backend.utils.exceptions import DatabaseError
+from backend.utils.logger import logger
 
 def create_app():
     app = Flask(__name__)
@@ -26,9 +34,41 @@ def create_app():
          expose_headers=CORS_CONFIG['expose_headers'],
          methods=CORS_CONFIG['methods'])
     
+    # Mỗi request mượn một connection từ pool và trả lại khi kết thúc
+    database.init_app(app)
+    
+    # Đếm số câu lệnh SQL và thời gian DB cho một phần các request, ghi log câu lệnh chậm
+    query_stats.init_app(app)
+    
+    # Số liệu Prometheus (số request, độ trễ, kích thước, pool, cache) tại /metrics
+    metrics.init_app(app)
+    
+    # Profile request theo header X-Profile có chữ ký hoặc theo tỉ lệ lấy mẫu (tắt mặc định)
+    profiler.init_app(app)
+    
+    # DAO và service được tạo một lần cho mỗi app, khi dùng lần đầu
+    services = container.init_app(app)
+    
     # Đăng ký blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(learning_bp, url_prefix='/api/learning')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    
+    # Lệnh bảo trì: flask rebuild-stats, flask rebuild-leaderboards,
+    # flask verify-leaderboards, flask import-content, flask profile-token
+    register_commands(app)
+    
+    # Nạp sẵn bảng xếp hạng vào bộ nhớ; nếu lỗi, từng topic sẽ được nạp khi dùng lần đầu
+    if LEADERBOARD_CONFIG['preload_index']:
+        try:
+            services.leaderboard_dao.rebuild_index()
+        except DatabaseError as e:
+            logger.warning("Could not preload leaderboard index: %s", e)
+    
+    # Nạp sẵn chỉ mục tìm kiếm từ vựng ở luồng nền để khởi động không phải chờ;
+    # nếu lỗi, sẽ được nạp ở lần tìm kiếm đầu tiên
+    if SEARCH_CONFIG['preload_index']:
+        services.vocabulary_dao.refresh_search_index()
     
     return app
 
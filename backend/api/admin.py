@@ -0,0 +1,81 @@
+import io
+from flask import Blueprint, request, jsonify, send_file
+from backend.business_layer.container import get_services
+from backend.utils.exceptions import (
+    ValidationError, AuthenticationError, AuthorizationError, DatabaseError
+)
+from backend.utils.content_import import DECODE_ERRORS, import_format, read_records
+from backend.utils.profiler import request_profiler
+from backend.utils.logger import setup_logger
+from backend.api.auth import admin_required
+
+# Setup logger
+logger = setup_logger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+# Error handlers
+@admin_bp.errorhandler(ValidationError)
+def handle_validation_error(error):
+    logger.warning("Validation error: %s", error)
+    return jsonify({'error': str(error)}), 400
+
+@admin_bp.errorhandler(AuthenticationError)
+def handle_authentication_error(error):
+    logger.warning("Authentication error: %s", error)
+    return jsonify({'error': str(error)}), 401
+
+@admin_bp.errorhandler(AuthorizationError)
+def handle_authorization_error(error):
+    logger.warning("Authorization error: %s", error)
+    return jsonify({'error': str(error)}), 403
+
+@admin_bp.errorhandler(DatabaseError)
+def handle_database_error(error):
+    logger.error("Database error: %s", error)
+    return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.errorhandler(Exception)
+def handle_generic_error(error):
+    logger.error("Unexpected error: %s", error)
+    return jsonify({'error': 'Internal server error'}), 500
+
+# Nhập nội dung hàng loạt: file CSV/NDJSON gửi dạng multipart (field "file") hoặc nguyên body
+@admin_bp.route('/import/<kind>', methods=['POST'])
+@admin_required
+def import_content(kind):
+    upload = request.files.get('file')
+    fmt = import_format(request.args.get('format'), upload.filename if upload else None)
+    batch_size = request.args.get('batch_size', type=int)
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+    # Đọc từng dòng từ luồng dữ liệu, không nạp cả file vào bộ nhớ
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream, encoding='utf-8-sig',
+                              errors=DECODE_ERRORS, newline='')
+
+    def progress(report):
+        logger.info("Import %s batch %s: %s read, %s inserted", kind, report.batches, report.read, report.inserted)
+
+    services = get_services()
+    report = services.content_import_service.import_records(
+        kind, read_records(stream, fmt), dry_run, batch_size, progress)
+    return jsonify(report.to_dict()), 200
+
+# Danh sách profile (collapsed stacks) đã ghi, mới nhất trước
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    return jsonify({
+        'enabled': request_profiler.enabled,
+        'sample_rate': request_profiler.sample_rate,
+        'profiles': request_profiler.store.list()
+    }), 200
+
+# Tải một profile, dùng được trực tiếp với flamegraph.pl hoặc speedscope
+@admin_bp.route('/profiles/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    path = request_profiler.store.path(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=name)
@@ -3,15 +3,19 @@ from functools import wraps
 import jwt
 import datetime
 import os
-from backend.business_layer.services.user_service import UserService
-from backend.dao.users.user_dao import UserDAO
+from backend.business_layer.container import get_services
 from backend.utils.validation import validate_required_fields
-from backend.utils.exceptions import ValidationError, AuthenticationError, DatabaseError
+from backend.utils.exceptions import ValidationError, AuthenticationError, AuthorizationError, DatabaseError, CapacityError
+from backend.utils.credential_hasher import credential_hasher
+from backend.utils.token_cache import VerifiedTokenCache
+from backend.utils.cache import result_cache
+from backend.dao.leaderboards.leaderboard_queue import leaderboard_write_queue
+from backend.config.config import AUTH_CONFIG
 from backend.utils.logger import setup_logger
-from backend.database.database import get_db
+from backend.database.database import get_connection, get_pool
+from backend.database.query_stats import query_monitor
 
 logger = setup_logger(__name__)
-user_service = UserService(UserDAO())
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,6 +24,9 @@ JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev_secret_key')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24 * 7  # Token hết hạn sau 7 ngày
 
+# Token đã xác minh chữ ký, lưu tới khi hết hạn để bỏ qua bước giải mã lặp lại
+verified_tokens = VerifiedTokenCache(max_size=AUTH_CONFIG['token_cache_size'])
+
 def generate_jwt_token(user_id, username):
     """Tạo JWT token cho user"""
     try:
@@ -33,9 +40,8 @@ def generate_jwt_token(user_id, username):
             'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=JWT_EXPIRATION_HOURS)  # thời gian hết hạn
         }
         
-        logger.info(f"Generating token with payload: {payload}")
+        logger.debug("Generating token for user %s", username)
         token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
-        logger.info(f"Generated JWT token for user {username}, token type: {type(token)}")
         
         # PyJWT 2.x trả về string, nhưng phiên bản cũ trả về bytes
         if isinstance(token, bytes):
@@ -44,7 +50,7 @@ def generate_jwt_token(user_id, username):
         return token
         
     except Exception as e:
-        logger.error(f"Error generating token: {str(e)}")
+        logger.error("Error generating token: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         raise
@@ -56,18 +62,17 @@ def decode_jwt_token(token):
             logger.warning("Empty token provided")
             return None
             
-        logger.info(f"Decoding token: {token[:10]}...")
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        logger.info(f"Token decoded successfully. Payload: {payload}")
+        logger.debug("Token decoded for user %s", payload.get('sub'))
         return payload
     except jwt.ExpiredSignatureError:
         logger.warning("Token has expired")
         return None
     except jwt.InvalidTokenError as e:
-        logger.warning(f"Invalid token: {str(e)}")
+        logger.warning("Invalid token: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error decoding token: {str(e)}")
+        logger.error("Unexpected error decoding token: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return None
@@ -75,22 +80,29 @@ def decode_jwt_token(token):
 def get_token_from_request():
     """Lấy token từ Authorization header"""
     auth_header = request.headers.get('Authorization')
-    logger.info(f"Authorization header: {auth_header}")
     
     if auth_header and auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1].strip()
-        logger.info(f"Token extracted from header: {token[:10]}...")
-        return token
+        return auth_header.split(' ')[1].strip()
     
     # Kiểm tra cả query param cho testing
     token = request.args.get('token')
     if token:
-        logger.info(f"Token found in query param: {token[:10]}...")
         return token
         
-    logger.warning("No token found in request")
+    logger.debug("No token found in request")
     return None
 
+def verify_jwt_token(token):
+    """Giải mã token, dùng cache nếu token đã được xác minh trước đó"""
+    if not token:
+        return None
+    payload = verified_tokens.get(token)
+    if payload is None:
+        payload = decode_jwt_token(token)
+        if payload:
+            verified_tokens.put(token, payload)
+    return payload
+
 def login_required(f):
     """Decorator để kiểm tra xác thực bằng JWT"""
     @wraps(f)
@@ -100,7 +112,7 @@ def login_required(f):
             logger.warning("No token provided")
             raise AuthenticationError('Authentication required')
             
-        payload = decode_jwt_token(token)
+        payload = verify_jwt_token(token)
         if not payload:
             logger.warning("Invalid or expired token")
             raise AuthenticationError('Invalid or expired token')
@@ -109,14 +121,35 @@ def login_required(f):
         request.user_id = payload['sub']
         request.username = payload['name']
         
-        # Lưu thông tin user vào session để đảm bảo tính nhất quán
-        session['user_id'] = payload['sub']
-        session['username'] = payload['name']
-        logger.info(f"User authenticated: {payload['name']} (ID: {payload['sub']})")
+        # Chế độ stateless không ghi session, nên response không kèm Set-Cookie
+        if not AUTH_CONFIG['stateless']:
+            session['user_id'] = payload['sub']
+            session['username'] = payload['name']
         
         return f(*args, **kwargs)
     return decorated_function
 
+def is_admin() -> bool:
+    """Whether the authenticated user is listed in ADMIN_USERNAMES"""
+    return getattr(request, 'username', None) in AUTH_CONFIG['admin_usernames']
+
+def admin_required(f):
+    """Decorator cho các API chỉ dành cho quản trị viên (ADMIN_USERNAMES)"""
+    @wraps(f)
+    @login_required
+    def decorated_function(*args, **kwargs):
+        if not is_admin():
+            logger.warning("User %s is not an administrator", request.username)
+            raise AuthorizationError('Administrator access required')
+        return f(*args, **kwargs)
+    return decorated_function
+
+def capacity_response(error: CapacityError):
+    """503 telling the client when to retry"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -133,7 +166,7 @@ def register():
             raise ValidationError(errors[0])
             
         # Register user
-        user = user_service.register(
+        user = get_services().user_service.register(
             username=data['username'],
             email=data['email'],
             password=data['password']
@@ -142,7 +175,7 @@ def register():
         if not user:
             raise ValidationError('Username or email already exists')
             
-        logger.info(f"User registered successfully: {data['username']}")
+        logger.info("User registered successfully: %s", data['username'])
         
         # Generate JWT token
         token = generate_jwt_token(user.id, user.username)
@@ -154,10 +187,13 @@ def register():
         }), 201
         
     except ValidationError as e:
-        logger.warning(f"Registration validation failed: {str(e)}")
+        logger.warning("Registration validation failed: %s", e)
         return jsonify({'error': str(e)}), 400
+    except CapacityError as e:
+        # The hasher has logged it
+        return capacity_response(e)
     except Exception as e:
-        logger.error(f"Registration failed: {str(e)}")
+        logger.error("Registration failed: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
@@ -166,7 +202,7 @@ def login():
     try:
         # Get and validate request data
         data = request.get_json()
-        logger.info(f"Login attempt with data: {data}")
+        logger.info("Login attempt for user %s", data.get('username') if isinstance(data, dict) else None)
         
         if not data:
             raise ValidationError('No data provided')
@@ -178,7 +214,7 @@ def login():
             raise ValidationError(errors[0])
             
         # Login user
-        result = user_service.login(
+        result = get_services().user_service.login(
             username=data['username'],
             password=data['password']
         )
@@ -193,27 +229,24 @@ def login():
         user_id = user['id']
         username = user['username']
         
-        logger.info(f"User authenticated successfully: {username} (ID: {user_id})")
-        logger.info(f"User data type - id: {type(user_id)}, username: {type(username)}")
+        logger.info("User authenticated successfully: %s (ID: %s)", username, user_id)
         
         try:
             # Tạo JWT token
             token = generate_jwt_token(user_id, username)
-            logger.info(f"JWT token generated: {token[:20]}...")
             
             # Test decode để xác minh token hợp lệ
             try:
-                test_payload = decode_jwt_token(token)
+                test_payload = verify_jwt_token(token)
                 if not test_payload:
                     logger.error("JWT token verification failed - cannot decode token")
                     raise Exception("Token verification failed")
-                logger.info(f"Token verification successful: {test_payload}")
             except Exception as e:
-                logger.error(f"Token verification error: {str(e)}")
+                logger.error("Token verification error: %s", e)
                 raise Exception(f"Token verification error: {str(e)}")
                 
         except Exception as e:
-            logger.error(f"Token generation error: {str(e)}")
+            logger.error("Token generation error: %s", e)
             import traceback
             logger.error(traceback.format_exc())
             raise Exception(f"Failed to generate token: {str(e)}")
@@ -226,13 +259,16 @@ def login():
         }), 200
         
     except ValidationError as e:
-        logger.warning(f"Login validation failed: {str(e)}")
+        logger.warning("Login validation failed: %s", e)
         return jsonify({'error': str(e)}), 400
     except AuthenticationError as e:
-        logger.warning(f"Login authentication failed: {str(e)}")
+        logger.warning("Login authentication failed: %s", e)
         return jsonify({'error': str(e)}), 401
+    except CapacityError as e:
+        # The hasher has logged it
+        return capacity_response(e)
     except Exception as e:
-        logger.error(f"Login failed: {str(e)}")
+        logger.error("Login failed: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
@@ -248,12 +284,15 @@ def logout():
 def debug_db():
     """Debug endpoint to check database connection"""
     try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        count = cursor.fetchone()[0]
-        cursor.execute("SELECT id, username, email FROM users LIMIT 1")
-        user = cursor.fetchone()
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute("SELECT COUNT(*) FROM users")
+                count = cursor.fetchone()[0]
+                cursor.execute("SELECT id, username, email FROM users LIMIT 1")
+                user = cursor.fetchone()
+            finally:
+                cursor.close()
         return jsonify({
             'status': 'success',
             'user_count': count,
@@ -261,10 +300,16 @@ def debug_db():
                 'id': user[0],
                 'username': user[1],
                 'email': user[2]
-            } if user else None
+            } if user else None,
+            'pool': get_pool().stats(),
+            'hasher': credential_hasher.stats(),
+            'token_cache': verified_tokens.stats(),
+            'result_cache': result_cache.stats(),
+            'leaderboard_queue': leaderboard_write_queue.stats() if leaderboard_write_queue else None,
+            'query_stats': query_monitor.stats()
         })
     except Exception as e:
-        logger.error(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -274,8 +319,6 @@ def debug_db():
 def get_current_user():
     """Get current user from token"""
     try:
-        logger.info(f"Request headers: {dict(request.headers)}")
-        
         token = get_token_from_request()
         
         if not token:
@@ -283,13 +326,13 @@ def get_current_user():
             return jsonify({'authenticated': False, 'message': 'Not authenticated'}), 401
             
         try:
-            payload = decode_jwt_token(token)
+            payload = verify_jwt_token(token)
             
             if not payload:
                 logger.warning("Invalid or expired token in /me endpoint")
                 return jsonify({'authenticated': False, 'message': 'Invalid or expired token'}), 401
         except Exception as e:
-            logger.error(f"Error decoding token: {str(e)}")
+            logger.error("Error decoding token: %s", e)
             import traceback
             logger.error(traceback.format_exc())
             return jsonify({'authenticated': False, 'message': f'Error decoding token: {str(e)}'}), 401
@@ -297,13 +340,13 @@ def get_current_user():
         try:
             # Lấy thông tin user từ database
             if 'sub' not in payload:
-                logger.error(f"Missing 'sub' in token payload: {payload}")
+                logger.error("Missing 'sub' in token payload: %s", payload)
                 return jsonify({'authenticated': False, 'message': 'Invalid token format - missing user ID'}), 401
                 
             user_id = payload['sub']
-            logger.info(f"Getting user with ID {user_id} from database")
+            logger.debug("Getting user with ID %s from database", user_id)
             
-            user_dao = UserDAO()
+            user_dao = get_services().user_dao
             
             try:
                 # Xử lý user_id đúng định dạng
@@ -313,11 +356,11 @@ def get_current_user():
                 user = user_dao.get_by_id(user_id)
                 
                 if not user:
-                    logger.warning(f"User with ID {user_id} not found in database")
+                    logger.warning("User with ID %s not found in database", user_id)
                     return jsonify({'authenticated': False, 'message': 'User not found'}), 401
                     
                 # Trả về thông tin user
-                logger.info(f"User {user.username} authenticated successfully via token")
+                logger.debug("User %s authenticated successfully via token", user.username)
                 
                 response_data = {
                     'authenticated': True,
@@ -327,11 +370,10 @@ def get_current_user():
                         'email': user.email
                     }
                 }
-                logger.info(f"Returning user data: {response_data}")
                 
                 return jsonify(response_data), 200
             except Exception as db_error:
-                logger.error(f"Database error: {str(db_error)}")
+                logger.error("Database error: %s", db_error)
                 import traceback
                 logger.error(traceback.format_exc())
                 return jsonify({
@@ -342,7 +384,7 @@ def get_current_user():
                 }), 500
             
         except Exception as e:
-            logger.error(f"Error getting user data: {str(e)}")
+            logger.error("Error getting user data: %s", e)
             import traceback
             logger.error(traceback.format_exc())
             return jsonify({
@@ -352,7 +394,7 @@ def get_current_user():
             }), 500
             
     except Exception as e:
-        logger.error(f"Unexpected error in get_current_user: {str(e)}")
+        logger.error("Unexpected error in get_current_user: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         return jsonify({
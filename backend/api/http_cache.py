@@ -0,0 +1,56 @@
+from functools import wraps
+from typing import Callable, Optional
+from flask import current_app, make_response, request
+from backend.config.config import HTTP_CACHE_CONFIG
+from backend.dao.content_versions import ContentVersion, content_versions
+from backend.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def _not_modified(version: ContentVersion) -> bool:
+    """Whether the request's validators still match a version"""
+    if request.if_none_match:
+        return request.if_none_match.contains(version.etag)
+    if request.if_modified_since and version.updated_at:
+        return version.updated_at <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def _add_validators(response, version: ContentVersion):
+    response.set_etag(version.etag)
+    if version.updated_at:
+        response.last_modified = version.updated_at
+    response.headers['Cache-Control'] = HTTP_CACHE_CONFIG['cache_control']
+    return response
+
+def conditional(topic_of: Callable[..., int]):
+    """
+    Answer GETs of versioned topic content conditionally
+
+    The version is read before the view runs, so a request whose
+    If-None-Match / If-Modified-Since still matches gets a 304 without
+    any content query. If a write lands while the view is running the
+    response carries the older tag, which only costs the client one more
+    full response later.
+
+    Args:
+        topic_of: Maps the view arguments to the topic ID whose version
+            covers the response (TOPIC_LIST for the topic list)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version: Optional[ContentVersion] = None
+            if HTTP_CACHE_CONFIG['enabled']:
+                version = content_versions.get(topic_of(**kwargs))
+            if version is None:
+                return view(*args, **kwargs)
+
+            if _not_modified(version):
+                return _add_validators(current_app.response_class(status=304), version)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            return _add_validators(response, version)
+        return wrapper
+    return decorator
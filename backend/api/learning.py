@@ -1,27 +1,22 @@
 from flask import Blueprint, request, jsonify, session
-from backend.business_layer.services.user_service import UserService
-from backend.business_layer.services.vocabulary_topics_service import VocabularyTopicService
-from backend.business_layer.services.vocabulary_service import VocabularyService
-from backend.business_layer.services.test_service import TestService
-from backend.business_layer.services.test_result_service import TestResultService
-from backend.business_layer.services.leaderboard_service import LeaderboardService
-from backend.dao.users.user_dao import UserDAO
-from backend.dao.vocabularies.vocabulary_dao import VocabularyDAO
-from backend.dao.tests.test_dao import TestDAO
-from backend.dao.test_results.test_result_dao import TestResultDAO
-from backend.dao.leaderboards.leaderboard_dao import LeaderboardDAO
-from backend.dao.vocabulary_topics.vocabulary_topic_dao import VocabularyTopicDAO
+import random
+import secrets
+from backend.business_layer.container import get_services
 from backend.utils.exceptions import (
     ValidationError, AuthenticationError, AuthorizationError,
-    ResourceNotFoundError, DatabaseError, ServiceError
+    ResourceNotFoundError, DatabaseError, ServiceError, CapacityError
 )
 from backend.utils.validation import (
     validate_required_fields, validate_string_length,
     validate_email, validate_password, validate_integer,
     validate_integer_range, validate_float_range
 )
+from backend.config.config import QUIZ_CONFIG, SEARCH_CONFIG, PAGINATION_CONFIG
 from backend.utils.logger import setup_logger
-from backend.api.auth import login_required
+from backend.api.auth import login_required, admin_required, is_admin
+from backend.api.http_cache import conditional
+from backend.api.streaming import export_format, stream_records
+from backend.dao.content_versions import TOPIC_LIST
 
 # Setup logger
 logger = setup_logger(__name__)
@@ -31,37 +26,44 @@ learning_bp = Blueprint('learning', __name__)
 # Error handlers
 @learning_bp.errorhandler(ValidationError)
 def handle_validation_error(error):
-    logger.warning(f"Validation error: {str(error)}")
+    logger.warning("Validation error: %s", error)
     return jsonify({'error': str(error)}), 400
 
 @learning_bp.errorhandler(AuthenticationError)
 def handle_authentication_error(error):
-    logger.warning(f"Authentication error: {str(error)}")
+    logger.warning("Authentication error: %s", error)
     return jsonify({'error': str(error)}), 401
 
 @learning_bp.errorhandler(AuthorizationError)
 def handle_authorization_error(error):
-    logger.warning(f"Authorization error: {str(error)}")
+    logger.warning("Authorization error: %s", error)
     return jsonify({'error': str(error)}), 403
 
 @learning_bp.errorhandler(ResourceNotFoundError)
 def handle_not_found_error(error):
-    logger.warning(f"Resource not found: {str(error)}")
+    logger.warning("Resource not found: %s", error)
     return jsonify({'error': str(error)}), 404
 
 @learning_bp.errorhandler(DatabaseError)
 def handle_database_error(error):
-    logger.error(f"Database error: {str(error)}")
+    logger.error("Database error: %s", error)
     return jsonify({'error': 'Internal server error'}), 500
 
 @learning_bp.errorhandler(ServiceError)
 def handle_service_error(error):
-    logger.error(f"Service error: {str(error)}")
+    logger.error("Service error: %s", error)
     return jsonify({'error': str(error)}), 500
 
+@learning_bp.errorhandler(CapacityError)
+def handle_capacity_error(error):
+    # Logged once, as a warning, where the capacity ran out
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 @learning_bp.errorhandler(Exception)
 def handle_generic_error(error):
-    logger.error(f"Unexpected error: {str(error)}")
+    logger.error("Unexpected error: %s", error)
     return jsonify({'error': 'Internal server error'}), 500
 
 # User APIs
@@ -95,25 +97,26 @@ def register():
             raise ValidationError(email_error)
         
         # Initialize services
-        user_dao = UserDAO()
-        user_service = UserService(user_dao)
+        services = get_services()
         
         # Try to register
-        user = user_service.register(username, password, email)
+        user = services.user_service.register(username, password, email)
         if not user:
             raise ServiceError('Username already exists')
             
-        logger.info(f"User registered successfully: {username}")
+        logger.info("User registered successfully: %s", username)
         return jsonify(user.to_dict()), 201
         
     except ValidationError as e:
-        logger.warning(f"Registration validation failed: {str(e)}")
+        logger.warning("Registration validation failed: %s", e)
         raise
     except ServiceError as e:
-        logger.error(f"Registration service error: {str(e)}")
+        logger.error("Registration service error: %s", e)
+        raise
+    except CapacityError:
         raise
     except Exception as e:
-        logger.error(f"Registration failed with unexpected error: {str(e)}")
+        logger.error("Registration failed with unexpected error: %s", e)
         raise
 
 @learning_bp.route('/login', methods=['POST'])
@@ -125,80 +128,119 @@ def login():
         username = data['username']
         password = data['password']
         
-        user_dao = UserDAO()
-        user_service = UserService(user_dao)
-        result = user_service.login(username, password)
+        services = get_services()
+        result = services.user_service.login(username, password)
         
         if not result:
             raise AuthenticationError('Invalid credentials')
             
-        logger.info(f"User logged in successfully: {username}")
+        logger.info("User logged in successfully: %s", username)
         return jsonify(result), 200
         
+    except CapacityError:
+        raise
     except Exception as e:
-        logger.error(f"Login failed: {str(e)}")
+        logger.error("Login failed: %s", e)
         raise
 
 # Topic APIs
 @learning_bp.route('/topics', methods=['GET'])
 @login_required
+@conditional(lambda: TOPIC_LIST)
 def get_topics():
     try:
-        topic_service = VocabularyTopicService(VocabularyTopicDAO())
-        topics = topic_service.get_all_topics()
+        services = get_services()
+        topics = services.topic_service.get_all_topics()
         return jsonify([topic.to_dict() for topic in topics]), 200
     except Exception as e:
-        logger.error(f"Failed to get topics: {str(e)}")
+        logger.error("Failed to get topics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @learning_bp.route('/topics/<int:topic_id>', methods=['GET'])
 @login_required
+@conditional(lambda topic_id: topic_id)
 def get_topic(topic_id):
     try:
-        topic_service = VocabularyTopicService(VocabularyTopicDAO())
-        topic = topic_service.get_topic_by_id(topic_id)
+        services = get_services()
+        topic = services.topic_service.get_topic_by_id(topic_id)
         
         if not topic:
             return jsonify({'error': 'Topic not found'}), 404
             
         return jsonify(topic.to_dict()), 200
     except Exception as e:
-        logger.error(f"Failed to get topic: {str(e)}")
+        logger.error("Failed to get topic: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # Vocabulary APIs
 @learning_bp.route('/topics/<int:topic_id>/vocabularies', methods=['GET'])
 @login_required
+@conditional(lambda topic_id: topic_id)
 def get_vocabularies(topic_id):
     try:
         validate_integer(topic_id, 'topic_id', min_value=1)
-        vocabulary_dao = VocabularyDAO()
-        vocabulary_service = VocabularyService(vocabulary_dao)
-        vocabularies = vocabulary_service.get_vocabularies_by_topic(topic_id)
+        services = get_services()
+        vocabularies = services.vocabulary_service.get_vocabularies_by_topic(topic_id)
         return jsonify([vocabulary.to_dict() for vocabulary in vocabularies]), 200
     except Exception as e:
-        logger.error(f"Failed to get vocabularies: {str(e)}")
+        logger.error("Failed to get vocabularies: %s", e)
         raise
 
+@learning_bp.route('/vocabularies/search', methods=['GET'])
+@login_required
+def search_vocabularies():
+    # Tìm theo từ, nghĩa hoặc phiên âm; không phân biệt dấu tiếng Việt
+    keyword = request.args.get('q', '').strip()
+    if not keyword:
+        raise ValidationError('Query parameter q is required')
+    page = request.args.get('page', default=1, type=int)
+    per_page = request.args.get('per_page', default=SEARCH_CONFIG['default_per_page'], type=int)
+    topic_id = request.args.get('topic_id', type=int)
+    for error in (validate_integer(page, 'page', min_value=1),
+                  validate_integer(per_page, 'per_page', min_value=1, max_value=SEARCH_CONFIG['max_per_page'])):
+        if error:
+            raise ValidationError(error)
+    
+    services = get_services()
+    return jsonify(services.vocabulary_service.search_vocabularies_page(keyword, page, per_page, topic_id)), 200
+
+@learning_bp.route('/vocabularies/suggest', methods=['GET'])
+@login_required
+def suggest_vocabularies():
+    # Gợi ý khi gõ: chỉ đọc từ bộ nhớ, không truy vấn MySQL
+    prefix = request.args.get('prefix', '').strip()
+    if not prefix:
+        raise ValidationError('Query parameter prefix is required')
+    limit = request.args.get('limit', default=SEARCH_CONFIG['suggest_default_limit'], type=int)
+    limit_error = validate_integer(limit, 'limit', min_value=1, max_value=SEARCH_CONFIG['suggest_max_limit'])
+    if limit_error:
+        raise ValidationError(limit_error)
+    
+    services = get_services()
+    return jsonify({
+        'prefix': prefix,
+        'suggestions': services.vocabulary_service.suggest_vocabularies(prefix, limit)
+    }), 200
+
 @learning_bp.route('/vocabularies/<int:vocabulary_id>', methods=['GET'])
 @login_required
 def get_vocabulary(vocabulary_id):
     try:
-        vocabulary_dao = VocabularyDAO()
-        vocabulary_service = VocabularyService(vocabulary_dao)
-        vocabulary = vocabulary_service.get_vocabulary_by_id(vocabulary_id)
+        services = get_services()
+        vocabulary = services.vocabulary_service.get_vocabulary_by_id(vocabulary_id)
         
         if not vocabulary:
             return jsonify({'error': 'Vocabulary not found'}), 404
             
         return jsonify(vocabulary.to_dict()), 200
     except Exception as e:
-        logger.error(f"Failed to get vocabulary: {str(e)}")
+        logger.error("Failed to get vocabulary: %s", e)
         raise
 
 # Test APIs
 @learning_bp.route('/topics/<int:topic_id>/tests', methods=['GET'])
 @login_required
+@conditional(lambda topic_id: topic_id)
 def get_tests(topic_id):
     try:
         # Validate user is logged in - Sử dụng request.user_id từ decorator login_required
@@ -210,37 +252,56 @@ def get_tests(topic_id):
         validate_integer(topic_id, 'topic_id', min_value=1)
         
         # Log để debug
-        logger.info(f"Fetching tests for topic {topic_id}, user_id: {user_id}")
+        logger.info("Fetching tests for topic %s, user_id: %s", topic_id, user_id)
         
         # Initialize services
-        test_dao = TestDAO()
-        test_result_dao = TestResultDAO()
-        test_result_service = TestResultService(test_result_dao)
-        leaderboard_dao = LeaderboardDAO()
-        leaderboard_service = LeaderboardService(leaderboard_dao)
-        test_service = TestService(test_dao, test_result_service, leaderboard_service)
+        services = get_services()
         
         # Get tests
-        tests = test_service.get_tests_by_topic(topic_id)
+        tests = services.test_service.get_tests_by_topic(topic_id)
         
         # Log the result
-        logger.info(f"Found {len(tests)} tests for topic {topic_id}")
+        logger.info("Found %s tests for topic %s", len(tests), topic_id)
         
         # Return response
         return jsonify([test.to_dict() for test in tests]), 200
     except ValidationError as e:
-        logger.warning(f"Validation error in get_tests: {str(e)}")
+        logger.warning("Validation error in get_tests: %s", e)
         raise
     except AuthenticationError as e:
-        logger.warning(f"Authentication error in get_tests: {str(e)}")
+        logger.warning("Authentication error in get_tests: %s", e)
         raise
     except DatabaseError as e:
-        logger.error(f"Database error in get_tests: {str(e)}")
+        logger.error("Database error in get_tests: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in get_tests: {str(e)}")
+        logger.error("Unexpected error in get_tests: %s", e)
         raise
 
+@learning_bp.route('/topics/<int:topic_id>/quiz', methods=['GET'])
+@login_required
+def get_quiz(topic_id):
+    size = request.args.get('size', default=QUIZ_CONFIG['default_size'], type=int)
+    size_error = validate_integer(size, 'size', min_value=1, max_value=QUIZ_CONFIG['max_size'])
+    if size_error:
+        raise ValidationError(size_error)
+    # Trả về seed để có thể tạo lại đúng bộ câu hỏi này
+    seed = request.args.get('seed', type=int)
+    if seed is None:
+        seed = secrets.randbelow(2 ** 31)
+    
+    services = get_services()
+    
+    tests = services.test_service.get_quiz(topic_id, size, seed)
+    if not tests:
+        raise ResourceNotFoundError('No tests found for this topic')
+    # Thứ tự đáp án của từng câu cũng lấy từ seed, để tạo lại được y hệt bài kiểm tra
+    return jsonify({
+        'topic_id': topic_id,
+        'seed': seed,
+        'tests': [test.to_dict(rng=random.Random(f'{seed}:{test.id}')) for test in tests]
+    }), 200
+
 @learning_bp.route('/tests/<int:test_id>', methods=['GET'])
 @login_required
 def get_test(test_id):
@@ -254,41 +315,36 @@ def get_test(test_id):
         validate_integer(test_id, 'test_id', min_value=1)
         
         # Log để debug
-        logger.info(f"Fetching test {test_id}, user_id: {user_id}")
+        logger.info("Fetching test %s, user_id: %s", test_id, user_id)
         
         # Initialize services
-        test_dao = TestDAO()
-        test_result_dao = TestResultDAO()
-        test_result_service = TestResultService(test_result_dao)
-        leaderboard_dao = LeaderboardDAO()
-        leaderboard_service = LeaderboardService(leaderboard_dao)
-        test_service = TestService(test_dao, test_result_service, leaderboard_service)
+        services = get_services()
         
         # Get test
-        test = test_service.get_test_by_id(test_id)
+        test = services.test_service.get_test_by_id(test_id)
         
         if not test:
             raise ResourceNotFoundError(f'Test with id {test_id} not found')
             
         # Log the result
-        logger.info(f"Found test {test_id}")
+        logger.info("Found test %s", test_id)
             
         # Return response
         return jsonify(test.to_dict()), 200
     except ValidationError as e:
-        logger.warning(f"Validation error in get_test: {str(e)}")
+        logger.warning("Validation error in get_test: %s", e)
         raise
     except AuthenticationError as e:
-        logger.warning(f"Authentication error in get_test: {str(e)}")
+        logger.warning("Authentication error in get_test: %s", e)
         raise
     except ResourceNotFoundError as e:
-        logger.warning(f"Test not found: {str(e)}")
+        logger.warning("Test not found: %s", e)
         raise
     except DatabaseError as e:
-        logger.error(f"Database error in get_test: {str(e)}")
+        logger.error("Database error in get_test: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in get_test: {str(e)}")
+        logger.error("Unexpected error in get_test: %s", e)
         raise
 
 @learning_bp.route('/topics/<int:topic_id>/tests/', methods=['POST'])
@@ -302,7 +358,7 @@ def submit_test(topic_id):
             raise AuthenticationError('Authentication required')
             
         # Log để debug
-        logger.info(f"Submitting test for topic {topic_id}, user_id: {user_id}")
+        logger.info("Submitting test for topic %s, user_id: %s", topic_id, user_id)
             
         # Get and validate request data
         data = request.get_json()
@@ -319,7 +375,7 @@ def submit_test(topic_id):
         completion_time = data['completion_time']
         
         # Log request data để debug
-        logger.info(f"Test submission data: answers={answers}, completion_time={completion_time}")
+        logger.debug("Test submission: %d answers, completion_time=%s", len(answers), completion_time)
         
         # Validate field types and values
         if not isinstance(answers, dict):
@@ -340,15 +396,10 @@ def submit_test(topic_id):
         answers = {int(k): v for k, v in answers.items()}
         
         # Initialize services
-        test_dao = TestDAO()
-        test_result_dao = TestResultDAO()
-        test_result_service = TestResultService(test_result_dao)
-        leaderboard_dao = LeaderboardDAO()
-        leaderboard_service = LeaderboardService(leaderboard_dao)
-        test_service = TestService(test_dao, test_result_service, leaderboard_service)
+        services = get_services()
         
         # Submit test
-        result = test_service.submit_test_result(
+        result = services.test_service.submit_test_result(
             user_id=user_id,
             topic_id=topic_id,
             answers=answers,
@@ -356,7 +407,7 @@ def submit_test(topic_id):
         )
         
         # Log kết quả
-        logger.info(f"Test submission result: {result}")
+        logger.info("Test submission result: %s", result)
         
         # Return response with detailed information
         response = {
@@ -367,79 +418,140 @@ def submit_test(topic_id):
         return jsonify(response), 200
         
     except ValidationError as e:
-        logger.warning(f"Validation error in submit_test: {str(e)}")
+        logger.warning("Validation error in submit_test: %s", e)
         return jsonify({'error': str(e)}), 400
     except AuthenticationError as e:
-        logger.warning(f"Authentication error in submit_test: {str(e)}")
+        logger.warning("Authentication error in submit_test: %s", e)
         return jsonify({'error': str(e)}), 401
     except ResourceNotFoundError as e:
-        logger.warning(f"Resource not found in submit_test: {str(e)}")
+        logger.warning("Resource not found in submit_test: %s", e)
         return jsonify({'error': str(e)}), 404
     except DatabaseError as e:
-        logger.error(f"Database error in submit_test: {str(e)}")
+        logger.error("Database error in submit_test: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
     except Exception as e:
-        logger.error(f"Unexpected error in submit_test: {str(e)}")
+        logger.error("Unexpected error in submit_test: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
+# Phân trang theo con trỏ: ?limit=&cursor=, con trỏ trang sau nằm trong header X-Next-Cursor
+def _page_args():
+    limit = request.args.get('limit', default=PAGINATION_CONFIG['default_page_size'], type=int)
+    limit_error = validate_integer(limit, 'limit', min_value=1, max_value=PAGINATION_CONFIG['max_page_size'])
+    if limit_error:
+        raise ValidationError(limit_error)
+    return limit, request.args.get('cursor')
+
+def _page_response(page):
+    response = jsonify([item.to_dict() for item in page.items])
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    return response, 200
+
+RESULT_EXPORT_FIELDS = ('id', 'user_id', 'topic_id', 'score', 'completion_time', 'created_at')
+LEADERBOARD_EXPORT_FIELDS = ('rank', 'user_id', 'username', 'topic_id', 'total_score',
+                             'tests_completed', 'average_score', 'last_updated')
+
 # Test Result APIs
 @learning_bp.route('/user/results', methods=['GET'])
 @login_required
 def get_user_results():
     user_id = request.user_id
-    logger.info(f"Fetching results for user {user_id}")
-    test_result_dao = TestResultDAO()
-    test_result_service = TestResultService(test_result_dao)
-    results = test_result_service.get_user_results(user_id)
-    logger.info(f"Found {len(results)} results for user {user_id}")
-    return jsonify([result.to_dict() for result in results]), 200
+    limit, cursor = _page_args()
+    logger.info("Fetching results for user %s", user_id)
+    services = get_services()
+    page = services.test_result_service.get_user_results(user_id, limit, cursor)
+    logger.info("Found %s results for user %s", len(page.items), user_id)
+    return _page_response(page)
 
 @learning_bp.route('/topics/<int:topic_id>/results', methods=['GET'])
 @login_required
 def get_topic_results(topic_id):
-    test_result_dao = TestResultDAO()
-    test_result_service = TestResultService(test_result_dao)
-    results = test_result_service.get_topic_results(topic_id)
-    return jsonify([result.to_dict() for result in results]), 200
+    limit, cursor = _page_args()
+    services = get_services()
+    return _page_response(services.test_result_service.get_topic_results(topic_id, limit, cursor))
 
 @learning_bp.route('/user/topics/<int:topic_id>/results', methods=['GET'])
 @login_required
 def get_user_topic_results(topic_id):
     user_id = request.user_id
-    logger.info(f"Fetching results for user {user_id} and topic {topic_id}")
-    test_result_dao = TestResultDAO()
-    test_result_service = TestResultService(test_result_dao)
-    results = test_result_service.get_user_topic_results(user_id, topic_id)
-    logger.info(f"Found {len(results)} results for user {user_id} and topic {topic_id}")
-    return jsonify([result.to_dict() for result in results]), 200
+    limit, cursor = _page_args()
+    logger.info("Fetching results for user %s and topic %s", user_id, topic_id)
+    services = get_services()
+    page = services.test_result_service.get_user_topic_results(user_id, topic_id, limit, cursor)
+    logger.info("Found %s results for user %s and topic %s", len(page.items), user_id, topic_id)
+    return _page_response(page)
+
+# Xuất toàn bộ kết quả dạng luồng (?format=ndjson|csv), bộ nhớ không tăng theo số dòng
+@learning_bp.route('/topics/<int:topic_id>/results/export', methods=['GET'])
+@admin_required
+def export_topic_results(topic_id):
+    fmt = export_format(request.args.get('format'))
+    services = get_services()
+    results = services.test_result_service.export_topic_results(topic_id)
+    return stream_records((result.to_dict() for result in results), RESULT_EXPORT_FIELDS,
+                          fmt, f"topic-{topic_id}-results")
+
+@learning_bp.route('/users/<int:user_id>/results/export', methods=['GET'])
+@login_required
+def export_user_results(user_id):
+    # Người dùng chỉ xuất được kết quả của chính mình, trừ quản trị viên
+    if str(user_id) != str(request.user_id) and not is_admin():
+        raise AuthorizationError('You can only export your own results')
+    fmt = export_format(request.args.get('format'))
+    services = get_services()
+    results = services.test_result_service.export_user_results(user_id)
+    return stream_records((result.to_dict() for result in results), RESULT_EXPORT_FIELDS,
+                          fmt, f"user-{user_id}-results")
 
 # Leaderboard APIs
 @learning_bp.route('/topics/<int:topic_id>/leaderboard', methods=['GET'])
 @login_required
 def get_topic_leaderboard(topic_id):
-    leaderboard_dao = LeaderboardDAO()
-    leaderboard_service = LeaderboardService(leaderboard_dao)
-    leaderboard = leaderboard_service.get_topic_leaderboard(topic_id)
-    return jsonify([entry.to_dict() for entry in leaderboard]), 200
+    limit, cursor = _page_args()
+    services = get_services()
+    return _page_response(services.leaderboard_service.get_topic_leaderboard(topic_id, limit, cursor))
+
+@learning_bp.route('/topics/<int:topic_id>/leaderboard/export', methods=['GET'])
+@admin_required
+def export_topic_leaderboard(topic_id):
+    fmt = export_format(request.args.get('format'))
+    services = get_services()
+    entries = services.leaderboard_service.export_topic_leaderboard(topic_id)
+    return stream_records((entry.to_dict() for entry in entries), LEADERBOARD_EXPORT_FIELDS,
+                          fmt, f"topic-{topic_id}-leaderboard")
 
 @learning_bp.route('/user/rank/<int:topic_id>', methods=['GET'])
 @login_required
 def get_user_rank(topic_id):
     user_id = request.user_id
-    logger.info(f"Fetching rank for user {user_id} in topic {topic_id}")
-    leaderboard_dao = LeaderboardDAO()
-    leaderboard_service = LeaderboardService(leaderboard_dao)
-    rank = leaderboard_service.get_user_rank(user_id, topic_id)
-    logger.info(f"User {user_id} rank in topic {topic_id}: {rank}")
+    logger.info("Fetching rank for user %s in topic %s", user_id, topic_id)
+    services = get_services()
+    rank = services.leaderboard_service.get_user_rank(user_id, topic_id)
+    logger.info("User %s rank in topic %s: %s", user_id, topic_id, rank)
     return jsonify(rank), 200
 
+@learning_bp.route('/user/rank/<int:topic_id>/around', methods=['GET'])
+@login_required
+def get_users_around(topic_id):
+    user_id = request.user_id
+    window = request.args.get('window', default=5, type=int)
+    window_error = validate_integer(window, 'window', min_value=1, max_value=50)
+    if window_error:
+        raise ValidationError(window_error)
+    services = get_services()
+    entries = services.leaderboard_service.get_users_around(user_id, topic_id, window)
+    return jsonify({
+        'rank': services.leaderboard_service.get_user_rank(user_id, topic_id),
+        'percentile': services.leaderboard_service.get_user_percentile(user_id, topic_id),
+        'entries': [entry.to_dict() for entry in entries]
+    }), 200
+
 @learning_bp.route('/topics/<int:topic_id>/top-users', methods=['GET'])
 @login_required
 def get_top_users(topic_id):
     limit = request.args.get('limit', default=10, type=int)
-    leaderboard_dao = LeaderboardDAO()
-    leaderboard_service = LeaderboardService(leaderboard_dao)
-    top_users = leaderboard_service.get_top_users(topic_id, limit)
+    services = get_services()
+    top_users = services.leaderboard_service.get_top_users(topic_id, limit)
     return jsonify([user.to_dict() for user in top_users]), 200
 
 # Statistics APIs
@@ -447,16 +559,13 @@ def get_top_users(topic_id):
 @login_required
 def get_user_statistics():
     user_id = request.user_id
-    logger.info(f"Fetching statistics for user {user_id}")
-    test_result_dao = TestResultDAO()
-    test_result_service = TestResultService(test_result_dao)
-    leaderboard_dao = LeaderboardDAO()
-    leaderboard_service = LeaderboardService(leaderboard_dao)
+    logger.info("Fetching statistics for user %s", user_id)
+    services = get_services()
     
-    test_stats = test_result_service.get_user_statistics(user_id)
-    leaderboard_stats = leaderboard_service.get_user_statistics(user_id)
+    test_stats = services.test_result_service.get_user_statistics(user_id)
+    leaderboard_stats = services.leaderboard_service.get_user_statistics(user_id)
     
-    logger.info(f"Found statistics for user {user_id}")
+    logger.info("Found statistics for user %s", user_id)
     return jsonify({
         'test_statistics': test_stats,
         'leaderboard_statistics': leaderboard_stats
@@ -465,13 +574,10 @@ def get_user_statistics():
 @learning_bp.route('/topics/<int:topic_id>/statistics', methods=['GET'])
 @login_required
 def get_topic_statistics(topic_id):
-    test_result_dao = TestResultDAO()
-    test_result_service = TestResultService(test_result_dao)
-    leaderboard_dao = LeaderboardDAO()
-    leaderboard_service = LeaderboardService(leaderboard_dao)
+    services = get_services()
     
-    test_stats = test_result_service.get_topic_statistics(topic_id)
-    leaderboard_stats = leaderboard_service.get_topic_statistics(topic_id)
+    test_stats = services.test_result_service.get_topic_statistics(topic_id)
+    leaderboard_stats = services.leaderboard_service.get_topic_statistics(topic_id)
     
     return jsonify({
         'test_statistics': test_stats,
@@ -485,7 +591,7 @@ def check_auth():
     """Check if user is authenticated"""
     user_id = request.user_id
     username = request.username
-    logger.info(f"Auth check for user {username} (ID: {user_id})")
+    logger.info("Auth check for user %s (ID: %s)", username, user_id)
     return jsonify({
         'authenticated': True,
         'user_id': user_id,
@@ -0,0 +1,103 @@
+import hmac
+import time
+from flask import Response, g, request
+from backend.api.auth import verified_tokens
+from backend.config.config import METRICS_CONFIG
+from backend.dao.leaderboards.leaderboard_queue import leaderboard_write_queue
+from backend.database.database import get_pool
+from backend.database.query_stats import query_monitor
+from backend.utils.cache import result_cache
+from backend.utils.credential_hasher import credential_hasher
+from backend.utils.logger import setup_logger
+from backend.utils.metrics import LATENCY_BUCKETS, SIZE_BUCKETS, metrics
+
+logger = setup_logger(__name__)
+
+ROUTE_LABELS = ('blueprint', 'route', 'method')
+
+metrics.counter('http_requests_total', 'HTTP requests served', ROUTE_LABELS + ('status',))
+metrics.histogram('http_request_duration_seconds', 'Time from the start of a request to its response',
+                  LATENCY_BUCKETS, ROUTE_LABELS)
+metrics.histogram('http_request_size_bytes', 'Request body sizes', SIZE_BUCKETS, ROUTE_LABELS)
+metrics.histogram('http_response_size_bytes', 'Response body sizes, streamed responses excluded',
+                  SIZE_BUCKETS, ROUTE_LABELS)
+
+def _start_timer() -> None:
+    g.metrics_started = time.perf_counter()
+
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    # Route templates, not paths, keep the label sets bounded
+    rule = request.url_rule
+    labels = (request.blueprint or '', rule.rule if rule else 'unmatched', request.method)
+    metrics.inc('http_requests_total', labels + (str(response.status_code),))
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - started, labels)
+    if request.content_length:
+        metrics.observe('http_request_size_bytes', request.content_length, labels)
+    if response.content_length is not None:
+        metrics.observe('http_response_size_bytes', response.content_length, labels)
+    return response
+
+def _pool_metrics():
+    stats = get_pool().stats()
+    for name in ('size', 'idle', 'in_use', 'waiting', 'max_size'):
+        yield f'db_pool_{name}', 'gauge', f'Database pool {name.replace("_", " ")} connections', [({}, stats[name])]
+    for name in ('checkouts', 'timeouts', 'recycled', 'failed_checks'):
+        yield f'db_pool_{name}_total', 'counter', f'Database pool {name.replace("_", " ")}', [({}, stats[name])]
+
+def _cache_metrics():
+    caches = {'result': result_cache.stats(), 'token': verified_tokens.stats()}
+    yield 'cache_hits_total', 'counter', 'Cache hits', [
+        ({'cache': name}, stats['hits']) for name, stats in caches.items()]
+    yield 'cache_misses_total', 'counter', 'Cache misses', [
+        ({'cache': name}, stats['misses']) for name, stats in caches.items()]
+    yield 'cache_hit_ratio', 'gauge', 'Share of cache lookups that hit since start', [
+        ({'cache': name}, stats['hits'] / (stats['hits'] + stats['misses']))
+        for name, stats in caches.items() if stats['hits'] + stats['misses']]
+
+def _query_metrics():
+    stats = query_monitor.stats()
+    yield 'db_sampled_requests_total', 'counter', 'Requests whose statements were recorded', [
+        ({}, stats['sampled_requests'])]
+    yield 'db_repeated_query_requests_total', 'counter', 'Sampled requests with a likely N+1 statement', [
+        ({}, stats['repeat_flagged_requests'])]
+    yield 'db_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS', [
+        ({}, stats['slow_statements'])]
+
+def _hasher_metrics():
+    stats = credential_hasher.stats()
+    yield 'credential_hashes_in_flight', 'gauge', 'Password hashes queued or running', [({}, stats['in_flight'])]
+    yield 'credential_hashes_rejected_total', 'counter', 'Password hashes refused for capacity', [
+        ({}, stats['rejected'])]
+
+def _leaderboard_queue_metrics():
+    stats = leaderboard_write_queue.stats()
+    yield 'leaderboard_queue_pending_rows', 'gauge', 'User and topic entries waiting to be written', [
+        ({}, stats['pending_rows'])]
+    yield 'leaderboard_queue_pending_scores', 'gauge', 'Scores waiting to be written', [
+        ({}, stats['pending_scores'])]
+    yield 'leaderboard_queue_flushed_scores_total', 'counter', 'Scores written by the flusher', [
+        ({}, stats['flushed_scores'])]
+    yield 'leaderboard_queue_flushed_rows_total', 'counter', 'Rows upserted by the flusher', [
+        ({}, stats['flushed_rows'])]
+    yield 'leaderboard_queue_flush_errors_total', 'counter', 'Failed flushes', [({}, stats['flush_errors'])]
+
+def metrics_view():
+    token = METRICS_CONFIG['token']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def init_app(app) -> None:
+    """Record request metrics on an app and serve them at /metrics"""
+    if not METRICS_CONFIG['enabled']:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
+    for collect in (_pool_metrics, _cache_metrics, _query_metrics, _hasher_metrics):
+        metrics.register_collector(collect)
+    if leaderboard_write_queue is not None:
+        metrics.register_collector(_leaderboard_queue_metrics)
@@ -2,12 +2,15 @@ from backend.api import create_app
 from backend.config import APP_CONFIG
 from backend.utils.logger import logger
 
-app = create_app()
+# The app is only built under the __main__ guard: credential hasher workers
+# are spawned processes that re-import this module. `flask` finds the
+# create_app factory above; WSGI servers use "backend.app:create_app()".
 
 if __name__ == '__main__':
+    app = create_app()
     logger.info("Starting Flask application...")
     app.run(
         debug=APP_CONFIG['debug'],
         host=APP_CONFIG['host'],
         port=APP_CONFIG['port']
-    ) 
\ No newline at end of file
+    )
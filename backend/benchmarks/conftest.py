@@ -0,0 +1,116 @@
+"""pytest options and fixtures for the benchmark suite
+
+    pytest backend/benchmarks --bench-scale 100k --bench-save bench.json
+    pytest backend/benchmarks --bench-scale 100k --bench-compare bench.json
+"""
+import json
+import os
+import platform
+import tempfile
+from datetime import datetime
+
+# Measure the DAO and service code, not cache hits
+os.environ.setdefault('CACHE_BACKEND', 'none')
+
+import pytest
+from backend.benchmarks.seed import SCALES, seeded_copy
+from backend.benchmarks.timing import compare, measure
+from backend.database.database import get_engine, set_engine
+from backend.database.engine import Engine
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-scale', choices=list(SCALES), default='1k',
+                    help='Number of seeded test results (default: 1k).')
+    group.addoption('--bench-db-dir', default=os.path.join(tempfile.gettempdir(), 'vocab-bench'),
+                    help='Where seeded databases are kept between runs.')
+    group.addoption('--bench-time', type=float, default=0.3,
+                    help='Minimum seconds spent sampling each benchmark.')
+    group.addoption('--bench-save', metavar='PATH', help='Write the results to a JSON file.')
+    group.addoption('--bench-compare', metavar='PATH',
+                    help='Fail benchmarks whose median is slower than in this JSON file.')
+    group.addoption('--bench-tolerance', type=float, default=0.25,
+                    help='Allowed slowdown against the baseline (default: 0.25 = 25%%).')
+
+class BenchmarkRecorder:
+    """Results of one session, checked against an optional baseline"""
+
+    def __init__(self, config):
+        self.scale = config.getoption('--bench-scale')
+        self.min_seconds = config.getoption('--bench-time')
+        self.tolerance = config.getoption('--bench-tolerance')
+        self.results = {}
+        self.baseline = {}
+        path = config.getoption('--bench-compare')
+        if path:
+            with open(path, encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('scale') != self.scale:
+                raise pytest.UsageError(f"{path} was recorded at scale {baseline.get('scale')}, not {self.scale}")
+            self.baseline = baseline['benchmarks']
+
+    def run(self, name: str, fn) -> dict:
+        result = measure(fn, self.min_seconds)
+        baseline = self.baseline.get(name)
+        if baseline is not None:
+            result.update(compare(result, baseline, self.tolerance))
+        self.results[name] = result
+        if result.get('regressed'):
+            pytest.fail(f"{name}: median {result['median_us']:.2f} µs is {result['ratio']:.2f}x "
+                        f"the baseline {baseline['median_us']:.2f} µs", pytrace=False)
+        return result
+
+    def report(self) -> dict:
+        return {
+            'scale': self.scale,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'benchmarks': self.results
+        }
+
+def pytest_configure(config):
+    config._benchmarks = BenchmarkRecorder(config)
+
+def pytest_sessionfinish(session):
+    recorder = session.config._benchmarks
+    path = session.config.getoption('--bench-save')
+    if path and recorder.results:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(recorder.report(), f, indent=2, sort_keys=True)
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config._benchmarks.results
+    if not results:
+        return
+    terminalreporter.section(f"benchmarks ({config._benchmarks.scale})")
+    for name, result in sorted(results.items()):
+        line = f"{name:<48} {result['median_us']:>12.2f} µs  {result['ops_per_sec']:>12.0f}/s"
+        if 'ratio' in result:
+            line += f"  {result['ratio']:.2f}x baseline" + ('  REGRESSED' if result['regressed'] else '')
+        terminalreporter.write_line(line)
+
+@pytest.fixture
+def bench(request):
+    """Time a zero-argument callable under the test's name"""
+    recorder = request.config._benchmarks
+    return lambda fn, name=None: recorder.run(name or request.node.name, fn)
+
+@pytest.fixture(scope='session')
+def seeded_database(request):
+    """A private copy of the seeded database for the chosen scale, as the process-wide engine"""
+    scale = request.config.getoption('--bench-scale')
+    directory = request.config.getoption('--bench-db-dir')
+    path = seeded_copy(directory, scale, os.path.join(directory, f'run-{scale}-{os.getpid()}.db'))
+    set_engine(Engine(f'sqlite:///{path}'))
+    yield path
+    get_engine().dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+@pytest.fixture(scope='session')
+def services(seeded_database):
+    """DAOs and services wired over the seeded database"""
+    from backend.business_layer.container import ServiceContainer
+    return ServiceContainer()
@@ -0,0 +1,328 @@
+"""Load test with scripted learner sessions
+
+Each virtual user repeats one learner session until the run ends: log in,
+list topics, pick a topic (Zipf-skewed towards the first ones), read its
+vocabularies and tests, submit answers, then read their rank and
+statistics. Users pause for an exponentially distributed think time
+between steps and revalidate cached GETs with If-None-Match like a browser.
+
+Without --url the real app is started in-process on a threaded server over
+a private copy of a seeded SQLite database, so pool (DB_POOL_*) and cache
+(CACHE_*) settings can be tried from the environment:
+
+    DB_POOL_MAX_SIZE=20 python -m backend.benchmarks.load_test --users 50 --duration 60 --scale 100k
+    python -m backend.benchmarks.load_test --url http://localhost:5000 --learners 5000
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Request logging at INFO would dominate the measurements
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from backend.benchmarks.seed import SCALES, SEED_PASSWORD, learner_count, seeded_copy, topic_weights
+
+STEPS = ('login', 'topics', 'vocabularies', 'tests', 'submit', 'rank', 'statistics')
+
+class StepStats:
+    """Latencies and errors of one session step, kept per virtual user and merged at the end"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.not_modified = 0
+        self.statuses: Dict[str, int] = defaultdict(int)
+
+    def merge(self, other: 'StepStats') -> None:
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.not_modified += other.not_modified
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            return round(latencies[min(int(count * fraction), count - 1)] * 1000, 2) if count else None
+
+        return {
+            'requests': count,
+            'throughput': round(count / elapsed, 2),
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'not_modified': self.not_modified,
+            'p50_ms': percentile(0.50),
+            'p90_ms': percentile(0.90),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(latencies[-1] * 1000, 2) if count else None,
+            'statuses': dict(self.statuses)
+        }
+
+class SessionAborted(Exception):
+    """A step failed in a way the rest of the session depends on"""
+
+class Learner:
+    """One virtual user with its own keep-alive connection and ETag cache"""
+
+    def __init__(self, base_url: str, learners: int, options: argparse.Namespace,
+                 stop: threading.Event, seed: int):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.learners = learners
+        self.options = options
+        self.stop = stop
+        self.rnd = random.Random(seed)
+        self.stats = {step: StepStats() for step in STEPS}
+        self.sessions = 0
+        self.connection: Optional[http.client.HTTPConnection] = None
+        self.cached: Dict[str, Tuple[str, Any]] = {}
+        self.token: Optional[str] = None
+        self._weights: Optional[Tuple[List[int], List[float]]] = None
+
+    def _request(self, step: str, method: str, path: str, body: Any = None) -> Any:
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        cached = self.cached.get(path) if method == 'GET' else None
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        stats = self.stats[step]
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.options.timeout)
+            self.connection.request(method, self.prefix + path, payload, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            stats.latencies.append(time.perf_counter() - started)
+            stats.errors += 1
+            stats.statuses[type(e).__name__] += 1
+            self.connection.close()
+            self.connection = None
+            raise SessionAborted(f"{step}: {e}")
+        stats.latencies.append(time.perf_counter() - started)
+        stats.statuses[str(response.status)] += 1
+
+        if response.status == 304 and cached:
+            stats.not_modified += 1
+            return cached[1]
+        if response.status >= 400:
+            stats.errors += 1
+            raise SessionAborted(f"{step}: HTTP {response.status}")
+        result = json.loads(data) if data else None
+        etag = response.getheader('ETag')
+        if method == 'GET' and etag:
+            self.cached[path] = (etag, result)
+        return result
+
+    def _think(self) -> None:
+        if self.options.think_ms > 0:
+            self.stop.wait(self.rnd.expovariate(1000 / self.options.think_ms))
+
+    def _pick_topic(self, topics: List[Dict]) -> int:
+        ids = sorted(topic['id'] for topic in topics)
+        if self._weights is None or self._weights[0] != ids:
+            self._weights = (ids, topic_weights(len(ids), self.options.zipf))
+        return self.rnd.choices(ids, cum_weights=self._weights[1])[0]
+
+    def session(self) -> None:
+        """One scripted learner session"""
+        learner = self.rnd.randint(1, self.learners)
+        self.token = None
+        login = self._request('login', 'POST', '/api/auth/login',
+                              {'username': f'learner{learner}', 'password': SEED_PASSWORD})
+        self.token = login['token']
+        self._think()
+
+        topics = self._request('topics', 'GET', '/api/learning/topics')
+        if not topics:
+            raise SessionAborted('topics: no topics')
+        topic_id = self._pick_topic(topics)
+        self._think()
+
+        self._request('vocabularies', 'GET', f'/api/learning/topics/{topic_id}/vocabularies')
+        self._think()
+
+        tests = self._request('tests', 'GET', f'/api/learning/topics/{topic_id}/tests')
+        self._think()
+
+        if tests:
+            answers = {str(test['id']): test['correct_answer'] if self.rnd.random() < self.options.correct
+                       else test['option1'] for test in tests}
+            self._request('submit', 'POST', f'/api/learning/topics/{topic_id}/tests',
+                          {'answers': answers, 'completion_time': self.rnd.randint(30, 600)})
+            self._think()
+
+        self._request('rank', 'GET', f'/api/learning/user/rank/{topic_id}')
+        self._think()
+
+        self._request('statistics', 'GET', '/api/learning/user/statistics')
+        self.sessions += 1
+        self._think()
+
+    def run(self, start_delay: float) -> None:
+        if self.stop.wait(start_delay):
+            return
+        while not self.stop.is_set():
+            try:
+                self.session()
+            except SessionAborted:
+                self._think()
+        if self.connection is not None:
+            self.connection.close()
+
+class LocalServer:
+    """The real app on a threaded WSGI server, over a private copy of a seeded database"""
+
+    def __init__(self, scale: str, db_dir: str):
+        from backend.config.config import POOL_CONFIG
+        from backend.database.database import set_engine
+        from backend.database.engine import Engine
+
+        self.path = seeded_copy(db_dir, scale, os.path.join(db_dir, f'load-{scale}-{os.getpid()}.db'))
+        set_engine(Engine(f'sqlite:///{self.path}', POOL_CONFIG))
+
+        from werkzeug.serving import make_server
+        from backend.api import create_app
+        self.app = create_app()
+        # One access log line per request would compete with the app for the GIL
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, self.app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, name='load-test-server', daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        from backend.database.database import get_pool
+        from backend.utils.cache import result_cache
+        return {'pool': get_pool().stats(), 'result_cache': result_cache.stats()}
+
+    def close(self) -> None:
+        from backend.database.database import get_engine
+        self.server.shutdown()
+        get_engine().dispose()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+def run(options: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    url = options.url
+    if not url:
+        server = LocalServer(options.scale, options.db_dir)
+        server.start()
+        url = server.url
+    learners = options.learners or learner_count(SCALES[options.scale])
+
+    stop = threading.Event()
+    users = [Learner(url, learners, options, stop, options.seed + n) for n in range(options.users)]
+    threads = [threading.Thread(target=user.run, args=(options.ramp_up * n / options.users,),
+                                name=f'learner-{n}', daemon=True)
+               for n, user in enumerate(users)]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        stop.wait(options.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(options.timeout + 1)
+        elapsed = time.perf_counter() - started
+
+    totals = {step: StepStats() for step in STEPS}
+    for user in users:
+        for step, stats in user.stats.items():
+            totals[step].merge(stats)
+    everything = StepStats()
+    for stats in totals.values():
+        everything.merge(stats)
+
+    report = {
+        'url': options.url or f'in-process ({options.scale})',
+        'users': options.users,
+        'think_ms': options.think_ms,
+        'zipf': options.zipf,
+        'elapsed_seconds': round(elapsed, 2),
+        'sessions': sum(user.sessions for user in users),
+        'sessions_per_second': round(sum(user.sessions for user in users) / elapsed, 2),
+        'steps': {step: stats.summary(elapsed) for step, stats in totals.items()},
+        'total': everything.summary(elapsed)
+    }
+    if server is not None:
+        report['server'] = server.stats()
+        server.close()
+    return report
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['url']}: {report['users']} users, think {report['think_ms']} ms, zipf {report['zipf']}, "
+          f"{report['elapsed_seconds']} s, {report['sessions']} sessions ({report['sessions_per_second']}/s)")
+    print(f"{'step':<14}{'requests':>10}{'req/s':>10}{'errors':>9}{'304s':>7}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(report['steps'].items()) + [('total', report['total'])]
+    for step, stats in rows:
+        print(f"{step:<14}{stats['requests']:>10}{stats['throughput']:>10.1f}{stats['error_rate']:>9.2%}"
+              f"{stats['not_modified']:>7}"
+              + ''.join(f"{stats[key]:>10.1f}" if stats[key] is not None else f"{'-':>10}"
+                        for key in ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms')))
+    errors = {step: {status: count for status, count in stats['statuses'].items() if not status.startswith(('2', '3'))}
+              for step, stats in report['steps'].items()}
+    errors = {step: statuses for step, statuses in errors.items() if statuses}
+    if errors:
+        print('errors:', json.dumps(errors))
+    if 'server' in report:
+        pool = report['server']['pool']
+        cache = report['server']['result_cache']
+        print(f"pool: max {pool['max_size']}, {pool['checkouts']} checkouts, {pool['timeouts']} timeouts; "
+              f"result cache: {cache['hits']} hits, {cache['misses']} misses")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server; default: start the app in-process.')
+    parser.add_argument('--scale', choices=SCALES, default='100k', help='Seeded database for the in-process app.')
+    parser.add_argument('--db-dir', default=os.path.join(tempfile.gettempdir(), 'vocab-bench'),
+                        help='Where seeded databases are kept between runs.')
+    parser.add_argument('--learners', type=int, help='Seeded users to log in as (default: all of the scale).')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users.')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run.')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds over which users are started.')
+    parser.add_argument('--think-ms', type=float, default=500, help='Mean pause between steps; 0 for none.')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Topic popularity skew; 0 for uniform.')
+    parser.add_argument('--correct', type=float, default=0.7, help='Share of answers submitted correctly.')
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds before a request is given up.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='Also write the report as JSON.')
+    options = parser.parse_args()
+
+    report = run(options)
+    print_report(report)
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
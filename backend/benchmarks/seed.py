@@ -0,0 +1,161 @@
+"""Deterministic SQLite databases for benchmarks and load tests
+
+The scale is the number of test results; users, vocabularies and
+leaderboard entries grow with it, topics and questions per topic do not.
+Every user's password is SEED_PASSWORD.
+
+    python -m backend.benchmarks.seed vocab.db --scale 100k
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+import bcrypt
+from backend.config.config import HASHER_CONFIG
+from backend.database.database import get_engine, set_engine
+from backend.database.engine import Engine
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+TOPICS = 50
+TESTS_PER_TOPIC = 20
+SEED_PASSWORD = 'Learner#2025'
+BATCH_SIZE = 10_000
+
+WORDS = ['apple', 'bridge', 'candle', 'desert', 'engine', 'forest', 'garden', 'harbor', 'island', 'jacket',
+         'kettle', 'ladder', 'meadow', 'needle', 'orange', 'pencil', 'rabbit', 'saddle', 'tunnel', 'valley']
+MEANINGS = ['quả táo', 'cây cầu', 'cây nến', 'sa mạc', 'động cơ', 'khu rừng', 'khu vườn', 'bến cảng', 'hòn đảo',
+            'áo khoác', 'ấm đun nước', 'cái thang', 'đồng cỏ', 'cây kim', 'quả cam', 'bút chì', 'con thỏ',
+            'yên ngựa', 'đường hầm', 'thung lũng']
+
+def learner_count(results: int) -> int:
+    """Users seeded for a number of test results; they are learner1 ... learnerN"""
+    return max(results // 20, 50)
+
+def topic_weights(topics: int, skew: float = 1.1) -> list:
+    """Cumulative Zipf weights: topic 1 is the most played"""
+    total, weights = 0.0, []
+    for rank in range(1, topics + 1):
+        total += 1 / rank ** skew
+        weights.append(total)
+    return weights
+
+def _insert(connection, query: str, rows) -> None:
+    cursor = connection.cursor()
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(query, batch)
+                batch = []
+        if batch:
+            cursor.executemany(query, batch)
+        connection.commit()
+    finally:
+        cursor.close()
+
+def seed_database(path: str, results: int, seed: int = 42) -> Dict[str, int]:
+    """Create and fill a SQLite database at ``path``; it becomes the process-wide engine"""
+    from backend.dao.leaderboards.leaderboard_dao import LeaderboardDAO
+    from backend.dao.test_results.test_result_dao import TestResultDAO
+
+    rnd = random.Random(seed)
+    users = learner_count(results)
+    vocabularies = max(results // 10, TOPICS * 10)
+    now = datetime.now().replace(microsecond=0)
+    # One hash at the configured cost, so logins cost what they do in production
+    password = bcrypt.hashpw(SEED_PASSWORD.encode('utf-8'),
+                             bcrypt.gensalt(rounds=HASHER_CONFIG['rounds'], prefix=b'2a')).decode('utf-8')
+
+    engine = Engine(f'sqlite:///{path}')
+    engine.create_schema()
+    set_engine(engine)
+
+    with engine.connection() as connection:
+        _insert(connection, "INSERT INTO users (id, username, password, email, created_at) VALUES (%s, %s, %s, %s, %s)",
+                ((n, f'learner{n}', password, f'learner{n}@example.com', now) for n in range(1, users + 1)))
+        _insert(connection, "INSERT INTO vocabulary_topics (id, name, description) VALUES (%s, %s, %s)",
+                ((n, f'Topic {n}', f'Benchmark topic {n}') for n in range(1, TOPICS + 1)))
+        _insert(connection, "INSERT INTO vocabularies (topic_id, word, meaning, phonetic) VALUES (%s, %s, %s, %s)",
+                ((n % TOPICS + 1, f'{WORDS[n % len(WORDS)]}{n}', MEANINGS[n % len(MEANINGS)], f'/w{n}/')
+                 for n in range(vocabularies)))
+        _insert(connection, """
+            INSERT INTO tests (topic_id, question, correct_answer, option1, option2, option3)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, ((topic_id, f'Meaning of "{WORDS[n]}"?', MEANINGS[n], MEANINGS[(n + 1) % 20],
+               MEANINGS[(n + 2) % 20], MEANINGS[(n + 3) % 20])
+              for topic_id in range(1, TOPICS + 1) for n in range(TESTS_PER_TOPIC)))
+
+        weights = topic_weights(TOPICS)
+        _insert(connection, """
+            INSERT INTO test_results (user_id, topic_id, score, completion_time, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+        """, ((rnd.randint(1, users), rnd.choices(range(1, TOPICS + 1), cum_weights=weights)[0],
+               rnd.randint(0, TESTS_PER_TOPIC), rnd.randint(30, 600),
+               now - timedelta(seconds=rnd.randint(0, 180 * 86400)))
+              for _ in range(results)))
+
+    TestResultDAO().rebuild_statistics()
+    LeaderboardDAO().rebuild_from_results()
+    return {'users': users, 'topics': TOPICS, 'vocabularies': vocabularies,
+            'tests': TOPICS * TESTS_PER_TOPIC, 'test_results': results}
+
+def seeded_copy(directory: str, scale: str, destination: str) -> str:
+    """Copy the seeded database for ``scale`` to ``destination``, seeding it first if needed
+
+    Seeding 1M results takes a while, so each scale is built once per
+    directory and copied for every run that writes to it.
+    """
+    os.makedirs(directory, exist_ok=True)
+    template = os.path.join(directory, f'seed-{scale}.db')
+    if not os.path.exists(template):
+        building = template + '.building'
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(building + suffix):
+                os.remove(building + suffix)
+        seed_database(building, SCALES[scale])
+        get_engine().dispose()
+        os.replace(_compact(building), template)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(destination + suffix):
+            os.remove(destination + suffix)
+    source, target = sqlite3.connect(template), sqlite3.connect(destination)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return destination
+
+def _compact(path: str) -> str:
+    """Fold the write-ahead log into the database file"""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        connection.close()
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--scale', choices=SCALES, default='100k')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    started = time.perf_counter()
+    counts = seed_database(args.path, SCALES[args.scale], args.seed)
+    get_engine().dispose()
+    _compact(args.path)
+    print(', '.join(f"{count} {name}" for name, count in counts.items()),
+          f"in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Latency and memory of the vocabulary suggester at scale
+
+Builds a VocabularySuggester over synthetic vocabularies (one word entry
+and one Vietnamese meaning entry each, so 500k vocabularies give 1M
+entries), then times random prefix lookups. No database is needed.
+
+    python -m backend.benchmarks.suggest_benchmark --entries 1000000
+"""
+import argparse
+import random
+import time
+from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+from backend.dao.vocabularies.vocabulary_suggester import VocabularySuggester
+
+ENGLISH_SYLLABLES = ['ba', 'con', 'de', 'ex', 'fi', 'gra', 'hel', 'in', 'jo', 'ka', 'lo', 'mi',
+                     'na', 'or', 'pre', 'qui', 're', 'sta', 'ter', 'un', 'vi', 'wor', 'yo', 'ze']
+VIETNAMESE_SYLLABLES = ['cảm', 'ơn', 'xin', 'chào', 'đường', 'nhà', 'học', 'sinh', 'bàn', 'ghế',
+                        'trường', 'nước', 'người', 'việt', 'tiếng', 'anh', 'mới', 'cũ', 'đẹp', 'xấu']
+
+def make_vocabularies(count: int, seed: int = 42):
+    rnd = random.Random(seed)
+    for vocabulary_id in range(1, count + 1):
+        word = ''.join(rnd.choice(ENGLISH_SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        meaning = ' '.join(rnd.choice(VIETNAMESE_SYLLABLES) for _ in range(rnd.randint(1, 3)))
+        yield VocabularyEntity(vocabulary_id, 1, word, meaning)
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def run(entries: int, lookups: int, limit: int, writes: int, seed: int = 42) -> dict:
+    vocabularies = list(make_vocabularies(entries // 2, seed))
+    suggester = VocabularySuggester()
+
+    started = time.perf_counter()
+    suggester.load(vocabularies)
+    build_seconds = time.perf_counter() - started
+
+    # Some writes after the load, so lookups also merge recent entries
+    for vocabulary in make_vocabularies(writes, seed + 1):
+        vocabulary.id += len(vocabularies)
+        suggester.add(vocabulary)
+
+    rnd = random.Random(seed)
+    prefixes = []
+    for _ in range(lookups):
+        vocabulary = rnd.choice(vocabularies)
+        text = vocabulary.word if rnd.random() < 0.5 else vocabulary.meaning
+        prefixes.append(text[:rnd.randint(1, min(len(text), 6))])
+
+    timings = []
+    results = 0
+    for prefix in prefixes:
+        started = time.perf_counter()
+        results += len(suggester.suggest(prefix, limit))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    return {
+        'entries': len(suggester),
+        'build_seconds': build_seconds,
+        'memory_mb': suggester.memory_bytes() / 2 ** 20,
+        'bytes_per_entry': suggester.memory_bytes() / max(len(suggester), 1),
+        'lookups': lookups,
+        'avg_results': results / max(lookups, 1),
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'max_ms': timings[-1] * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--writes', type=int, default=1000)
+    args = parser.parse_args()
+
+    report = run(args.entries, args.lookups, args.limit, args.writes)
+    for name, value in report.items():
+        print(f"{name:>16}: {value:.3f}" if isinstance(value, float) else f"{name:>16}: {value}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Token handling and input validation on the request path"""
+import pytest
+from backend.api.auth import decode_jwt_token, generate_jwt_token
+from backend.utils import validation
+
+REGISTRATION = {'username': 'learner_42', 'email': 'learner42@example.com', 'password': 'Learner#2025'}
+
+def test_jwt_encode(bench):
+    bench(lambda: generate_jwt_token(42, 'learner_42'))
+
+def test_jwt_decode(bench):
+    token = generate_jwt_token(42, 'learner_42')
+    bench(lambda: decode_jwt_token(token))
+
+VALIDATORS = {
+    'validate_email': ('learner42@example.com',),
+    'validate_password': ('Learner#2025',),
+    'validate_username': ('learner_42',),
+    'validate_integer': ('25', 'limit', 1, 100),
+    'validate_string_length': ('Travel and tourism', 'name', 1, 255),
+    'validate_date_format': ('2025-03-14', 'date'),
+    'validate_registration_data': (REGISTRATION,),
+    'validate_login_data': ({'username': 'learner_42', 'password': 'Learner#2025'},),
+}
+
+@pytest.mark.parametrize('name', list(VALIDATORS))
+def test_validate(bench, name):
+    args = VALIDATORS[name]
+    validate = getattr(validation, name)
+    bench(lambda: validate(*args))
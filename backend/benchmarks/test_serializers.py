@@ -0,0 +1,23 @@
+"""Row and response conversions run for every listed vocabulary and question"""
+import random
+from datetime import datetime
+from backend.dao.tests.test_class import Test
+from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+
+VOCABULARY_ROW = (1042, 7, 'harbor', 'bến cảng', '/ˈhɑːr.bɚ/', datetime(2025, 3, 14, 9, 26, 53))
+
+def test_vocabulary_from_db_tuple(bench):
+    bench(lambda: VocabularyEntity.from_db_tuple(VOCABULARY_ROW))
+
+def test_vocabulary_to_dict(bench):
+    vocabulary = VocabularyEntity.from_db_tuple(VOCABULARY_ROW)
+    bench(vocabulary.to_dict)
+
+def test_vocabulary_row_to_dict(bench):
+    bench(lambda: VocabularyEntity.from_db_tuple(VOCABULARY_ROW).to_dict())
+
+def test_test_to_dict(bench):
+    # to_dict shuffles the options on every call
+    random.seed(7)
+    test = Test(311, 7, 'Meaning of "harbor"?', 'bến cảng', 'hòn đảo', 'cây cầu', 'thung lũng')
+    bench(test.to_dict)
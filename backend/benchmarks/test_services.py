@@ -0,0 +1,27 @@
+"""Service calls against the seeded database"""
+import itertools
+import pytest
+from backend.benchmarks.seed import TOPICS
+
+def _answers(services, topic_id):
+    """Every question of a topic, three quarters answered correctly"""
+    tests = services.test_service.get_tests_by_topic(topic_id)
+    return {test.id: test.correct_answer if n % 4 else test.option1 for n, test in enumerate(tests)}
+
+def test_score_answers(bench, services):
+    answers = _answers(services, 1)
+    answer_key = services.test_dao.get_answer_key(1)
+    bench(lambda: answer_key.count_correct(answers))
+
+def test_submit_test_result(bench, services):
+    answers = _answers(services, 1)
+    users = itertools.cycle(range(1, 51))
+    bench(lambda: services.test_service.submit_test_result(next(users), 1, answers, 240))
+
+def test_get_user_statistics(bench, services):
+    users = itertools.cycle(range(1, 51))
+    bench(lambda: services.leaderboard_service.get_user_statistics(next(users)))
+
+@pytest.mark.parametrize('topic_id', [1, TOPICS], ids=['hot', 'cold'])
+def test_get_topic_statistics(bench, services, topic_id):
+    bench(lambda: services.leaderboard_service.get_topic_statistics(topic_id))
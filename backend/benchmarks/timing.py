@@ -0,0 +1,49 @@
+"""Timing and baseline comparison for the pytest benchmark suite"""
+import time
+from typing import Any, Callable, Dict, List
+
+def measure(fn: Callable[[], Any], min_seconds: float = 0.3, min_samples: int = 10,
+            max_samples: int = 2000) -> Dict[str, float]:
+    """Time ``fn`` and return per-call statistics in microseconds
+
+    Fast functions are run in loops long enough (at least 100 µs) for the
+    clock to resolve; each sample is one loop divided by its length.
+    """
+    fn()
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= 1e-4 or loops >= 1_000_000:
+            break
+        loops *= 10
+
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_seconds
+    while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops)
+    samples.sort()
+
+    median = samples[len(samples) // 2]
+    return {
+        'samples': len(samples),
+        'loops': loops,
+        'min_us': samples[0] * 1e6,
+        'median_us': median * 1e6,
+        'mean_us': sum(samples) / len(samples) * 1e6,
+        'p95_us': samples[min(int(len(samples) * 0.95), len(samples) - 1)] * 1e6,
+        'ops_per_sec': 1 / median if median else 0.0
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Median of one benchmark against its baseline; slower than ``1 + tolerance`` times is a regression"""
+    ratio = current['median_us'] / baseline['median_us'] if baseline['median_us'] else 1.0
+    return {
+        'baseline_median_us': baseline['median_us'],
+        'ratio': ratio,
+        'regressed': ratio > 1 + tolerance
+    }
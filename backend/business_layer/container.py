@@ -0,0 +1,107 @@
+import threading
+from flask import current_app
+from backend.dao.users.user_dao import UserDAO
+from backend.dao.vocabularies.vocabulary_dao import VocabularyDAO
+from backend.dao.vocabulary_topics.vocabulary_topic_dao import VocabularyTopicDAO
+from backend.dao.tests.test_dao import TestDAO
+from backend.dao.test_results.test_result_dao import TestResultDAO
+from backend.dao.leaderboards.leaderboard_dao import LeaderboardDAO
+from backend.business_layer.services.user_service import UserService
+from backend.business_layer.services.vocabulary_service import VocabularyService
+from backend.business_layer.services.vocabulary_topics_service import VocabularyTopicService
+from backend.business_layer.services.test_service import TestService
+from backend.business_layer.services.test_result_service import TestResultService
+from backend.business_layer.services.leaderboard_service import LeaderboardService
+from backend.business_layer.services.content_import_service import ContentImportService
+
+EXTENSION_KEY = 'services'
+
+class ServiceContainer:
+    """DAOs and services wired once per app
+
+    Each object is built on first use and then shared by every request.
+    DAOs hold no connection of their own: each query borrows the request's
+    pooled connection through ``get_connection``, so building the container
+    never touches the database.
+    """
+
+    def __init__(self):
+        self._instances = {}
+        # Re-entrant: service factories resolve the DAOs they depend on
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    # DAOs
+    @property
+    def user_dao(self) -> UserDAO:
+        return self._get('user_dao', UserDAO)
+
+    @property
+    def vocabulary_dao(self) -> VocabularyDAO:
+        return self._get('vocabulary_dao', VocabularyDAO)
+
+    @property
+    def topic_dao(self) -> VocabularyTopicDAO:
+        return self._get('topic_dao', VocabularyTopicDAO)
+
+    @property
+    def test_dao(self) -> TestDAO:
+        return self._get('test_dao', TestDAO)
+
+    @property
+    def test_result_dao(self) -> TestResultDAO:
+        return self._get('test_result_dao', TestResultDAO)
+
+    @property
+    def leaderboard_dao(self) -> LeaderboardDAO:
+        return self._get('leaderboard_dao', LeaderboardDAO)
+
+    # Services
+    @property
+    def user_service(self) -> UserService:
+        return self._get('user_service', lambda: UserService(self.user_dao))
+
+    @property
+    def vocabulary_service(self) -> VocabularyService:
+        return self._get('vocabulary_service', lambda: VocabularyService(self.vocabulary_dao))
+
+    @property
+    def topic_service(self) -> VocabularyTopicService:
+        return self._get('topic_service', lambda: VocabularyTopicService(self.topic_dao))
+
+    @property
+    def leaderboard_service(self) -> LeaderboardService:
+        return self._get('leaderboard_service', lambda: LeaderboardService(self.leaderboard_dao))
+
+    @property
+    def test_result_service(self) -> TestResultService:
+        return self._get('test_result_service', lambda: TestResultService(self.test_result_dao))
+
+    @property
+    def test_service(self) -> TestService:
+        return self._get('test_service', lambda: TestService(
+            self.test_dao, self.test_result_service, self.leaderboard_service))
+
+    @property
+    def content_import_service(self) -> ContentImportService:
+        return self._get('content_import_service', lambda: ContentImportService(
+            self.topic_dao, self.vocabulary_dao, self.test_dao))
+
+def init_app(app) -> ServiceContainer:
+    """Attach a service container to a Flask app"""
+    container = ServiceContainer()
+    app.extensions[EXTENSION_KEY] = container
+    return container
+
+def get_services() -> ServiceContainer:
+    """Service container of the current app"""
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Optional
+from backend.utils.content_import import ImportRecord, ImportReport
+
+class IContentImportService(ABC):
+    """Interface for Content Import Service"""
+
+    @abstractmethod
+    def import_records(self, kind: str, records: Iterable[ImportRecord], dry_run: bool = False,
+                       batch_size: Optional[int] = None,
+                       progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """Validate, de-duplicate and insert topics, vocabularies or tests in batches"""
+        pass
@@ -1,17 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from backend.dao.leaderboards.leaderboard_class import Leaderboard
+from backend.dao.unit_of_work import UnitOfWork
+from backend.utils.pagination import Page
 
 class ILeaderboardService(ABC):
     """Interface for Leaderboard Service"""
     
     @abstractmethod
-    def get_topic_leaderboard(self, topic_id: int) -> List[Leaderboard]:
-        """Get leaderboard for a specific topic"""
+    def get_topic_leaderboard(self, topic_id: int, limit: int, cursor: Optional[str] = None) -> Page[Leaderboard]:
+        """Get one page of a topic's leaderboard, best average first"""
         pass
         
     @abstractmethod
-    def update_user_score(self, user_id: int, topic_id: int, score: int) -> bool:
+    def export_topic_leaderboard(self, topic_id: int) -> Iterator[Leaderboard]:
+        """Stream a topic's whole ranking, best average first"""
+        pass
+        
+    @abstractmethod
+    def update_user_score(self, user_id: int, topic_id: int, score: int,
+                          uow: Optional[UnitOfWork] = None) -> bool:
         """Update user's score in leaderboard"""
         pass
         
@@ -20,6 +28,16 @@ class ILeaderboardService(ABC):
         """Get user's rank in topic leaderboard"""
         pass
         
+    @abstractmethod
+    def get_user_percentile(self, user_id: int, topic_id: int) -> Optional[float]:
+        """Get the percentage of participants ranked below the user"""
+        pass
+        
+    @abstractmethod
+    def get_users_around(self, user_id: int, topic_id: int, window: int = 5) -> List[Leaderboard]:
+        """Get the users ranked just above and below the user"""
+        pass
+        
     @abstractmethod
     def get_top_users(self, topic_id: int, limit: int = 10) -> List[Leaderboard]:
         """Get top users in topic leaderboard"""
@@ -1,28 +1,42 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from typing import Iterator, Optional, Dict
 from backend.dao.test_results.test_result_class import TestResult
+from backend.dao.unit_of_work import UnitOfWork
+from backend.utils.pagination import Page
 
 class ITestResultService(ABC):
     """Interface for Test Result Service"""
     
     @abstractmethod
-    def get_user_results(self, user_id: int) -> List[TestResult]:
-        """Get all test results for a user"""
+    def get_user_results(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a user's test results, newest first"""
         pass
         
     @abstractmethod
-    def get_topic_results(self, topic_id: int) -> List[TestResult]:
-        """Get all test results for a topic"""
+    def get_topic_results(self, topic_id: int, limit: int, cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a topic's test results, newest first"""
         pass
         
     @abstractmethod
-    def get_user_topic_results(self, user_id: int, topic_id: int) -> List[TestResult]:
-        """Get all test results for a user in a specific topic"""
+    def get_user_topic_results(self, user_id: int, topic_id: int, limit: int,
+                               cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a user's test results in a specific topic, newest first"""
+        pass
+        
+    @abstractmethod
+    def export_topic_results(self, topic_id: int) -> Iterator[TestResult]:
+        """Stream every test result of a topic, newest first"""
+        pass
+        
+    @abstractmethod
+    def export_user_results(self, user_id: int) -> Iterator[TestResult]:
+        """Stream every test result of a user, newest first"""
         pass
         
     @abstractmethod
     def save_result(self, user_id: int, topic_id: int, score: int,
-                   total_questions: int, completion_time: int) -> Optional[TestResult]:
+                   total_questions: int, completion_time: int,
+                   uow: Optional[UnitOfWork] = None) -> Optional[TestResult]:
         """Save a test result"""
         pass
         
@@ -10,6 +10,11 @@ class ITestService(ABC):
         """Get all tests in a topic"""
         pass
         
+    @abstractmethod
+    def get_quiz(self, topic_id: int, size: int, seed: Optional[int] = None) -> List[Test]:
+        """Draw a quiz of up to ``size`` distinct questions from a topic"""
+        pass
+        
     @abstractmethod
     def get_test_by_id(self, test_id: int) -> Optional[Test]:
         """Get test by ID"""
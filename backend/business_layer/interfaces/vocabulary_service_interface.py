@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
 
 class IVocabularyService(ABC):
@@ -35,4 +35,15 @@ class IVocabularyService(ABC):
     @abstractmethod
     def search_vocabularies(self, keyword: str) -> List[VocabularyEntity]:
         """Search vocabularies by keyword"""
-        pass 
\ No newline at end of file
+        pass
+        
+    @abstractmethod
+    def search_vocabularies_page(self, keyword: str, page: int, per_page: int,
+                                 topic_id: Optional[int] = None) -> Dict:
+        """Search vocabularies and return one page of ranked matches"""
+        pass
+        
+    @abstractmethod
+    def suggest_vocabularies(self, prefix: str, limit: int) -> List[Dict]:
+        """Autocomplete a prefix from vocabulary words and meanings"""
+        pass
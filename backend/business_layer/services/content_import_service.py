@@ -0,0 +1,164 @@
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import logging
+import time
+from backend.business_layer.interfaces.content_import_service_interface import IContentImportService
+from backend.config.config import IMPORT_CONFIG
+from backend.dao.tests.test_class import Test
+from backend.dao.tests.test_dao import TestDAO
+from backend.dao.vocabularies.vocabulary_class import Vocabulary
+from backend.dao.vocabularies.vocabulary_dao import VocabularyDAO
+from backend.dao.vocabulary_topics.vocabulary_topic_dao import VocabularyTopicDAO
+from backend.utils.content_import import IMPORT_KINDS, ImportRecord, ImportReport
+from backend.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+def _text(record: Dict, name: str) -> str:
+    value = record.get(name)
+    return str(value).strip() if value is not None else ''
+
+def _max_length(value: str, name: str, limit: int) -> None:
+    if len(value) > limit:
+        raise ValueError(f"{name} must be at most {limit} characters")
+
+class ContentImportService(IContentImportService):
+    """Implementation of Content Import Service
+
+    Records are validated with the same rules as single-row writes,
+    de-duplicated against the database and the rest of the file, and
+    inserted with executemany in batches, one transaction per batch.
+    """
+
+    def __init__(self, topic_dao: VocabularyTopicDAO, vocabulary_dao: VocabularyDAO, test_dao: TestDAO):
+        self.topic_dao = topic_dao
+        self.vocabulary_dao = vocabulary_dao
+        self.test_dao = test_dao
+
+    def import_records(self, kind: str, records: Iterable[ImportRecord], dry_run: bool = False,
+                       batch_size: Optional[int] = None,
+                       progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """Validate, de-duplicate and insert topics, vocabularies or tests in batches"""
+        if kind not in IMPORT_KINDS:
+            raise ValidationError(f"kind must be one of: {', '.join(IMPORT_KINDS)}")
+        if batch_size is None:
+            batch_size = IMPORT_CONFIG['batch_size']
+        if not 1 <= batch_size <= IMPORT_CONFIG['max_batch_size']:
+            raise ValidationError(f"batch_size must be between 1 and {IMPORT_CONFIG['max_batch_size']}")
+
+        started = time.perf_counter()
+        report = ImportReport(kind, dry_run)
+        if kind == 'topics':
+            keys = {topic.name.strip().casefold() for topic in self.topic_dao.get_all()}
+            self._run(report, records, self._parse_topic, keys, self.topic_dao.bulk_create,
+                      batch_size, progress)
+        elif kind == 'vocabularies':
+            resolve = self._topic_resolver()
+            self._run(report, records, lambda record: self._parse_vocabulary(record, resolve),
+                      self.vocabulary_dao.get_word_keys(), self.vocabulary_dao.bulk_create,
+                      batch_size, progress)
+            if report.inserted and not dry_run:
+                # One rebuild in the background instead of an index update per row;
+                # if one is already running, it runs again once it is done
+                self.vocabulary_dao.refresh_search_index()
+        else:
+            resolve = self._topic_resolver()
+            self._run(report, records, lambda record: self._parse_test(record, resolve),
+                      self.test_dao.get_question_keys(), self.test_dao.bulk_create,
+                      batch_size, progress)
+        report.seconds = time.perf_counter() - started
+        logger.info("Imported %s: %s read, %s inserted, %s duplicates, %s rejected in %.2fs%s",
+                    kind, report.read, report.inserted, report.duplicates, report.rejected,
+                    report.seconds, " (dry run)" if dry_run else "")
+        return report
+
+    def _run(self, report: ImportReport, records: Iterable[ImportRecord],
+             parse: Callable[[Dict], Tuple[Hashable, tuple]], keys: Set[Hashable],
+             insert: Callable[[List[tuple]], int], batch_size: int,
+             progress: Optional[Callable[[ImportReport], None]]) -> None:
+        max_errors = IMPORT_CONFIG['max_errors']
+        batch: List[tuple] = []
+
+        def flush():
+            report.inserted += len(batch) if report.dry_run else insert(batch)
+            report.batches += 1
+            batch.clear()
+            if progress:
+                progress(report)
+
+        for line, record in records:
+            report.read += 1
+            if record is None:
+                report.reject(line, "Malformed record", max_errors)
+                continue
+            try:
+                key, row = parse(record)
+            except ValueError as e:
+                report.reject(line, str(e), max_errors)
+                continue
+            if key in keys:
+                report.duplicates += 1
+                continue
+            keys.add(key)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    def _topic_resolver(self) -> Callable[[Dict], int]:
+        """Maps a record's topic_id, or its topic name, to an existing topic ID"""
+        topics = self.topic_dao.get_all()
+        ids = {topic.id for topic in topics}
+        by_name = {topic.name.strip().casefold(): topic.id for topic in topics}
+
+        def resolve(record: Dict) -> int:
+            topic_id = _text(record, 'topic_id')
+            if topic_id:
+                if not topic_id.isdigit() or int(topic_id) not in ids:
+                    raise ValueError(f"Unknown topic_id {topic_id}")
+                return int(topic_id)
+            name = _text(record, 'topic')
+            if not name:
+                raise ValueError("topic_id or topic is required")
+            if name.casefold() not in by_name:
+                raise ValueError(f"Unknown topic {name}")
+            return by_name[name.casefold()]
+        return resolve
+
+    @staticmethod
+    def _parse_topic(record: Dict) -> Tuple[Hashable, tuple]:
+        name = _text(record, 'name')
+        if not name:
+            raise ValueError("Name is required")
+        _max_length(name, 'name', 255)
+        return name.casefold(), (name, _text(record, 'description'))
+
+    @staticmethod
+    def _parse_vocabulary(record: Dict, resolve: Callable[[Dict], int]) -> Tuple[Hashable, tuple]:
+        vocabulary = Vocabulary(
+            topic_id=resolve(record),
+            word=_text(record, 'word'),
+            meaning=_text(record, 'meaning'),
+            phonetic=_text(record, 'phonetic') or None
+        )
+        vocabulary.validate()
+        _max_length(vocabulary.word, 'word', 255)
+        _max_length(vocabulary.phonetic or '', 'phonetic', 100)
+        return ((vocabulary.topic_id, vocabulary.word.casefold()),
+                (vocabulary.topic_id, vocabulary.word, vocabulary.meaning, vocabulary.phonetic))
+
+    @staticmethod
+    def _parse_test(record: Dict, resolve: Callable[[Dict], int]) -> Tuple[Hashable, tuple]:
+        test = Test(
+            id=None,
+            topic_id=resolve(record),
+            question=_text(record, 'question'),
+            correct_answer=_text(record, 'correct_answer'),
+            option1=_text(record, 'option1'),
+            option2=_text(record, 'option2'),
+            option3=_text(record, 'option3')
+        )
+        if not test.validate():
+            raise ValueError("question, correct_answer, option1, option2 and option3 are required")
+        return ((test.topic_id, test.question.casefold()),
+                (test.topic_id, test.question, test.correct_answer, test.option1, test.option2, test.option3))
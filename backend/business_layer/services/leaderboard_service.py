@@ -1,7 +1,11 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from backend.dao.leaderboards.leaderboard_dao import LeaderboardDAO
 from backend.business_layer.interfaces.leaderboard_service_interface import ILeaderboardService
 from backend.dao.leaderboards.leaderboard_class import Leaderboard
+from backend.dao.unit_of_work import UnitOfWork
+from backend.config.config import CACHE_CONFIG
+from backend.utils.cache import ResultCache, cached, result_cache
+from backend.utils.pagination import Page, decode_cursor, paginate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,31 +13,37 @@ logger = logging.getLogger(__name__)
 class LeaderboardService(ILeaderboardService):
     """Implementation of Leaderboard Service"""
     
-    def __init__(self, leaderboard_dao: LeaderboardDAO):
+    def __init__(self, leaderboard_dao: LeaderboardDAO, cache: ResultCache = result_cache):
         self.leaderboard_dao = leaderboard_dao
+        self.cache = cache
         
-    def get_topic_leaderboard(self, topic_id: int) -> List[Leaderboard]:
-        """Get leaderboard for a specific topic"""
-        entities = self.leaderboard_dao.get_entries_by_topic(topic_id)
-        return [Leaderboard.from_entity(entity) for entity in entities]
+    def get_topic_leaderboard(self, topic_id: int, limit: int, cursor: Optional[str] = None) -> Page[Leaderboard]:
+        """Get one page of a topic's leaderboard, best average first"""
+        entities = self.leaderboard_dao.get_entries_by_topic(topic_id, limit + 1,
+                                                             decode_cursor(cursor, float, int))
+        page = paginate(entities, limit, lambda entity: (entity.average_score, entity.id))
+        return Page([Leaderboard.from_entity(entity) for entity in page.items], page.next_cursor)
         
-    def update_user_score(self, user_id: int, topic_id: int, score: int) -> bool:
+    def export_topic_leaderboard(self, topic_id: int) -> Iterator[Leaderboard]:
+        """Stream a topic's whole ranking, best average first"""
+        # Tied averages share a rank, as in get_user_rank
+        position, rank, previous_score = 0, 0, None
+        for batch in self.leaderboard_dao.stream_entries_by_topic(topic_id):
+            for entity in batch:
+                position += 1
+                if entity.average_score != previous_score:
+                    rank, previous_score = position, entity.average_score
+                entry = Leaderboard.from_entity(entity)
+                entry.rank = rank
+                yield entry
+        
+    def update_user_score(self, user_id: int, topic_id: int, score: int,
+                          uow: Optional[UnitOfWork] = None) -> bool:
         """Update user's score in leaderboard"""
         try:
-            # Get existing entry
-            entity = self.leaderboard_dao.get_entry_by_user_and_topic(user_id, topic_id)
-            
-            if entity:
-                # Update existing entry
-                return self.leaderboard_dao.update_score(entity.id, score)
-            else:
-                # Create new entry
-                entity = self.leaderboard_dao.create_entry(
-                    user_id=user_id,
-                    topic_id=topic_id,
-                    score=score
-                )
-                return entity is not None
+            # One upsert creates the entry or adds to it
+            self.leaderboard_dao.record_score(user_id, topic_id, score, uow)
+            return True
         except Exception as e:
             logger.error(f"Error updating user score: {str(e)}")
             return False
@@ -42,9 +52,27 @@ class LeaderboardService(ILeaderboardService):
         """Get user's rank in topic leaderboard"""
         return self.leaderboard_dao.get_user_rank(user_id, topic_id)
         
+    def get_user_percentile(self, user_id: int, topic_id: int) -> Optional[float]:
+        """Get the percentage of participants ranked below the user"""
+        return self.leaderboard_dao.get_user_percentile(user_id, topic_id)
+        
+    def get_users_around(self, user_id: int, topic_id: int, window: int = 5) -> List[Leaderboard]:
+        """Get the users ranked just above and below the user"""
+        entries = self.leaderboard_dao.get_entries_around_user(user_id, topic_id, window)
+        return [Leaderboard(
+            user_id=entry['user_id'],
+            topic_id=topic_id,
+            total_score=entry['total_score'],
+            tests_completed=entry['tests_completed'],
+            average_score=entry['average_score'],
+            last_updated=entry['last_updated'],
+            rank=entry['rank']
+        ) for entry in entries]
+        
+    @cached(tags=('leaderboard:{topic_id}',), ttl=CACHE_CONFIG['leaderboard_ttl'])
     def get_top_users(self, topic_id: int, limit: int = 10) -> List[Leaderboard]:
         """Get top users in topic leaderboard"""
-        entries = self.leaderboard_dao.get_top_scores(topic_id, limit)
+        entries = self.leaderboard_dao.get_ranked_entries(topic_id, limit)
         return [Leaderboard(
             user_id=entry['user_id'],
             topic_id=topic_id,
@@ -57,10 +85,10 @@ class LeaderboardService(ILeaderboardService):
         
     def get_user_statistics(self, user_id: int) -> Dict:
         """Get user's leaderboard statistics across all topics"""
-        # Get all user's entries
-        entries = self.leaderboard_dao.get_entries_by_user(user_id)
+        # Rank and participant count for every topic come back in one query
+        standings = self.leaderboard_dao.get_user_standings(user_id)
         
-        if not entries:
+        if not standings:
             return {
                 'topics': [],
                 'total_topics_participated': 0,
@@ -75,15 +103,15 @@ class LeaderboardService(ILeaderboardService):
         total_score = 0
         best_rank = float('inf')
         
-        for entry in entries:
-            rank = self.get_user_rank(user_id, entry.topic_id)
-            total_participants = len(self.get_topic_leaderboard(entry.topic_id))
+        for standing in standings:
+            rank = standing['rank']
+            total_participants = standing['total_participants']
             
             topic_stat = {
-                'topic_id': entry.topic_id,
-                'total_score': entry.total_score,
-                'tests_completed': entry.tests_completed,
-                'average_score': entry.average_score,
+                'topic_id': standing['topic_id'],
+                'total_score': standing['total_score'],
+                'tests_completed': standing['tests_completed'],
+                'average_score': standing['average_score'],
                 'rank': rank,
                 'total_participants': total_participants,
                 'percentile': Leaderboard.calculate_percentile(rank, total_participants) if rank else 0
@@ -91,14 +119,14 @@ class LeaderboardService(ILeaderboardService):
             topic_stats.append(topic_stat)
             
             # Update aggregates
-            total_tests += entry.tests_completed
-            total_score += entry.total_score
+            total_tests += standing['tests_completed']
+            total_score += standing['total_score']
             if rank and rank < best_rank:
                 best_rank = rank
         
         return {
             'topics': topic_stats,
-            'total_topics_participated': len(entries),
+            'total_topics_participated': len(standings),
             'best_rank': best_rank if best_rank != float('inf') else None,
             'total_tests_completed': total_tests,
             'average_score_overall': total_score / total_tests if total_tests > 0 else 0
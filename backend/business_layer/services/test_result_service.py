@@ -1,8 +1,10 @@
-from typing import List, Optional, Dict
+from typing import Iterator, Optional, Dict
 import logging
 from backend.dao.test_results.test_result_dao import TestResultDAO
 from backend.business_layer.interfaces.test_result_service_interface import ITestResultService
 from backend.dao.test_results.test_result_class import TestResult
+from backend.dao.unit_of_work import UnitOfWork
+from backend.utils.pagination import Page, decode_cursor, paginate
 
 logger = logging.getLogger(__name__)
 
@@ -20,23 +22,42 @@ class TestResultService(ITestResultService):
         self.test_result_dao = test_result_dao
         self.leaderboard_service = leaderboard_service
         
-    def get_user_results(self, user_id: int) -> List[TestResult]:
-        """Get all test results for a user"""
-        entities = self.test_result_dao.get_by_user(user_id)
-        return [TestResult.from_entity(entity) for entity in entities]
+    def get_user_results(self, user_id: int, limit: int, cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a user's test results, newest first"""
+        entities = self.test_result_dao.get_by_user(user_id, limit + 1, decode_cursor(cursor, str, int))
+        return self._page(entities, limit)
         
-    def get_topic_results(self, topic_id: int) -> List[TestResult]:
-        """Get all test results for a topic"""
-        entities = self.test_result_dao.get_by_topic(topic_id)
-        return [TestResult.from_entity(entity) for entity in entities]
+    def get_topic_results(self, topic_id: int, limit: int, cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a topic's test results, newest first"""
+        entities = self.test_result_dao.get_by_topic(topic_id, limit + 1, decode_cursor(cursor, str, int))
+        return self._page(entities, limit)
         
-    def get_user_topic_results(self, user_id: int, topic_id: int) -> List[TestResult]:
-        """Get all test results for a user in a specific topic"""
-        entities = self.test_result_dao.get_by_user_and_topic(user_id, topic_id)
-        return [TestResult.from_entity(entity) for entity in entities]
+    def get_user_topic_results(self, user_id: int, topic_id: int, limit: int,
+                               cursor: Optional[str] = None) -> Page[TestResult]:
+        """Get one page of a user's test results in a specific topic, newest first"""
+        entities = self.test_result_dao.get_by_user_and_topic(user_id, topic_id, limit + 1,
+                                                              decode_cursor(cursor, str, int))
+        return self._page(entities, limit)
+        
+    @staticmethod
+    def _page(entities, limit: int) -> Page[TestResult]:
+        """Page results fetched one past ``limit``; the cursor is (created_at, id)"""
+        page = paginate(entities, limit, lambda entity: (entity.created_at, entity.id))
+        return Page([TestResult.from_entity(entity) for entity in page.items], page.next_cursor)
+        
+    def export_topic_results(self, topic_id: int) -> Iterator[TestResult]:
+        """Stream every test result of a topic, newest first"""
+        for batch in self.test_result_dao.stream_by_topic(topic_id):
+            yield from (TestResult.from_entity(entity) for entity in batch)
+        
+    def export_user_results(self, user_id: int) -> Iterator[TestResult]:
+        """Stream every test result of a user, newest first"""
+        for batch in self.test_result_dao.stream_by_user(user_id):
+            yield from (TestResult.from_entity(entity) for entity in batch)
         
     def save_result(self, user_id: int, topic_id: int, score: int,
-                     total_questions: int, completion_time: int) -> Optional[TestResult]:
+                     total_questions: int, completion_time: int,
+                     uow: Optional[UnitOfWork] = None) -> Optional[TestResult]:
         """
         Save a test result to the database.
 
@@ -46,6 +67,7 @@ class TestResultService(ITestResultService):
             score (int): The score achieved on the test
             total_questions (int): The total number of questions in the test (used for score calculation)
             completion_time (int): The time taken to complete the test in seconds
+            uow (UnitOfWork): Optional transaction to save the result in
 
         Returns:
             Optional[TestResult]: The created test result entity, or None if creation failed
@@ -58,10 +80,11 @@ class TestResultService(ITestResultService):
                 user_id=user_id,
                 topic_id=topic_id,
                 score=percentage_score,
-                completion_time=completion_time
+                completion_time=completion_time,
+                uow=uow
             )
             if result and self.leaderboard_service:
-                self.leaderboard_service.update_user_score(user_id, topic_id, percentage_score)
+                self.leaderboard_service.update_user_score(user_id, topic_id, percentage_score, uow)
             return TestResult.from_entity(result) if result else None
         except Exception as e:
             logger.error(f"Error saving test result: {str(e)}")
@@ -69,44 +92,18 @@ class TestResultService(ITestResultService):
         
     def get_user_statistics(self, user_id: int) -> Dict:
         """Get user's test statistics"""
-        results = self.get_user_results(user_id)
-        if not results:
-            return {
-                'total_tests': 0,
-                'average_score': 0,
-                'total_correct_answers': 0,
-                'average_completion_time': 0
-            }
-            
-        total_tests = len(results)
-        total_score = sum(result.score for result in results)
-        total_completion_time = sum(result.completion_time for result in results)
-        
-        return {
-            'total_tests': total_tests,
-            'average_score': total_score / total_tests if total_tests > 0 else 0,
-            'total_correct_answers': total_score,
-            'average_completion_time': total_completion_time / total_tests if total_tests > 0 else 0
-        }
+        return self._summarize(self.test_result_dao.get_user_statistics(user_id))
         
     def get_topic_statistics(self, topic_id: int) -> Dict:
         """Get topic's test statistics"""
-        results = self.get_topic_results(topic_id)
-        if not results:
-            return {
-                'total_tests': 0,
-                'average_score': 0,
-                'total_correct_answers': 0,
-                'average_completion_time': 0
-            }
-            
-        total_tests = len(results)
-        total_score = sum(result.score for result in results)
-        total_completion_time = sum(result.completion_time for result in results)
+        return self._summarize(self.test_result_dao.get_topic_statistics(topic_id))
         
+    @staticmethod
+    def _summarize(stats: Dict) -> Dict:
+        """Shape a rollup row for API responses"""
         return {
-            'total_tests': total_tests,
-            'average_score': total_score / total_tests if total_tests > 0 else 0,
-            'total_correct_answers': total_score,
-            'average_completion_time': total_completion_time / total_tests if total_tests > 0 else 0
-        } 
\ No newline at end of file
+            'total_tests': stats['total_tests'],
+            'average_score': stats['average_score'],
+            'total_correct_answers': stats['total_score'],
+            'average_completion_time': stats['average_time']
+        }
@@ -4,22 +4,32 @@ from backend.business_layer.interfaces.test_service_interface import ITestServic
 from backend.business_layer.interfaces.test_result_service_interface import ITestResultService
 from backend.business_layer.interfaces.leaderboard_service_interface import ILeaderboardService
 from backend.dao.tests.test_class import Test
-from backend.utils.exceptions import ValidationError, ResourceNotFoundError
+from backend.dao.unit_of_work import UnitOfWork
+from backend.utils.cache import ResultCache, cached, result_cache
+from backend.utils.exceptions import ValidationError, ResourceNotFoundError, DatabaseError
 
 class TestService(ITestService):
     """Implementation of Test Service"""
     
     def __init__(self, test_dao: TestDAO, test_result_service: ITestResultService,
-                 leaderboard_service: ILeaderboardService):
+                 leaderboard_service: ILeaderboardService, cache: ResultCache = result_cache):
         self.test_dao = test_dao
         self.test_result_service = test_result_service
         self.leaderboard_service = leaderboard_service
+        self.cache = cache
         
+    @cached(tags=('topic:{topic_id}',))
     def get_tests_by_topic(self, topic_id: int) -> List[Test]:
         """Get all tests in a topic"""
         entities = self.test_dao.get_tests_by_topic(topic_id)
         return [Test.from_entity(entity) for entity in entities]
         
+    def get_quiz(self, topic_id: int, size: int, seed: Optional[int] = None) -> List[Test]:
+        """Draw a quiz of up to ``size`` distinct questions from a topic"""
+        entities = self.test_dao.get_random_tests(topic_id, size, seed)
+        return [Test.from_entity(entity) for entity in entities]
+        
+    @cached(tags=('test:{test_id}',))
     def get_test_by_id(self, test_id: int) -> Optional[Test]:
         """Get test by ID"""
         entity = self.test_dao.get_test_by_id(test_id)
@@ -90,47 +100,40 @@ class TestService(ITestService):
     def submit_test_result(self, user_id: int, topic_id: int, answers: Dict[int, str],
                           completion_time: int) -> Dict:
         """Submit test results and return score"""
-        # Get all tests for topic
-        tests = self.get_tests_by_topic(topic_id)
-        if not tests:
+        # Score against the cached answer key of the topic
+        answer_key = self.test_dao.get_answer_key(topic_id)
+        if not answer_key.question_count:
             raise ResourceNotFoundError('No tests found for this topic')
             
         # Validate that all answered test IDs exist in the topic
-        test_ids = {test.id for test in tests}
-        invalid_test_ids = set(answers.keys()) - test_ids
+        invalid_test_ids = answer_key.unknown_ids(answers.keys())
         if invalid_test_ids:
             raise ValidationError(f'Invalid test IDs: {invalid_test_ids}')
             
         # Calculate score
-        total_questions = len(tests)
-        correct_answers = 0
-        
-        # Create a map of test_id to Test object for easier lookup
-        test_map = {test.id: test for test in tests}
-        
-        # Check each answer
-        for test_id, answer in answers.items():
-            test = test_map.get(test_id)
-            if test and test.check_answer(answer):
-                correct_answers += 1
+        total_questions = answer_key.question_count
+        correct_answers = answer_key.count_correct(answers)
                 
         # Calculate percentage score
         score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
         
-        # Save test result
-        result = self.test_result_service.save_result(
-            user_id=user_id,
-            topic_id=topic_id,
-            score=correct_answers,
-            total_questions=total_questions,
-            completion_time=completion_time
-        )
-        
-        if not result:
-            raise ValidationError('Failed to save test result')
+        # The result, its rollups and the leaderboard entry commit in one transaction
+        with UnitOfWork() as uow:
+            result = self.test_result_service.save_result(
+                user_id=user_id,
+                topic_id=topic_id,
+                score=correct_answers,
+                total_questions=total_questions,
+                completion_time=completion_time,
+                uow=uow
+            )
             
-        # Update leaderboard
-        # self.leaderboard_service.update_user_score(user_id, topic_id, score)
+            if not result:
+                raise ValidationError('Failed to save test result')
+                
+            # Update leaderboard
+            if not self.leaderboard_service.update_user_score(user_id, topic_id, result.score, uow):
+                raise DatabaseError('Failed to update leaderboard')
         
         return {
             'score': score,
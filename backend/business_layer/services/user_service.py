@@ -3,16 +3,18 @@ from datetime import datetime
 import logging
 from backend.dao.users.user_dao import UserDAO
 from backend.dao.users.user_class import User
-from backend.utils.exceptions import ValidationError
+from backend.utils.exceptions import ValidationError, CapacityError
 from backend.business_layer.interfaces.user_service_interface import IUserService
+from backend.utils.credential_hasher import CredentialHasher, credential_hasher
 
 logger = logging.getLogger(__name__)
 
 class UserService(IUserService):
     """Implementation of User Service"""
     
-    def __init__(self, user_dao: UserDAO):
+    def __init__(self, user_dao: UserDAO, hasher: CredentialHasher = credential_hasher):
         self.user_dao = user_dao
+        self.hasher = hasher
         
     def register(self, username: str, password: str, email: str) -> Optional[User]:
         """Register a new user"""
@@ -20,11 +22,11 @@ class UserService(IUserService):
         if self.user_dao.get_by_username(username):
             return None
             
-        # Create new user
+        # Create new user; bcrypt runs in the hasher pool, off the request thread
         user = User(
             id=None,
             username=username,
-            password=password,  # Password will be hashed in User class
+            password=self.hasher.hash(password),
             email=email,
             created_at=datetime.now()
         )
@@ -42,21 +44,24 @@ class UserService(IUserService):
             # Get user by username
             user = self.user_dao.get_by_username(username)
             if not user:
-                logger.warning(f"Login failed: User {username} not found")
+                logger.warning("Login failed: User %s not found", username)
                 return None
                 
             # Verify password
-            if not user.verify_password(password):
-                logger.warning(f"Login failed: Invalid password for user {username}")
+            if not self.hasher.verify(password, user.password):
+                logger.warning("Login failed: Invalid password for user %s", username)
                 return None
                 
-            logger.info(f"User {username} logged in successfully")
+            logger.info("User %s logged in successfully", username)
             return {
                 'message': 'Login successful',
                 'user': user.to_dict()
             }
+        except CapacityError:
+            # Expected backpressure, already logged by the hasher
+            raise
         except Exception as e:
-            logger.error(f"Error during login for user {username}: {str(e)}")
+            logger.error("Error during login for user %s: %s", username, e)
             raise
         
     def get_user_by_id(self, user_id: int) -> Optional[User]:
@@ -91,9 +96,9 @@ class UserService(IUserService):
             return False
             
         # Verify old password
-        if not user.verify_password(old_password):
+        if not self.hasher.verify(old_password, user.password):
             return False
             
         # Update password
-        user.password = new_password
+        user.password = self.hasher.hash(new_password)
         return self.user_dao.update(user) 
\ No newline at end of file
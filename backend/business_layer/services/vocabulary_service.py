@@ -1,18 +1,22 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from backend.dao.vocabularies.vocabulary_dao import VocabularyDAO
 from backend.business_layer.interfaces.vocabulary_service_interface import IVocabularyService
 from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+from backend.utils.cache import ResultCache, cached, result_cache
 
 class VocabularyService(IVocabularyService):
     """Implementation of Vocabulary Service"""
     
-    def __init__(self, vocabulary_dao: VocabularyDAO):
+    def __init__(self, vocabulary_dao: VocabularyDAO, cache: ResultCache = result_cache):
         self.vocabulary_dao = vocabulary_dao
+        self.cache = cache
         
+    @cached(tags=('topic:{topic_id}',))
     def get_vocabularies_by_topic(self, topic_id: int) -> List[VocabularyEntity]:
         """Get all vocabularies in a topic"""
         return self.vocabulary_dao.get_vocabularies_by_topic(topic_id)
         
+    @cached(tags=('vocabulary:{vocabulary_id}',))
     def get_vocabulary_by_id(self, vocabulary_id: int) -> Optional[VocabularyEntity]:
         """Get vocabulary by ID"""
         return self.vocabulary_dao.get_vocabulary_by_id(vocabulary_id)
@@ -31,4 +35,24 @@ class VocabularyService(IVocabularyService):
         
     def search_vocabularies(self, keyword: str) -> List[VocabularyEntity]:
         """Search vocabularies by keyword"""
-        return self.vocabulary_dao.search_vocabularies(keyword) 
\ No newline at end of file
+        return self.vocabulary_dao.search_vocabularies(keyword)
+        
+    def search_vocabularies_page(self, keyword: str, page: int, per_page: int,
+                                 topic_id: Optional[int] = None) -> Dict:
+        """Search vocabularies and return one page of ranked matches"""
+        matches = self.vocabulary_dao.search_ranked(keyword, topic_id)
+        start = (page - 1) * per_page
+        return {
+            'query': keyword,
+            'page': page,
+            'per_page': per_page,
+            'total': len(matches),
+            'results': [
+                {**vocabulary.to_dict(), 'match': tier}
+                for vocabulary, tier in matches[start:start + per_page]
+            ]
+        }
+        
+    def suggest_vocabularies(self, prefix: str, limit: int) -> List[Dict]:
+        """Autocomplete a prefix from vocabulary words and meanings"""
+        return self.vocabulary_dao.suggest(prefix, limit)
@@ -2,18 +2,22 @@ from typing import List, Optional
 from backend.dao.vocabulary_topics.vocabulary_topic_dao import VocabularyTopicDAO
 from backend.business_layer.interfaces.vocabulary_topics_service_interface import IVocabularyTopicService
 from backend.dao.vocabulary_topics.vocabulary_topic_class import VocabularyTopic
+from backend.utils.cache import ResultCache, cached, result_cache
 
 class VocabularyTopicService(IVocabularyTopicService):
     """Implementation of VocabularyTopic Service"""
     
-    def __init__(self, topic_dao: VocabularyTopicDAO):
+    def __init__(self, topic_dao: VocabularyTopicDAO, cache: ResultCache = result_cache):
         self.topic_dao = topic_dao
+        self.cache = cache
         
+    @cached(tags=('topics',))
     def get_all_topics(self) -> List[VocabularyTopic]:
         """Get all topics"""
         entities = self.topic_dao.get_all()
         return [VocabularyTopic.from_entity(entity) for entity in entities]
         
+    @cached(tags=('topic:{topic_id}',))
     def get_topic_by_id(self, topic_id: int) -> Optional[VocabularyTopic]:
         """Get topic by ID"""
         entity = self.topic_dao.get_by_id(topic_id)
@@ -0,0 +1,75 @@
+import json
+import click
+from backend.business_layer.container import get_services
+from backend.utils.content_import import DECODE_ERRORS, IMPORT_FORMATS, IMPORT_KINDS, import_format, read_records
+from backend.utils.exceptions import ValidationError
+from backend.utils.profiler import PROFILE_HEADER, request_profiler
+
+@click.command('rebuild-stats')
+def rebuild_stats_command():
+    """Rebuild the user_stats and topic_stats rollups from test_results."""
+    get_services().test_result_dao.rebuild_statistics()
+    click.echo('Rebuilt user_stats and topic_stats')
+
+@click.command('rebuild-leaderboards')
+def rebuild_leaderboards_command():
+    """Recompute every leaderboard entry from test_results."""
+    get_services().leaderboard_dao.rebuild_from_results()
+    click.echo('Rebuilt leaderboards')
+
+@click.command('verify-leaderboards')
+@click.option('--topic', 'topic_id', type=int, help='Check one topic instead of all of them.')
+def verify_leaderboards_command(topic_id):
+    """Check the in-memory leaderboard ranking against SQL RANK()."""
+    services = get_services()
+    dao = services.leaderboard_dao
+    if dao.write_queue is not None:
+        dao.write_queue.flush()
+    topic_ids = [topic_id] if topic_id is not None else [topic.id for topic in services.topic_dao.get_all()]
+    failed = 0
+    for topic_id in topic_ids:
+        dao.rebuild_index(topic_id)
+        mismatches = dao.verify_index(topic_id)
+        if mismatches:
+            failed += 1
+            click.echo(f"topic {topic_id}: {json.dumps(mismatches)}")
+    if failed:
+        raise click.ClickException(f"{failed} of {len(topic_ids)} topic(s) disagree with SQL")
+    click.echo(f"Checked {len(topic_ids)} topic(s)")
+
+@click.command('import-content')
+@click.argument('kind', type=click.Choice(IMPORT_KINDS))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension.')
+@click.option('--batch-size', type=int, help='Rows per insert transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate and count without writing.')
+def import_content_command(kind, path, fmt, batch_size, dry_run):
+    """Bulk import topics, vocabularies or tests from a CSV or NDJSON file."""
+    def progress(report):
+        click.echo(f"batch {report.batches}: {report.read} read, {report.inserted} inserted, "
+                   f"{report.duplicates} duplicates, {report.rejected} rejected")
+
+    with open(path, encoding='utf-8-sig', errors=DECODE_ERRORS, newline='') as f:
+        try:
+            report = get_services().content_import_service.import_records(
+                kind, read_records(f, import_format(fmt, path)), dry_run, batch_size, progress)
+        except ValidationError as e:
+            raise click.ClickException(str(e))
+    click.echo(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+
+@click.command('profile-token')
+@click.option('--ttl', type=int, default=900, show_default=True, help='Seconds the header stays valid.')
+def profile_token_command(ttl):
+    """Print a signed X-Profile header that profiles the requests carrying it."""
+    try:
+        click.echo(f"{PROFILE_HEADER}: {request_profiler.sign(ttl)}")
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+def register_commands(app) -> None:
+    """Register the maintenance commands on a Flask app"""
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(rebuild_leaderboards_command)
+    app.cli.add_command(verify_leaderboards_command)
+    app.cli.add_command(import_content_command)
+    app.cli.add_command(profile_token_command)
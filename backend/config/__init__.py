@@ -2,8 +2,22 @@
 
 from .config import (
     DB_CONFIG,
+    POOL_CONFIG,
     APP_CONFIG,
     LOG_CONFIG,
+    LEADERBOARD_CONFIG,
+    QUIZ_CONFIG,
+    SEARCH_CONFIG,
+    PAGINATION_CONFIG,
+    EXPORT_CONFIG,
+    IMPORT_CONFIG,
+    HTTP_CACHE_CONFIG,
+    CACHE_CONFIG,
+    QUERY_STATS_CONFIG,
+    METRICS_CONFIG,
+    PROFILE_CONFIG,
+    HASHER_CONFIG,
+    AUTH_CONFIG,
     TABLE_CONFIG,
     SQLALCHEMY_DATABASE_URL
 ) 
\ No newline at end of file
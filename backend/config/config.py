@@ -1,5 +1,7 @@
 import os
 import logging
+import tempfile
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,15 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME', 'vocabulary_learning')
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    'recycle_uses': int(os.getenv('DB_POOL_RECYCLE_USES', 1000)),
+    'recycle_seconds': float(os.getenv('DB_POOL_RECYCLE_SECONDS', 3600))
+}
+
 # Application configuration
 APP_CONFIG = {
     'debug': os.getenv('FLASK_DEBUG', 'True').lower() == 'true',
@@ -28,19 +39,153 @@ APP_CONFIG = {
 CORS_CONFIG = {
     'allowed_origins': os.getenv('ALLOWED_ORIGINS', 'http://localhost:8080,http://localhost:8081,http://172.20.48.1:8080,http://172.20.48.1:8081').split(','),
     'supports_credentials': True,
-    'allow_headers': ["Content-Type", "Authorization", "Cookie", "Set-Cookie", "X-Requested-With"],
-    'expose_headers': ["Set-Cookie", "Content-Type", "Content-Length", "Authorization"],
+    'allow_headers': ["Content-Type", "Authorization", "Cookie", "Set-Cookie", "X-Requested-With",
+                      "If-None-Match", "If-Modified-Since"],
+    'expose_headers': ["Set-Cookie", "Content-Type", "Content-Length", "Authorization",
+                       "ETag", "Last-Modified", "Cache-Control", "X-Next-Cursor"],
     'methods': ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
 }
 
+def _parse_mapping(value: str) -> dict:
+    """Parse 'name=value,name=value' settings"""
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {name.strip(): setting.strip() for name, setting in pairs}
+
 # Logging configuration
+# LOG_LEVELS overrides levels per logger, e.g. "backend.dao=WARNING,backend.api.auth=INFO"
+# LOG_SAMPLING keeps 1 in N INFO/DEBUG lines per logger, e.g. "backend.api.learning=10"
 LOG_CONFIG = {
     'level': os.getenv('LOG_LEVEL', 'INFO'),
-    'file': os.getenv('LOG_FILE', 'app.log')
+    'file': os.getenv('LOG_FILE', 'app.log'),
+    'format': os.getenv('LOG_FORMAT', 'text'),
+    'levels': _parse_mapping(os.getenv('LOG_LEVELS', '')),
+    'sampling': {name: int(rate) for name, rate in _parse_mapping(os.getenv('LOG_SAMPLING', '')).items()}
+}
+
+# Leaderboard configuration
+LEADERBOARD_CONFIG = {
+    'preload_index': os.getenv('LEADERBOARD_PRELOAD_INDEX', 'True').lower() == 'true',
+    'index_ttl': float(os.getenv('LEADERBOARD_INDEX_TTL', 60)),
+    # Queue score updates in memory and upsert them in batches every flush_interval_ms
+    'write_behind': os.getenv('LEADERBOARD_WRITE_BEHIND', 'False').lower() == 'true',
+    'flush_interval_ms': int(os.getenv('LEADERBOARD_FLUSH_INTERVAL_MS', 200)),
+    'max_pending': int(os.getenv('LEADERBOARD_MAX_PENDING', 5000))
+}
+
+# Quiz configuration
+QUIZ_CONFIG = {
+    'answer_key_ttl': float(os.getenv('ANSWER_KEY_TTL', 300)),
+    'default_size': int(os.getenv('QUIZ_DEFAULT_SIZE', 10)),
+    'max_size': int(os.getenv('QUIZ_MAX_SIZE', 50))
+}
+
+# Vocabulary search index
+SEARCH_CONFIG = {
+    'preload_index': os.getenv('SEARCH_PRELOAD_INDEX', 'True').lower() == 'true',
+    'index_ttl': float(os.getenv('SEARCH_INDEX_TTL', 300)),
+    'fuzzy_threshold': float(os.getenv('SEARCH_FUZZY_THRESHOLD', 0.4)),
+    'default_per_page': int(os.getenv('SEARCH_DEFAULT_PER_PAGE', 20)),
+    'max_per_page': int(os.getenv('SEARCH_MAX_PER_PAGE', 100)),
+    'suggest_default_limit': int(os.getenv('SUGGEST_DEFAULT_LIMIT', 10)),
+    'suggest_max_limit': int(os.getenv('SUGGEST_MAX_LIMIT', 50)),
+    'suggest_compact_threshold': int(os.getenv('SUGGEST_COMPACT_THRESHOLD', 10000))
+}
+
+# Keyset pagination of test result and leaderboard listings
+PAGINATION_CONFIG = {
+    'default_page_size': int(os.getenv('PAGE_SIZE_DEFAULT', 50)),
+    'max_page_size': int(os.getenv('PAGE_SIZE_MAX', 200))
+}
+
+# Streamed result and leaderboard exports
+EXPORT_CONFIG = {
+    'batch_size': int(os.getenv('EXPORT_BATCH_SIZE', 1000)),
+    'chunk_bytes': int(os.getenv('EXPORT_CHUNK_BYTES', 64 * 1024))
+}
+
+# Bulk content import (flask import-content, POST /api/admin/import/<kind>)
+IMPORT_CONFIG = {
+    'batch_size': int(os.getenv('IMPORT_BATCH_SIZE', 5000)),
+    'max_batch_size': int(os.getenv('IMPORT_MAX_BATCH_SIZE', 50000)),
+    'max_errors': int(os.getenv('IMPORT_MAX_ERRORS', 100))
+}
+
+# HTTP caching of topic/vocabulary/test reads. Content versions are re-read
+# from the database at most every CONTENT_VERSION_TTL seconds per process.
+HTTP_CACHE_CONFIG = {
+    'enabled': os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true',
+    'version_ttl': float(os.getenv('CONTENT_VERSION_TTL', 5)),
+    'cache_control': os.getenv('HTTP_CACHE_CONTROL', 'private, no-cache')
+}
+
+# Service result cache; CACHE_BACKEND is memory (per process), redis (shared
+# by every worker through REDIS_URL) or none
+CACHE_CONFIG = {
+    'backend': os.getenv('CACHE_BACKEND', 'memory').lower(),
+    'max_entries': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+    'default_ttl': float(os.getenv('CACHE_DEFAULT_TTL', 300)),
+    'leaderboard_ttl': float(os.getenv('CACHE_LEADERBOARD_TTL', 30)),
+    'redis_url': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    'redis_timeout': float(os.getenv('REDIS_TIMEOUT', 0.25)),
+    'retry_interval': float(os.getenv('CACHE_RETRY_INTERVAL', 5)),
+    'prefix': os.getenv('CACHE_PREFIX', 'vocab:')
+}
+
+# Per-request query statistics; a sample_rate share of requests records every
+# statement, while statements slower than slow_query_ms are logged for all of them
+QUERY_STATS_CONFIG = {
+    'enabled': os.getenv('QUERY_STATS_ENABLED', 'True').lower() == 'true',
+    'sample_rate': float(os.getenv('QUERY_STATS_SAMPLE_RATE', 0.05)),
+    'slow_query_ms': float(os.getenv('SLOW_QUERY_MS', 200)),
+    'explain_slow': os.getenv('SLOW_QUERY_EXPLAIN', 'True').lower() == 'true',
+    # Seconds before the same slow statement is explained again
+    'explain_interval': float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300)),
+    # A statement repeated this often in one request is reported as a likely N+1
+    'repeat_threshold': int(os.getenv('QUERY_REPEAT_THRESHOLD', 5))
+}
+
+# Prometheus metrics at /metrics; when METRICS_TOKEN is set, scrapers must send it as a Bearer token
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS_ENABLED', 'True').lower() == 'true',
+    'token': os.getenv('METRICS_TOKEN', '')
+}
+
+# Request profiler; a request is profiled when it carries an X-Profile header signed with
+# PROFILE_SECRET (see flask profile-token) or is picked at PROFILE_SAMPLE_RATE
+PROFILE_CONFIG = {
+    'enabled': os.getenv('PROFILE_ENABLED', 'False').lower() == 'true',
+    'secret': os.getenv('PROFILE_SECRET', ''),
+    'sample_rate': float(os.getenv('PROFILE_SAMPLE_RATE', 0)),
+    # Milliseconds between stack samples of a profiled request
+    'interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', 5)),
+    'directory': os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'vocab-profiles')),
+    # Oldest profiles are deleted beyond this many files
+    'max_files': int(os.getenv('PROFILE_MAX_FILES', 100))
+}
+
+# Authentication configuration; stateless mode never writes the Flask session
+AUTH_CONFIG = {
+    'stateless': os.getenv('AUTH_STATELESS', 'True').lower() == 'true',
+    'token_cache_size': int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000)),
+    # Users allowed to export every user's results
+    'admin_usernames': {name.strip() for name in os.getenv('ADMIN_USERNAMES', '').split(',') if name.strip()}
+}
+
+# Password hashing configuration; CREDENTIAL_HASH_WORKERS=0 hashes on the request thread
+_hash_workers = int(os.getenv('CREDENTIAL_HASH_WORKERS', os.cpu_count() or 1))
+HASHER_CONFIG = {
+    'workers': _hash_workers,
+    'max_pending': int(os.getenv('CREDENTIAL_HASH_MAX_PENDING', max(_hash_workers, 1) * 8)),
+    'timeout': float(os.getenv('CREDENTIAL_HASH_TIMEOUT', 10)),
+    'rounds': int(os.getenv('BCRYPT_ROUNDS', 10))
 }
 
-# Database URL for SQLAlchemy
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}"
+# Database URL for SQLAlchemy; set DATABASE_URL=sqlite:///path/to/file.db to run against a local SQLite file
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    'DATABASE_URL',
+    f"mysql+pymysql://{quote_plus(DB_CONFIG['user'])}:{quote_plus(DB_CONFIG['password'])}"
+    f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?charset=utf8mb4"
+)
 
 # Table names configuration
 TABLE_CONFIG = {
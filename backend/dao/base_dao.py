@@ -1,82 +1,110 @@
-from typing import List, Optional, Any
-from backend.database.connection import DatabaseConnection
-from mysql.connector import Error
+from typing import Iterator, List, Optional, Any
+import logging
+from backend.config.config import EXPORT_CONFIG
+from backend.database.database import get_connection, get_pool
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
+
 class BaseDAO:
     """Base Data Access Object with common database operations"""
-    
-    def __init__(self):
-        self.db = DatabaseConnection()
-        
+
     @contextmanager
     def get_cursor(self):
         """Get a database cursor as a context manager"""
-        connection = self.db.get_connection()
-        cursor = connection.cursor()
-        try:
-            yield cursor
-            connection.commit()
-        except Exception as e:
-            connection.rollback()
-            raise
-        finally:
-            cursor.close()
-            
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                yield cursor
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def execute_query(self, query: str, params: tuple = None, fetch_one: bool = False, return_id: bool = False) -> Any:
         """
         Execute a database query with error handling
-        
+
         Args:
             query: SQL query string
             params: Query parameters
             fetch_one: Whether to fetch only one row
             return_id: Whether to return the last inserted ID
-            
+
         Returns:
             Query results or last inserted ID
         """
-        try:
-            cursor = self.db.get_connection().cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-                
-            if query.lower().strip().startswith('select'):
-                if fetch_one:
-                    result = cursor.fetchone()
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                if params:
+                    cursor.execute(query, params)
                 else:
-                    result = cursor.fetchall()
-            else:
-                self.db.get_connection().commit()
-                if return_id:
-                    result = cursor.lastrowid
+                    cursor.execute(query)
+
+                if query.lower().strip().startswith('select'):
+                    if fetch_one:
+                        result = cursor.fetchone()
+                    else:
+                        result = cursor.fetchall()
                 else:
-                    result = cursor.rowcount > 0
-                    
-            return result
-            
-        except Error as e:
-            print(f"Error executing query: {e}")
-            self.db.get_connection().rollback()
-            raise
-        finally:
-            cursor.close()
-            
+                    connection.commit()
+                    if return_id:
+                        result = cursor.lastrowid
+                    else:
+                        result = cursor.rowcount > 0
+
+                return result
+
+            except Exception as e:
+                logger.error("Error executing query: %s", e)
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def fetch_all(self, query: str, params: tuple = None) -> List[tuple]:
         """Execute a SELECT query and return all results"""
         return self.execute_query(query, params)
-        
+
     def fetch_one(self, query: str, params: tuple = None) -> Optional[tuple]:
         """Execute a SELECT query and return one result"""
         return self.execute_query(query, params, fetch_one=True)
-        
+
     def execute(self, query: str, params: tuple = None) -> bool:
         """Execute an INSERT/UPDATE/DELETE query"""
         return self.execute_query(query, params)
-        
+
     def insert(self, query: str, params: tuple = None) -> int:
         """Execute an INSERT query and return the last inserted ID"""
-        return self.execute_query(query, params, return_id=True) 
\ No newline at end of file
+        return self.execute_query(query, params, return_id=True)
+
+    def stream_query(self, query: str, params: tuple = None,
+                     batch_size: int = EXPORT_CONFIG['batch_size']) -> Iterator[List[tuple]]:
+        """
+        Yield the rows of a SELECT query in batches, without buffering the whole result
+
+        Rows are read through a server-side cursor on a connection of its
+        own, checked out when iteration starts and returned when it ends, so
+        a streamed response may outlive the request's connection.
+
+        Args:
+            query: SQL query string
+            params: Query parameters
+            batch_size: Rows fetched from the server per batch
+        """
+        with get_pool().connection() as connection:
+            cursor = connection.streaming_cursor()
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+                # End the read transaction before the connection goes back to the pool
+                connection.rollback()
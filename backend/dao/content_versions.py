@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import datetime
+import logging
+from typing import Dict, Optional
+from backend.config.config import HTTP_CACHE_CONFIG
+from backend.dao.base_dao import BaseDAO
+from backend.database.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Version row of the topic list itself; topic IDs start at 1
+TOPIC_LIST = 0
+
+class ContentVersion:
+    """Version counter of one topic's content"""
+
+    __slots__ = ('topic_id', 'version', 'updated_at')
+
+    def __init__(self, topic_id: int, version: int, updated_at: Optional[datetime]):
+        self.topic_id = topic_id
+        self.version = version
+        self.updated_at = updated_at
+
+    @property
+    def etag(self) -> str:
+        """Strong entity tag; the timestamp keeps tags unique if the table is reset"""
+        stamp = int(self.updated_at.timestamp()) if self.updated_at else 0
+        return f"{self.topic_id}-{self.version}-{stamp}"
+
+class ContentVersions(BaseDAO):
+    """Per-topic content version counters shared by every DAO in the process
+
+    The vocabulary, test and topic DAO write methods call ``bump`` inside
+    their own transaction, so a counter moves exactly when the content it
+    covers does. Reads come from an in-process snapshot of the whole
+    content_versions table, reloaded after a local write and at most every
+    ``ttl`` seconds otherwise so writes made by other worker processes are
+    picked up.
+    """
+
+    def __init__(self, ttl: float = 5):
+        self.ttl = ttl
+        self._versions: Dict[int, ContentVersion] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, topic_id: int) -> Optional[ContentVersion]:
+        """Current version of a topic (or TOPIC_LIST); None if versions are unavailable"""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.ttl:
+            try:
+                self.reload()
+            except Exception as e:
+                logger.warning("Could not load content versions: %s", e)
+                return None
+        return self._versions.get(topic_id) or ContentVersion(topic_id, 0, None)
+
+    def reload(self) -> None:
+        """Re-read every counter from the database"""
+        generation = self._generation
+        rows = self.fetch_all("SELECT topic_id, version, updated_at FROM content_versions")
+        versions = {
+            topic_id: ContentVersion(topic_id, version, self._to_datetime(updated_at))
+            for topic_id, version, updated_at in rows
+        }
+        with self._lock:
+            self._versions = versions
+            # A write that committed while we were reading leaves the snapshot stale
+            if generation == self._generation:
+                self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a reload on the next read; call after committing a bump"""
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def bump(self, cursor, topic_id: int, include_list: bool = False) -> None:
+        """Increments a topic's counter, and the topic list's when asked, on the caller's cursor"""
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        query = f"""
+            INSERT INTO content_versions (topic_id, version, updated_at)
+            VALUES (%s, 1, %s)
+            {get_engine().upsert_clause('topic_id')}
+                version = version + 1,
+                updated_at = %s
+        """
+        keys = (topic_id, TOPIC_LIST) if include_list else (topic_id,)
+        for key in keys:
+            cursor.execute(query, (key, updated_at, updated_at))
+
+    def bump_owner(self, cursor, table: str, row_id: int) -> Optional[int]:
+        """Increments the counter of the topic owning a vocabularies or tests row; returns that topic"""
+        cursor.execute(f"SELECT topic_id FROM {table} WHERE id = %s", (row_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        self.bump(cursor, row[0])
+        return row[0]
+
+    @staticmethod
+    def _to_datetime(value) -> Optional[datetime]:
+        if value is None or isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(str(value))
+
+content_versions = ContentVersions(ttl=HTTP_CACHE_CONFIG['version_ttl'])
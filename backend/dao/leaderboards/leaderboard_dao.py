@@ -1,42 +1,34 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict, Tuple
 from datetime import datetime
 import logging
 
 from backend.dao.base_dao import BaseDAO
+from backend.dao.unit_of_work import UnitOfWork, unit_of_work
+from backend.database.database import get_engine
 from backend.dao.leaderboards.leaderboard_entity import LeaderboardEntity
+from backend.dao.leaderboards.leaderboard_index import LeaderboardIndex, leaderboard_index
+from backend.dao.leaderboards.leaderboard_queue import LeaderboardWriteQueue, leaderboard_write_queue
+from backend.utils.cache import ResultCache, result_cache
 from backend.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
 class LeaderboardDAO(BaseDAO):
-    """Data Access Object for leaderboards table."""
+    """Data Access Object for leaderboards table.
 
-    def create_entry(self, user_id: int, topic_id: int, score: float) -> Optional[LeaderboardEntity]:
-        """Creates a new leaderboard entry in the database."""
-        try:
-            query = """
-                INSERT INTO leaderboards 
-                (user_id, topic_id, total_score, tests_completed, average_score, last_updated)
-                VALUES (%s, %s, %s, 1, %s, %s)
-            """
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            params = (user_id, topic_id, score, score, current_time)
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                entry_id = cursor.lastrowid
-                return LeaderboardEntity(
-                    id=entry_id,
-                    user_id=user_id,
-                    topic_id=topic_id,
-                    total_score=score,
-                    tests_completed=1,
-                    average_score=score,
-                    last_updated=current_time
-                )
-        except Exception as e:
-            logger.error(f"Error creating leaderboard entry: {str(e)}")
-            raise DatabaseError("Failed to create leaderboard entry")
+    Rank queries are served from an in-memory LeaderboardIndex that the
+    write methods keep current. With a write queue, scores reach the
+    index at once and the table in batches.
+    """
+
+    def __init__(self, index: LeaderboardIndex = leaderboard_index,
+                 cache: ResultCache = result_cache,
+                 write_queue: Optional[LeaderboardWriteQueue] = leaderboard_write_queue):
+        self.index = index
+        self.cache = cache
+        self.write_queue = write_queue
+        if write_queue is not None:
+            write_queue.bind(self.apply_scores)
 
     def get_entry_by_id(self, entry_id: int) -> Optional[LeaderboardEntity]:
         """Retrieves a leaderboard entry by its ID."""
@@ -56,8 +48,13 @@ class LeaderboardDAO(BaseDAO):
             logger.error(f"Error retrieving leaderboard entry {entry_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve leaderboard entry {entry_id}")
 
-    def get_entries_by_topic(self, topic_id: int) -> List[LeaderboardEntity]:
-        """Retrieves all leaderboard entries for a specific topic."""
+    def get_entries_by_topic(self, topic_id: int, limit: Optional[int] = None,
+                             after: Optional[Tuple[float, int]] = None) -> List[LeaderboardEntity]:
+        """Retrieves leaderboard entries for a specific topic, best average first.
+
+        ``after`` is the (average_score, id) of the last entry of the previous
+        page; idx_leaderboard_topic_score serves each page as a range scan.
+        """
         try:
             query = """
                 SELECT l.id, l.user_id, l.topic_id, l.total_score, l.tests_completed, 
@@ -65,11 +62,18 @@ class LeaderboardDAO(BaseDAO):
                 FROM leaderboards l
                 JOIN users u ON l.user_id = u.id
                 WHERE l.topic_id = %s 
-                ORDER BY l.average_score DESC
             """
+            params = (topic_id,)
+            if after is not None:
+                query += " AND l.average_score <= %s AND (l.average_score < %s OR l.id < %s)"
+                params += (after[0], after[0], after[1])
+            query += " ORDER BY l.average_score DESC, l.id DESC"
+            if limit is not None:
+                query += " LIMIT %s"
+                params += (limit,)
             
             with self.get_cursor() as cursor:
-                cursor.execute(query, (topic_id,))
+                cursor.execute(query, params)
                 rows = cursor.fetchall()
                 
                 # Create a list to store entities with username
@@ -92,6 +96,28 @@ class LeaderboardDAO(BaseDAO):
             logger.error(f"Error retrieving leaderboard entries for topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve leaderboard entries for topic {topic_id}")
 
+    def stream_entries_by_topic(self, topic_id: int) -> Iterator[List[LeaderboardEntity]]:
+        """Streams every leaderboard entry of a topic in batches, best average first."""
+        query = """
+            SELECT l.id, l.user_id, l.topic_id, l.total_score, l.tests_completed,
+                   l.average_score, l.last_updated, u.username
+            FROM leaderboards l
+            JOIN users u ON l.user_id = u.id
+            WHERE l.topic_id = %s
+            ORDER BY l.average_score DESC, l.id DESC
+        """
+        try:
+            for rows in self.stream_query(query, (topic_id,)):
+                batch = []
+                for row in rows:
+                    entity = LeaderboardEntity.from_db_row(row[:7])
+                    setattr(entity, 'username', row[7])
+                    batch.append(entity)
+                yield batch
+        except Exception as e:
+            logger.error(f"Error streaming leaderboard entries for topic {topic_id}: {str(e)}")
+            raise DatabaseError(f"Failed to stream leaderboard entries for topic {topic_id}")
+
     def get_entries_by_user(self, user_id: int) -> List[LeaderboardEntity]:
         """Retrieves all leaderboard entries for a specific user."""
         try:
@@ -111,6 +137,72 @@ class LeaderboardDAO(BaseDAO):
             logger.error(f"Error retrieving leaderboard entries for user {user_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve leaderboard entries for user {user_id}")
 
+    def get_user_standings(self, user_id: int) -> List[Dict]:
+        """Retrieves a user's entry, rank and participant count for every topic they played.
+
+        One query answers for every topic. Topics ranked in memory, and with
+        a write queue those with queued scores, are answered from the index,
+        which already counts the scores the table has not seen yet.
+        """
+        user_id = int(user_id)
+        if self.write_queue is None:
+            standings, queued = self._read_standings(user_id), {}
+        else:
+            read = {}
+
+            def install(rows, pending):
+                read['standings'], read['queued'] = rows, pending
+
+            self.write_queue.read_consistent(lambda: self._read_standings(user_id), install)
+            standings, queued = read['standings'], read['queued']
+
+        by_topic = {standing['topic_id']: standing for standing in standings}
+        for queued_user_id, topic_id in queued:
+            if queued_user_id == user_id and topic_id not in by_topic:
+                by_topic[topic_id] = {'topic_id': topic_id}
+        queued_topics = {topic_id for _, topic_id in queued}
+        for topic_id, standing in by_topic.items():
+            if topic_id not in queued_topics and not self.index.is_loaded(topic_id):
+                continue
+            rank = self.get_user_rank(user_id, topic_id)
+            entry = self.index.get_entry(topic_id, user_id)
+            if entry is None:
+                continue
+            standing.update({
+                'total_score': entry[0],
+                'tests_completed': entry[1],
+                'average_score': entry[2],
+                'rank': rank,
+                'total_participants': self.get_participant_count(topic_id)
+            })
+        return sorted((standing for standing in by_topic.values() if 'rank' in standing),
+                      key=lambda standing: standing['average_score'], reverse=True)
+
+    def _read_standings(self, user_id: int) -> List[Dict]:
+        try:
+            query = """
+                SELECT l.topic_id, l.total_score, l.tests_completed, l.average_score,
+                       (SELECT COUNT(*) FROM leaderboards o
+                        WHERE o.topic_id = l.topic_id AND o.average_score > l.average_score) + 1 AS user_rank,
+                       (SELECT COUNT(*) FROM leaderboards p
+                        WHERE p.topic_id = l.topic_id) AS participants
+                FROM leaderboards l
+                WHERE l.user_id = %s
+                ORDER BY l.average_score DESC
+            """
+            rows = self.fetch_all(query, (user_id,))
+            return [{
+                'topic_id': row[0],
+                'total_score': row[1],
+                'tests_completed': row[2],
+                'average_score': row[3],
+                'rank': int(row[4]),
+                'total_participants': int(row[5])
+            } for row in rows]
+        except Exception as e:
+            logger.error(f"Error retrieving standings for user {user_id}: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve standings for user {user_id}")
+
     def get_entry_by_user_and_topic(self, user_id: int, topic_id: int) -> Optional[LeaderboardEntity]:
         """Retrieves a leaderboard entry for a specific user in a specific topic."""
         try:
@@ -130,47 +222,114 @@ class LeaderboardDAO(BaseDAO):
             logger.error(f"Error retrieving leaderboard entry for user {user_id} in topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve leaderboard entry for user {user_id} in topic {topic_id}")
 
-    def update_score(self, entry_id: int, new_score: float) -> bool:
-        """Updates the score of a leaderboard entry."""
+    def record_score(self, user_id: int, topic_id: int, score: float,
+                     uow: Optional[UnitOfWork] = None) -> None:
+        """Folds one test score into a user's entry with a single atomic upsert.
+
+        The increment happens in the database, so concurrent submissions
+        for the same user and topic cannot overwrite each other. Pass
+        ``uow`` to commit it together with the test result. With a write
+        queue the score is queued once ``uow`` commits instead, and shows
+        in the in-memory ranking straight away.
+        """
+        if self.write_queue is not None:
+            self._queue_score(int(user_id), topic_id, score, uow)
+            return
         try:
-            # First get the current entry
-            query = """
-                SELECT total_score, tests_completed 
-                FROM leaderboards 
-                WHERE id = %s
+            now = datetime.now()
+            updated_at = now.strftime('%Y-%m-%d %H:%M:%S')
+            # average_score comes first: MySQL applies the assignments left to right
+            query = f"""
+                INSERT INTO leaderboards
+                (user_id, topic_id, total_score, tests_completed, average_score, last_updated)
+                VALUES (%s, %s, %s, 1, %s, %s)
+                {get_engine().upsert_clause('user_id', 'topic_id')}
+                    average_score = (total_score + %s) * 1.0 / (tests_completed + 1),
+                    total_score = total_score + %s,
+                    tests_completed = tests_completed + 1,
+                    last_updated = %s
             """
-            
+            params = (user_id, topic_id, score, score, updated_at, score, score, updated_at)
+
+            with unit_of_work(uow) as work:
+                work.cursor.execute(query, params)
+                if self.index.is_loaded(topic_id):
+                    # Read the merged totals back under the row lock the upsert holds
+                    work.cursor.execute("""
+                        SELECT total_score, tests_completed, average_score
+                        FROM leaderboards
+                        WHERE user_id = %s AND topic_id = %s
+                    """, (user_id, topic_id))
+                    total_score, tests_completed, average_score = work.cursor.fetchone()
+                    work.after_commit(lambda: self.index.update(
+                        topic_id, int(user_id), total_score, tests_completed, average_score,
+                        now.replace(microsecond=0)))
+                work.after_commit(lambda: self.cache.invalidate(f'leaderboard:{topic_id}'))
+        except Exception as e:
+            logger.error(f"Error recording score for user {user_id} in topic {topic_id}: {str(e)}")
+            raise DatabaseError(f"Failed to record score for user {user_id} in topic {topic_id}")
+
+    def _queue_score(self, user_id: int, topic_id: int, score: float,
+                     uow: Optional[UnitOfWork]) -> None:
+        updated_at = datetime.now().replace(microsecond=0)
+
+        def enqueue():
+            self.write_queue.add(user_id, topic_id, score, updated_at,
+                                 lambda: self.index.add(topic_id, user_id, score, 1, updated_at))
+            self.cache.invalidate(f'leaderboard:{topic_id}')
+
+        if uow is not None:
+            uow.after_commit(enqueue)
+        else:
+            enqueue()
+
+    def apply_scores(self, rows: List[Tuple]) -> None:
+        """Adds (user_id, topic_id, score_sum, scores, last_updated) rows to their entries in one batch."""
+        engine = get_engine()
+        # average_score comes first: MySQL applies the assignments left to right
+        query = f"""
+            INSERT INTO leaderboards
+            (user_id, topic_id, total_score, tests_completed, average_score, last_updated)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            {engine.upsert_clause('user_id', 'topic_id')}
+                average_score = (total_score + {engine.inserted('total_score')}) * 1.0
+                                / (tests_completed + {engine.inserted('tests_completed')}),
+                total_score = total_score + {engine.inserted('total_score')},
+                tests_completed = tests_completed + {engine.inserted('tests_completed')},
+                last_updated = {engine.inserted('last_updated')}
+        """
+        params = [(user_id, topic_id, score_sum, scores, score_sum / scores,
+                   last_updated.strftime('%Y-%m-%d %H:%M:%S'))
+                  for user_id, topic_id, score_sum, scores, last_updated in rows]
+        try:
+            with unit_of_work() as work:
+                work.cursor.executemany(query, params)
+        except Exception as e:
+            logger.error(f"Error applying {len(rows)} leaderboard updates: {str(e)}")
+            raise DatabaseError("Failed to apply leaderboard updates")
+
+    def rebuild_from_results(self) -> None:
+        """Recomputes every leaderboard entry from the test_results history."""
+        try:
+            topics_query = "SELECT DISTINCT topic_id FROM leaderboards"
             with self.get_cursor() as cursor:
-                cursor.execute(query, (entry_id,))
-                row = cursor.fetchone()
-                if not row:
-                    return False
-                    
-                current_total = row[0]
-                current_tests = row[1]
-                
-                # Calculate new values
-                new_total = current_total + new_score
-                new_tests = current_tests + 1
-                new_average = new_total / new_tests
-                
-                # Update the entry
-                update_query = """
-                    UPDATE leaderboards
-                    SET total_score = %s,
-                        tests_completed = %s,
-                        average_score = %s,
-                        last_updated = %s
-                    WHERE id = %s
-                """
-                updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                params = (new_total, new_tests, new_average, updated_at, entry_id)
-                
-                cursor.execute(update_query, params)
-                return cursor.rowcount > 0
+                cursor.execute(topics_query)
+                topic_ids = {row[0] for row in cursor.fetchall()}
+                cursor.execute("DELETE FROM leaderboards")
+                cursor.execute("""
+                    INSERT INTO leaderboards
+                    (user_id, topic_id, total_score, tests_completed, average_score, last_updated)
+                    SELECT user_id, topic_id, SUM(score), COUNT(*), AVG(score), MAX(created_at)
+                    FROM test_results
+                    GROUP BY user_id, topic_id
+                """)
+                cursor.execute(topics_query)
+                topic_ids.update(row[0] for row in cursor.fetchall())
         except Exception as e:
-            logger.error(f"Error updating score for leaderboard entry {entry_id}: {str(e)}")
-            raise DatabaseError(f"Failed to update score for leaderboard entry {entry_id}")
+            logger.error(f"Error rebuilding leaderboards: {str(e)}")
+            raise DatabaseError("Failed to rebuild leaderboards")
+        self.index.clear()
+        self.cache.invalidate(*(f'leaderboard:{topic_id}' for topic_id in topic_ids))
 
     def get_top_scores(self, topic_id: int, limit: int = 10) -> List[Dict]:
         """Retrieves top scores for a specific topic."""
@@ -201,24 +360,105 @@ class LeaderboardDAO(BaseDAO):
             logger.error(f"Error retrieving top scores for topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve top scores for topic {topic_id}")
 
+    def get_ranking_rows(self, topic_id: int) -> List[tuple]:
+        """Retrieves (user_id, total_score, tests_completed, average_score, last_updated) for every entry in a topic."""
+        try:
+            query = """
+                SELECT user_id, total_score, tests_completed, average_score, last_updated
+                FROM leaderboards
+                WHERE topic_id = %s
+            """
+            return self.fetch_all(query, (topic_id,))
+        except Exception as e:
+            logger.error(f"Error retrieving ranking rows for topic {topic_id}: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve ranking rows for topic {topic_id}")
+
+    def rebuild_index(self, topic_id: Optional[int] = None) -> None:
+        """Reloads the in-memory ranking of one topic, or of every topic, from the database."""
+        if self.write_queue is None:
+            self._load_index(topic_id, self._read_ranking(topic_id), {})
+        else:
+            # Queued scores are not in the table yet; lay them over what is
+            self.write_queue.read_consistent(
+                lambda: self._read_ranking(topic_id),
+                lambda rows, pending: self._load_index(topic_id, rows, pending))
+
+    def _read_ranking(self, topic_id: Optional[int]) -> List[tuple]:
+        if topic_id is not None:
+            return self.get_ranking_rows(topic_id)
+        try:
+            query = """
+                SELECT user_id, topic_id, total_score, tests_completed, average_score, last_updated
+                FROM leaderboards
+            """
+            return self.fetch_all(query)
+        except Exception as e:
+            logger.error(f"Error rebuilding leaderboard index: {str(e)}")
+            raise DatabaseError("Failed to rebuild leaderboard index")
+
+    def _load_index(self, topic_id: Optional[int], rows: List[tuple], pending: Dict) -> None:
+        if topic_id is not None:
+            self.index.load_topic(topic_id, rows)
+        else:
+            self.index.load_all(rows)
+        for (user_id, entry_topic_id), (score_sum, scores, last_updated) in pending.items():
+            if topic_id is None or entry_topic_id == topic_id:
+                self.index.add(entry_topic_id, user_id, score_sum, scores, last_updated)
+
+    def _ensure_indexed(self, topic_id: int) -> None:
+        if not self.index.is_loaded(topic_id):
+            self.rebuild_index(topic_id)
+
     def get_user_rank(self, user_id: int, topic_id: int) -> Optional[int]:
         """Retrieves the rank of a user in a specific topic."""
+        self._ensure_indexed(topic_id)
+        return self.index.rank(topic_id, int(user_id))
+
+    def get_participant_count(self, topic_id: int) -> int:
+        """Retrieves the number of users ranked in a specific topic."""
+        self._ensure_indexed(topic_id)
+        return self.index.size(topic_id)
+
+    def get_user_percentile(self, user_id: int, topic_id: int) -> Optional[float]:
+        """Retrieves the percentage of participants ranked below a user."""
+        self._ensure_indexed(topic_id)
+        return self.index.percentile(topic_id, int(user_id))
+
+    def get_ranked_entries(self, topic_id: int, limit: int = 10) -> List[Dict]:
+        """Retrieves the top ranked entries of a topic from the in-memory index."""
+        self._ensure_indexed(topic_id)
+        return self.index.top(topic_id, limit)
+
+    def get_entries_around_user(self, user_id: int, topic_id: int, window: int = 5) -> List[Dict]:
+        """Retrieves up to ``window`` ranked entries above and below a user."""
+        self._ensure_indexed(topic_id)
+        return self.index.around(topic_id, int(user_id), window)
+
+    def verify_index(self, topic_id: int) -> List[Dict]:
+        """Compares the in-memory ranking of a topic with SQL RANK() and returns the mismatches."""
+        self._ensure_indexed(topic_id)
+        mismatches = []
+        sql_ranks = self.get_sql_ranks(topic_id)
+        for user_id, sql_rank in sql_ranks.items():
+            index_rank = self.index.rank(topic_id, user_id)
+            if index_rank != sql_rank:
+                mismatches.append({'user_id': user_id, 'sql_rank': sql_rank, 'index_rank': index_rank})
+        if self.index.size(topic_id) != len(sql_ranks):
+            mismatches.append({'participants': len(sql_ranks), 'indexed': self.index.size(topic_id)})
+        if mismatches:
+            logger.warning(f"Leaderboard index for topic {topic_id} disagrees with SQL in {len(mismatches)} place(s)")
+        return mismatches
+
+    def get_sql_ranks(self, topic_id: int) -> Dict[int, int]:
+        """Ranks every user of a topic with SQL RANK(); used to check the in-memory index."""
         try:
             query = """
-                SELECT user_rank
-                FROM (
-                    SELECT user_id, RANK() OVER (ORDER BY average_score DESC) as user_rank
-                    FROM leaderboards
-                    WHERE topic_id = %s
-                ) ranked
-                WHERE user_id = %s
+                SELECT user_id, RANK() OVER (ORDER BY average_score DESC) as user_rank
+                FROM leaderboards
+                WHERE topic_id = %s
             """
-            params = (topic_id, user_id)
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-                return int(row[0]) if row else None
+            rows = self.fetch_all(query, (topic_id,))
+            return {int(row[0]): int(row[1]) for row in rows}
         except Exception as e:
-            logger.error(f"Error retrieving rank for user {user_id} in topic {topic_id}: {str(e)}")
-            raise DatabaseError(f"Failed to retrieve rank for user {user_id} in topic {topic_id}") 
\ No newline at end of file
+            logger.error(f"Error ranking topic {topic_id} in SQL: {str(e)}")
+            raise DatabaseError(f"Failed to rank topic {topic_id}")
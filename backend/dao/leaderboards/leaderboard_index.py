@@ -0,0 +1,280 @@
+import threading
+import time
+import random
+from math import log
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.config.config import LEADERBOARD_CONFIG
+from backend.dao.leaderboards.leaderboard_class import Leaderboard
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+class RankedSkipList:
+    """Skip list with link widths, giving O(log n) rank and positional lookup
+
+    Keys must be unique and mutually comparable.
+    """
+
+    MAX_LEVELS = 24
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVELS)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, key) -> None:
+        """Insert a key"""
+        chain = [None] * self.MAX_LEVELS
+        steps_at_level = [0] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = min(self.MAX_LEVELS, 1 - int(log(1.0 - random.random(), 2.0)))
+        new_node = _Node(key, height)
+        steps = 0
+        for level in range(height):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> None:
+        """Remove a key
+
+        Raises:
+            KeyError: If the key is not present
+        """
+        chain = [None] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def count_less(self, key) -> int:
+        """Number of keys strictly less than ``key``"""
+        position = 0
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def iter_from(self, index: int):
+        """Iterate over keys starting at zero-based position ``index``"""
+        if index < 0 or index >= self._size:
+            return
+        remaining = index + 1
+        node = self._head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+class TopicRanking:
+    """Ranking of every user in one topic, ordered by average score"""
+
+    def __init__(self):
+        self._order = RankedSkipList()
+        self._entries: Dict[int, Tuple] = {}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(self, user_id: int, total_score, tests_completed: int,
+            average_score: float, last_updated=None) -> None:
+        """Insert or replace a user's entry"""
+        current = self._entries.get(user_id)
+        if current is not None:
+            self._order.remove((-current[2], user_id))
+        average_score = float(average_score)
+        self._entries[user_id] = (total_score, tests_completed, average_score, last_updated)
+        self._order.insert((-average_score, user_id))
+
+    def get(self, user_id: int) -> Optional[Tuple]:
+        """(total_score, tests_completed, average_score, last_updated) for a user"""
+        return self._entries.get(user_id)
+
+    def rank_of_score(self, average_score: float) -> int:
+        """SQL RANK() of a score: one plus the number of strictly better scores"""
+        return self._order.count_less((-float(average_score), float('-inf'))) + 1
+
+    def rank(self, user_id: int) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        return self.rank_of_score(entry[2]) if entry else None
+
+    def position(self, user_id: int) -> Optional[int]:
+        """Zero-based position of a user in score order"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._order.count_less((-entry[2], user_id))
+
+    def slice(self, start: int, count: int) -> List[Dict]:
+        """Entries at positions ``start``..``start + count - 1`` with their ranks"""
+        rows = []
+        rank = None
+        previous_score = None
+        for key in self._order.iter_from(max(start, 0)):
+            if len(rows) >= count:
+                break
+            score, user_id = -key[0], key[1]
+            if score != previous_score:
+                rank = self.rank_of_score(score) if previous_score is None else len(rows) + start + 1
+                previous_score = score
+            total_score, tests_completed, average_score, last_updated = self._entries[user_id]
+            rows.append({
+                'rank': rank,
+                'user_id': user_id,
+                'total_score': total_score,
+                'tests_completed': tests_completed,
+                'average_score': average_score,
+                'last_updated': last_updated
+            })
+        return rows
+
+class LeaderboardIndex:
+    """In-memory per-topic leaderboard rankings
+
+    Each topic is loaded from the ``leaderboards`` table on first use and
+    kept current by the LeaderboardDAO write methods. Rank, top-K, windows
+    around a user and percentiles are answered in O(log n) (plus the size
+    of the returned page) without a database round trip. Topics older than
+    ``ttl`` seconds are reloaded so writes from other worker processes are
+    eventually picked up.
+    """
+
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._topics: Dict[int, TopicRanking] = {}
+        self._lock = threading.RLock()
+
+    def is_loaded(self, topic_id: int) -> bool:
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            if ranking is None:
+                return False
+            return not self.ttl or time.monotonic() - ranking.loaded_at < self.ttl
+
+    def load_topic(self, topic_id: int, rows: Iterable[Tuple]) -> None:
+        """Replace a topic's ranking with rows of
+        (user_id, total_score, tests_completed, average_score, last_updated)"""
+        ranking = TopicRanking()
+        for user_id, total_score, tests_completed, average_score, last_updated in rows:
+            ranking.set(user_id, total_score, tests_completed, average_score, last_updated)
+        with self._lock:
+            self._topics[topic_id] = ranking
+
+    def load_all(self, rows: Iterable[Tuple]) -> None:
+        """Replace every topic with rows of
+        (user_id, topic_id, total_score, tests_completed, average_score, last_updated)"""
+        topics: Dict[int, TopicRanking] = {}
+        for user_id, topic_id, total_score, tests_completed, average_score, last_updated in rows:
+            topics.setdefault(topic_id, TopicRanking()).set(
+                user_id, total_score, tests_completed, average_score, last_updated)
+        with self._lock:
+            self._topics = topics
+
+    def clear(self, topic_id: Optional[int] = None) -> None:
+        """Forget one topic (or all of them) so it is reloaded on next use"""
+        with self._lock:
+            if topic_id is None:
+                self._topics.clear()
+            else:
+                self._topics.pop(topic_id, None)
+
+    def update(self, topic_id: int, user_id: int, total_score, tests_completed: int,
+               average_score: float, last_updated=None) -> None:
+        """Apply a committed write; unloaded topics pick it up when loaded"""
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            if ranking is not None:
+                ranking.set(user_id, total_score, tests_completed, average_score, last_updated)
+
+    def add(self, topic_id: int, user_id: int, score_sum, scores: int, last_updated=None) -> None:
+        """Fold ``scores`` more test scores totalling ``score_sum`` into a user's entry"""
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            if ranking is None:
+                return
+            current = ranking.get(user_id)
+            total_score = (current[0] if current else 0) + score_sum
+            tests_completed = (current[1] if current else 0) + scores
+            ranking.set(user_id, total_score, tests_completed, total_score / tests_completed, last_updated)
+
+    def size(self, topic_id: int) -> int:
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            return len(ranking) if ranking else 0
+
+    def get_entry(self, topic_id: int, user_id: int) -> Optional[Tuple]:
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            return ranking.get(user_id) if ranking else None
+
+    def rank(self, topic_id: int, user_id: int) -> Optional[int]:
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            return ranking.rank(user_id) if ranking else None
+
+    def top(self, topic_id: int, limit: int) -> List[Dict]:
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            return ranking.slice(0, limit) if ranking else []
+
+    def around(self, topic_id: int, user_id: int, window: int) -> List[Dict]:
+        """Up to ``window`` entries above and below a user, including the user"""
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            if ranking is None:
+                return []
+            position = ranking.position(user_id)
+            if position is None:
+                return []
+            start = max(position - window, 0)
+            return ranking.slice(start, position - start + window + 1)
+
+    def percentile(self, topic_id: int, user_id: int) -> Optional[float]:
+        """Share of participants ranked below the user, in percent"""
+        with self._lock:
+            ranking = self._topics.get(topic_id)
+            rank = ranking.rank(user_id) if ranking else None
+            if rank is None:
+                return None
+            return Leaderboard.calculate_percentile(rank, len(ranking))
+
+# Shared by every LeaderboardDAO in the process
+leaderboard_index = LeaderboardIndex(ttl=LEADERBOARD_CONFIG['index_ttl'])
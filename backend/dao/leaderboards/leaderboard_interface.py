@@ -11,8 +11,8 @@ class ILeaderboardDAO(ABC):
         pass
         
     @abstractmethod
-    def update_score(self, user_id: int, topic_id: int, score: int) -> bool:
-        """Update user's score in leaderboard"""
+    def record_score(self, user_id: int, topic_id: int, score: float) -> None:
+        """Add a test score to user's leaderboard entry"""
         pass
         
     @abstractmethod
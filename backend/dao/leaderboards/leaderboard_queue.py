@@ -0,0 +1,178 @@
+import atexit
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from backend.config.config import LEADERBOARD_CONFIG
+from backend.utils.metrics import LATENCY_BUCKETS, metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.histogram('leaderboard_flush_duration_seconds', 'Time to write one batch of queued leaderboard scores',
+                  LATENCY_BUCKETS)
+
+# (user_id, topic_id) -> [score_sum, scores, last_updated]
+Pending = Dict[Tuple[int, int], list]
+
+class LeaderboardWriteQueue:
+    """Write-behind buffer for leaderboard score updates
+
+    Scores are added to a per-(user, topic) running sum as they arrive, so
+    a burst of submissions to one topic turns into one upsert per user. A
+    daemon thread hands the accumulated sums to the bound ``apply``
+    function every ``flush_interval`` seconds, or as soon as
+    ``max_pending`` entries are waiting. A failed flush puts its batch back
+    for the next one. Scores still queued when the process dies are lost
+    from ``leaderboards`` (the test results themselves are committed), see
+    ``flask rebuild-leaderboards``.
+    """
+
+    def __init__(self, flush_interval: float = 0.2, max_pending: int = 5000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._apply: Optional[Callable[[List[Tuple]], None]] = None
+        self._pending: Pending = {}
+        self._lock = threading.Lock()
+        # Held while a batch is out of _pending but not yet committed
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._queued = 0
+        self._flushed_scores = 0
+        self._flushed_rows = 0
+        self._flushes = 0
+        self._flush_errors = 0
+        self._flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+        self._last_flush_seconds = 0.0
+
+    def bind(self, apply: Callable[[List[Tuple]], None]) -> None:
+        """Set the function that writes a batch of
+        (user_id, topic_id, score_sum, scores, last_updated) rows"""
+        self._apply = apply
+
+    def add(self, user_id: int, topic_id: int, score: float, updated_at: datetime,
+            applied: Optional[Callable[[], None]] = None) -> None:
+        """Queue one score; ``applied`` runs under the queue lock so in-memory
+        views change in the same order as the queue"""
+        with self._lock:
+            entry = self._pending.get((user_id, topic_id))
+            if entry is None:
+                self._pending[(user_id, topic_id)] = [score, 1, updated_at]
+            else:
+                entry[0] += score
+                entry[1] += 1
+                entry[2] = updated_at
+            self._queued += 1
+            if applied is not None:
+                applied()
+            full = len(self._pending) >= self.max_pending
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def read_consistent(self, read: Callable[[], Any], install: Callable[[Any, Pending], None]) -> None:
+        """Run ``read`` while no batch is in flight, then ``install`` its result
+        together with the scores still queued, with no score being added meanwhile
+
+        Every queued score is then either in what ``read`` saw or in the
+        pending map handed to ``install``, never both.
+        """
+        with self._flush_lock:
+            rows = read()
+            with self._lock:
+                install(rows, {key: list(entry) for key, entry in self._pending.items()})
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            # A fixed key order keeps concurrent flushes from deadlocking on row locks
+            rows = [(user_id, topic_id, entry[0], entry[1], entry[2])
+                    for (user_id, topic_id), entry in sorted(batch.items())]
+            started = time.perf_counter()
+            try:
+                self._apply(rows)
+            except Exception as e:
+                logger.error("Leaderboard flush of %s rows failed, retrying later: %s", len(rows), e)
+                with self._lock:
+                    self._flush_errors += 1
+                    self._merge(batch.items())
+                return 0
+            elapsed = time.perf_counter() - started
+            metrics.observe('leaderboard_flush_duration_seconds', elapsed)
+            with self._lock:
+                self._flushes += 1
+                self._flushed_rows += len(rows)
+                self._flushed_scores += sum(entry[1] for entry in batch.values())
+                self._flush_seconds += elapsed
+                self._last_flush_seconds = elapsed
+                self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+            return len(rows)
+
+    def _merge(self, items: Iterable[Tuple[Tuple[int, int], list]]) -> None:
+        """Put a failed batch back in front of scores queued since"""
+        for key, entry in items:
+            newer = self._pending.get(key)
+            if newer is not None:
+                entry[0] += newer[0]
+                entry[1] += newer[1]
+                entry[2] = newer[2]
+            self._pending[key] = entry
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None or self._stopping:
+                return
+            self._thread = threading.Thread(target=self._run, name='leaderboard-flusher', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Leaderboard flusher error: %s", e)
+
+    def stop(self) -> None:
+        """Stop the flusher thread and write what is still queued"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._apply is not None:
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending_rows': len(self._pending),
+                'pending_scores': sum(entry[1] for entry in self._pending.values()),
+                'queued_scores': self._queued,
+                'flushes': self._flushes,
+                'flush_errors': self._flush_errors,
+                'flushed_scores': self._flushed_scores,
+                'flushed_rows': self._flushed_rows,
+                'coalescing_ratio': (round(self._flushed_scores / self._flushed_rows, 2)
+                                     if self._flushed_rows else None),
+                'flush_ms_last': round(self._last_flush_seconds * 1000, 2),
+                'flush_ms_avg': (round(self._flush_seconds / self._flushes * 1000, 2)
+                                 if self._flushes else None),
+                'flush_ms_max': round(self._max_flush_seconds * 1000, 2)
+            }
+
+# Shared by every LeaderboardDAO in the process; None unless write-behind is on
+leaderboard_write_queue = LeaderboardWriteQueue(
+    flush_interval=LEADERBOARD_CONFIG['flush_interval_ms'] / 1000,
+    max_pending=LEADERBOARD_CONFIG['max_pending']
+) if LEADERBOARD_CONFIG['write_behind'] else None
@@ -1,13 +1,22 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 import logging
 
 from backend.dao.base_dao import BaseDAO
+from backend.dao.unit_of_work import UnitOfWork, unit_of_work
+from backend.database.database import get_engine
 from backend.dao.test_results.test_result_entity import TestResultEntity
 from backend.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
+# Rollup tables keyed by the test_results column they aggregate over
+ROLLUP_TABLES = {'user_stats': 'user_id', 'topic_stats': 'topic_id'}
+
+ROLLUP_COLUMNS = "tests_taken, score_sum, score_min, score_max, completion_time_sum, last_attempt_at"
+
+ROLLUP_AGGREGATES = "COUNT(*), SUM(score), MIN(score), MAX(score), SUM(completion_time), MAX(created_at)"
+
 class TestResultDAO(BaseDAO):
     """Data Access Object for test_results table."""
     
@@ -16,7 +25,7 @@ class TestResultDAO(BaseDAO):
         self.table = 'test_results'
 
     def create(self, user_id: int, topic_id: int, score: int,
-              completion_time: int) -> Optional[TestResultEntity]:
+              completion_time: int, uow: Optional[UnitOfWork] = None) -> Optional[TestResultEntity]:
         """Creates a new test result in the database.
         
         Args:
@@ -24,6 +33,7 @@ class TestResultDAO(BaseDAO):
             topic_id (int): ID of the topic being tested
             score (int): Score achieved in the test
             completion_time (int): Time taken to complete the test in seconds
+            uow (UnitOfWork): Transaction to join; by default the insert commits on its own
             
         Returns:
             Optional[TestResultEntity]: Created test result entity or None if creation fails
@@ -37,7 +47,12 @@ class TestResultDAO(BaseDAO):
             created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             params = (user_id, topic_id, score, completion_time, created_at)
             
-            result_id = self.insert(query, params)
+            # The result and both rollups commit together
+            with unit_of_work(uow) as work:
+                work.cursor.execute(query, params)
+                result_id = work.cursor.lastrowid
+                self._add_to_rollups(work.cursor, user_id, topic_id, score, completion_time, created_at)
+
             if result_id:
                 return TestResultEntity(
                     id=result_id,
@@ -52,6 +67,54 @@ class TestResultDAO(BaseDAO):
             logger.error(f"Error creating test result: {str(e)}")
             raise DatabaseError("Failed to create test result")
 
+    def _add_to_rollups(self, cursor, user_id: int, topic_id: int, score: int,
+                        completion_time: int, created_at: str) -> None:
+        """Folds one new result into user_stats and topic_stats."""
+        for table, key in ROLLUP_TABLES.items():
+            query = f"""
+                INSERT INTO {table} ({key}, {ROLLUP_COLUMNS})
+                VALUES (%s, 1, %s, %s, %s, %s, %s)
+                {get_engine().upsert_clause(key)}
+                    tests_taken = tests_taken + 1,
+                    score_sum = score_sum + %s,
+                    score_min = LEAST(score_min, %s),
+                    score_max = GREATEST(score_max, %s),
+                    completion_time_sum = completion_time_sum + %s,
+                    last_attempt_at = GREATEST(last_attempt_at, %s)
+            """
+            key_value = user_id if key == 'user_id' else topic_id
+            values = (score, score, score, completion_time, created_at)
+            cursor.execute(query, (key_value,) + values + values)
+
+    def _recompute_rollups(self, cursor, user_ids, topic_ids) -> None:
+        """Recomputes the rollup rows of some users and topics from test_results."""
+        for table, key in ROLLUP_TABLES.items():
+            for key_value in set(user_ids if key == 'user_id' else topic_ids):
+                cursor.execute(f"DELETE FROM {table} WHERE {key} = %s", (key_value,))
+                cursor.execute(f"""
+                    INSERT INTO {table} ({key}, {ROLLUP_COLUMNS})
+                    SELECT {key}, {ROLLUP_AGGREGATES}
+                    FROM test_results
+                    WHERE {key} = %s
+                    GROUP BY {key}
+                """, (key_value,))
+
+    def rebuild_statistics(self) -> None:
+        """Rebuilds user_stats and topic_stats from the full test_results history."""
+        try:
+            with self.get_cursor() as cursor:
+                for table, key in ROLLUP_TABLES.items():
+                    cursor.execute(f"DELETE FROM {table}")
+                    cursor.execute(f"""
+                        INSERT INTO {table} ({key}, {ROLLUP_COLUMNS})
+                        SELECT {key}, {ROLLUP_AGGREGATES}
+                        FROM test_results
+                        GROUP BY {key}
+                    """)
+        except Exception as e:
+            logger.error(f"Error rebuilding test statistics: {str(e)}")
+            raise DatabaseError("Failed to rebuild test statistics")
+
     def get_by_id(self, result_id: int) -> Optional[TestResultEntity]:
         """Retrieves a test result by its ID."""
         try:
@@ -65,120 +128,113 @@ class TestResultDAO(BaseDAO):
             logger.error(f"Error retrieving test result {result_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve test result {result_id}")
 
-    def get_by_user(self, user_id: int) -> List[TestResultEntity]:
-        """Retrieves all test results for a specific user."""
+    def _get_newest(self, where: str, params: tuple, limit: Optional[int],
+                    after: Optional[Tuple[str, int]]) -> List[TestResultEntity]:
+        """Results matching ``where``, newest first, optionally one keyset page.
+
+        ``after`` is the (created_at, id) of the last row of the previous
+        page. The composite (..., created_at, id) indexes make each page an
+        index range scan however many results precede it.
+        """
+        query = f"SELECT * FROM test_results WHERE {where}"
+        if after is not None:
+            query += " AND created_at <= %s AND (created_at < %s OR id < %s)"
+            params += (after[0], after[0], after[1])
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT %s"
+            params += (limit,)
+        return [TestResultEntity.from_db_row(row) for row in self.fetch_all(query, params)]
+
+    def get_by_user(self, user_id: int, limit: Optional[int] = None,
+                    after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Retrieves test results for a specific user, newest first."""
         try:
-            query = "SELECT * FROM test_results WHERE user_id = %s ORDER BY created_at DESC"
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, (user_id,))
-                rows = cursor.fetchall()
-                return [TestResultEntity.from_db_row(row) for row in rows]
+            return self._get_newest("user_id = %s", (user_id,), limit, after)
         except Exception as e:
             logger.error(f"Error retrieving test results for user {user_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve test results for user {user_id}")
 
-    def get_by_topic(self, topic_id: int) -> List[TestResultEntity]:
-        """Retrieves all test results for a specific topic."""
+    def get_by_topic(self, topic_id: int, limit: Optional[int] = None,
+                     after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Retrieves test results for a specific topic, newest first."""
         try:
-            query = "SELECT * FROM test_results WHERE topic_id = %s ORDER BY created_at DESC"
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, (topic_id,))
-                rows = cursor.fetchall()
-                return [TestResultEntity.from_db_row(row) for row in rows]
+            return self._get_newest("topic_id = %s", (topic_id,), limit, after)
         except Exception as e:
             logger.error(f"Error retrieving test results for topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve test results for topic {topic_id}")
 
-    def get_by_user_and_topic(self, user_id: int, topic_id: int) -> List[TestResultEntity]:
-        """Retrieves all test results for a specific user in a specific topic."""
+    def get_by_user_and_topic(self, user_id: int, topic_id: int, limit: Optional[int] = None,
+                              after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Retrieves test results for a specific user in a specific topic, newest first."""
         try:
-            query = """
-                SELECT * FROM test_results 
-                WHERE user_id = %s AND topic_id = %s 
-                ORDER BY created_at DESC
-            """
-            params = (user_id, topic_id)
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                return [TestResultEntity.from_db_row(row) for row in rows]
+            return self._get_newest("user_id = %s AND topic_id = %s", (user_id, topic_id), limit, after)
         except Exception as e:
             logger.error(f"Error retrieving test results for user {user_id} in topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve test results for user {user_id} in topic {topic_id}")
 
+    def _stream_newest(self, where: str, params: tuple) -> Iterator[List[TestResultEntity]]:
+        """Batches of every result matching ``where``, newest first."""
+        query = f"SELECT * FROM test_results WHERE {where} ORDER BY created_at DESC, id DESC"
+        try:
+            for rows in self.stream_query(query, params):
+                yield [TestResultEntity.from_db_row(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error streaming test results ({where} {params}): {str(e)}")
+            raise DatabaseError("Failed to stream test results")
+
+    def stream_by_topic(self, topic_id: int) -> Iterator[List[TestResultEntity]]:
+        """Streams every test result of a topic in batches, newest first."""
+        return self._stream_newest("topic_id = %s", (topic_id,))
+
+    def stream_by_user(self, user_id: int) -> Iterator[List[TestResultEntity]]:
+        """Streams every test result of a user in batches, newest first."""
+        return self._stream_newest("user_id = %s", (user_id,))
+
+    def _get_rollup(self, table: str, key: str, key_value: int) -> dict:
+        """Reads one rollup row as a statistics dict."""
+        query = f"""
+            SELECT {ROLLUP_COLUMNS}
+            FROM {table}
+            WHERE {key} = %s
+        """
+        row = self.fetch_one(query, (key_value,))
+        if not row or not row[0]:
+            return {
+                'total_tests': 0,
+                'total_score': 0,
+                'average_score': 0,
+                'lowest_score': 0,
+                'highest_score': 0,
+                'total_time': 0,
+                'average_time': 0,
+                'last_attempt_at': None
+            }
+
+        tests_taken = int(row[0])
+        return {
+            'total_tests': tests_taken,
+            'total_score': int(row[1]),
+            'average_score': int(row[1]) / tests_taken,
+            'lowest_score': int(row[2]),
+            'highest_score': int(row[3]),
+            'total_time': int(row[4]),
+            'average_time': int(row[4]) / tests_taken,
+            'last_attempt_at': row[5]
+        }
+
     def get_user_statistics(self, user_id: int) -> dict:
-        """Retrieves statistics for a specific user."""
+        """Retrieves statistics for a specific user from the user_stats rollup."""
         try:
-            query = """
-                SELECT 
-                    COUNT(*) as total_tests,
-                    AVG(score) as average_score,
-                    SUM(score) as total_correct,
-                    SUM(total_questions) as total_questions,
-                    AVG(completion_time) as average_time
-                FROM test_results 
-                WHERE user_id = %s
-            """
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, (user_id,))
-                row = cursor.fetchone()
-                if not row:
-                    return {
-                        'total_tests': 0,
-                        'average_score': 0,
-                        'total_correct': 0,
-                        'total_questions': 0,
-                        'average_time': 0
-                    }
-                    
-                return {
-                    'total_tests': row[0],
-                    'average_score': float(row[1]) if row[1] else 0,
-                    'total_correct': int(row[2]) if row[2] else 0,
-                    'total_questions': int(row[3]) if row[3] else 0,
-                    'average_time': float(row[4]) if row[4] else 0
-                }
+            return self._get_rollup('user_stats', 'user_id', user_id)
         except Exception as e:
             logger.error(f"Error retrieving statistics for user {user_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve statistics for user {user_id}")
 
     def get_topic_statistics(self, topic_id: int) -> dict:
-        """Retrieves statistics for a specific topic."""
+        """Retrieves statistics for a specific topic from the topic_stats rollup."""
         try:
-            query = """
-                SELECT 
-                    COUNT(*) as total_attempts,
-                    AVG(score) as average_score,
-                    MAX(score) as highest_score,
-                    MIN(score) as lowest_score,
-                    AVG(completion_time) as average_time
-                FROM test_results 
-                WHERE topic_id = %s
-            """
-            
-            with self.get_cursor() as cursor:
-                cursor.execute(query, (topic_id,))
-                row = cursor.fetchone()
-                if not row:
-                    return {
-                        'total_attempts': 0,
-                        'average_score': 0,
-                        'highest_score': 0,
-                        'lowest_score': 0,
-                        'average_time': 0
-                    }
-                    
-                return {
-                    'total_attempts': row[0],
-                    'average_score': float(row[1]) if row[1] else 0,
-                    'highest_score': int(row[2]) if row[2] else 0,
-                    'lowest_score': int(row[3]) if row[3] else 0,
-                    'average_time': float(row[4]) if row[4] else 0
-                }
+            return self._get_rollup('topic_stats', 'topic_id', topic_id)
         except Exception as e:
             logger.error(f"Error retrieving statistics for topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve statistics for topic {topic_id}")
@@ -199,7 +255,17 @@ class TestResultDAO(BaseDAO):
                 test_result.completion_time,
                 test_result.id
             )
-            return self.execute(query, params)
+            with self.get_cursor() as cursor:
+                cursor.execute("SELECT user_id, topic_id FROM test_results WHERE id = %s", (test_result.id,))
+                previous = cursor.fetchone()
+                if not previous:
+                    return False
+                cursor.execute(query, params)
+                updated = cursor.rowcount > 0
+                self._recompute_rollups(cursor,
+                                        (previous[0], test_result.user_id),
+                                        (previous[1], test_result.topic_id))
+                return updated
         except Exception as e:
             logger.error(f"Error updating test result {test_result.id}: {str(e)}")
             raise DatabaseError(f"Failed to update test result {test_result.id}")
@@ -207,8 +273,15 @@ class TestResultDAO(BaseDAO):
     def delete(self, result_id: int) -> bool:
         """Delete test result"""
         try:
-            query = "DELETE FROM test_results WHERE id = %s"
-            return self.execute(query, (result_id,))
+            with self.get_cursor() as cursor:
+                cursor.execute("SELECT user_id, topic_id FROM test_results WHERE id = %s", (result_id,))
+                previous = cursor.fetchone()
+                if not previous:
+                    return False
+                cursor.execute("DELETE FROM test_results WHERE id = %s", (result_id,))
+                deleted = cursor.rowcount > 0
+                self._recompute_rollups(cursor, (previous[0],), (previous[1],))
+                return deleted
         except Exception as e:
             logger.error(f"Error deleting test result {result_id}: {str(e)}")
-            raise DatabaseError(f"Failed to delete test result {result_id}") 
\ No newline at end of file
+            raise DatabaseError(f"Failed to delete test result {result_id}")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from .test_result_entity import TestResultEntity
 
 class ITestResultDAO(ABC):
@@ -16,18 +16,21 @@ class ITestResultDAO(ABC):
         pass
         
     @abstractmethod
-    def get_by_user(self, user_id: int) -> List[TestResultEntity]:
-        """Get all test results for a user"""
+    def get_by_user(self, user_id: int, limit: Optional[int] = None,
+                    after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Get test results for a user, newest first"""
         pass
         
     @abstractmethod
-    def get_by_topic(self, topic_id: int) -> List[TestResultEntity]:
-        """Get all test results for a topic"""
+    def get_by_topic(self, topic_id: int, limit: Optional[int] = None,
+                     after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Get test results for a topic, newest first"""
         pass
         
     @abstractmethod
-    def get_by_user_and_topic(self, user_id: int, topic_id: int) -> List[TestResultEntity]:
-        """Get all test results for a user in a specific topic"""
+    def get_by_user_and_topic(self, user_id: int, topic_id: int, limit: Optional[int] = None,
+                              after: Optional[Tuple[str, int]] = None) -> List[TestResultEntity]:
+        """Get test results for a user in a specific topic, newest first"""
         pass
         
     @abstractmethod
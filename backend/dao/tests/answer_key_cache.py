@@ -0,0 +1,89 @@
+import threading
+from array import array
+import time
+from typing import Dict, Iterable, Optional
+from backend.config.config import QUIZ_CONFIG
+from backend.dao.tests.test_class import Test
+
+class AnswerKey:
+    """Normalized correct answers and question IDs of one topic"""
+
+    __slots__ = ('answers', 'question_ids', 'question_count', 'loaded_at')
+
+    def __init__(self, answers: Dict[int, str]):
+        self.answers = answers
+        self.question_ids = array('q', sorted(answers))
+        self.question_count = len(answers)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'AnswerKey':
+        """Build from (test_id, correct_answer) rows"""
+        return cls({test_id: Test.normalize_answer(answer) for test_id, answer in rows})
+
+    def unknown_ids(self, test_ids: Iterable[int]) -> set:
+        """Test IDs that are not questions of this topic"""
+        return set(test_ids) - self.answers.keys()
+
+    def count_correct(self, answers: Dict[int, str]) -> int:
+        """Number of answers matching the key"""
+        key = self.answers
+        return sum(
+            1 for test_id, answer in answers.items()
+            if key.get(test_id) == Test.normalize_answer(answer)
+        )
+
+class AnswerKeyCache:
+    """Per-topic answer keys shared by every TestDAO in the process
+
+    Entries are dropped by the TestDAO write methods and expire after
+    ``ttl`` seconds so edits made by other worker processes are picked up.
+    Every invalidation bumps a generation number; a key read before the
+    bump is not stored, so it cannot overwrite the invalidation.
+    """
+
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._keys: Dict[int, AnswerKey] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Take this before reading a key from the database and pass it to ``put``"""
+        with self._lock:
+            return self._generation
+
+    def get(self, topic_id: int) -> Optional[AnswerKey]:
+        with self._lock:
+            key = self._keys.get(topic_id)
+        if key is None:
+            return None
+        if self.ttl and time.monotonic() - key.loaded_at >= self.ttl:
+            return None
+        return key
+
+    def put(self, topic_id: int, key: AnswerKey, generation: Optional[int] = None) -> None:
+        """Store a key, unless something was invalidated since ``generation``"""
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._keys[topic_id] = key
+
+    def invalidate(self, topic_id: Optional[int] = None) -> None:
+        """Drop one topic's key, or every key"""
+        with self._lock:
+            self._generation += 1
+            if topic_id is None:
+                self._keys.clear()
+            else:
+                self._keys.pop(topic_id, None)
+
+    def invalidate_test(self, test_id: int) -> None:
+        """Drop the key of whichever cached topic contains a question"""
+        with self._lock:
+            self._generation += 1
+            for topic_id, key in list(self._keys.items()):
+                if test_id in key.answers:
+                    del self._keys[topic_id]
+
+answer_key_cache = AnswerKeyCache(ttl=QUIZ_CONFIG['answer_key_ttl'])
@@ -0,0 +1,21 @@
+import random
+from typing import Dict, List, Optional, Sequence
+
+def sample_ids(ids: Sequence[int], k: int, seed: Optional[int] = None) -> List[int]:
+    """Draw ``k`` distinct IDs without replacement in O(k)
+
+    A Fisher-Yates shuffle stopped after ``k`` steps, with the swaps kept in
+    a dict instead of applied to a copy of ``ids``, so neither time nor
+    memory depends on the size of the topic. The same ``seed`` and ``ids``
+    always give the same draw.
+    """
+    n = len(ids)
+    k = min(max(k, 0), n)
+    rng = random.Random(seed)
+    swapped: Dict[int, int] = {}
+    chosen = []
+    for i in range(k):
+        j = rng.randrange(i, n)
+        chosen.append(swapped.get(j, ids[j]))
+        swapped[j] = swapped.get(i, ids[i])
+    return chosen
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 import random
 from .test_entity import TestEntity
 
@@ -40,15 +40,20 @@ class Test:
             option3=self.option3
         )
         
-    def get_shuffled_options(self) -> List[str]:
-        """Get all options in random order"""
+    def get_shuffled_options(self, rng: Optional[random.Random] = None) -> List[str]:
+        """Get all options in random order, drawn from ``rng`` when given"""
         options = [self.correct_answer, self.option1, self.option2, self.option3]
-        random.shuffle(options)
+        (rng or random).shuffle(options)
         return options
         
+    @staticmethod
+    def normalize_answer(answer: str) -> str:
+        """Normalize an answer for comparison"""
+        return answer.strip().lower()
+        
     def check_answer(self, answer: str) -> bool:
         """Check if the answer is correct"""
-        return answer.strip().lower() == self.correct_answer.strip().lower()
+        return self.normalize_answer(answer) == self.normalize_answer(self.correct_answer)
         
     def validate(self) -> bool:
         """Validate test data"""
@@ -60,8 +65,8 @@ class Test:
             self.option3 and len(self.option3.strip()) > 0
         )
         
-    def to_dict(self, include_answer: bool = True) -> dict:
-        """Convert to dictionary (for API responses)"""
+    def to_dict(self, include_answer: bool = True, rng: Optional[random.Random] = None) -> dict:
+        """Convert to dictionary (for API responses); ``rng`` orders the options"""
         data = {
             'id': self.id,
             'topic_id': self.topic_id,
@@ -70,6 +75,6 @@ class Test:
             'option1': self.option1,
             'option2': self.option2,
             'option3': self.option3,
-            'options': self.get_shuffled_options()
+            'options': self.get_shuffled_options(rng)
         }
         return data 
\ No newline at end of file
@@ -1,9 +1,13 @@
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 from datetime import datetime
 import logging
 
 from backend.dao.base_dao import BaseDAO
+from backend.dao.content_versions import ContentVersions, content_versions
 from backend.dao.tests.test_entity import TestEntity
+from backend.dao.tests.answer_key_cache import AnswerKey, AnswerKeyCache, answer_key_cache
+from backend.dao.tests.quiz_sampler import sample_ids
+from backend.utils.cache import ResultCache, result_cache
 from backend.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -11,6 +15,13 @@ logger = logging.getLogger(__name__)
 class TestDAO(BaseDAO):
     """Data Access Object for tests table."""
 
+    def __init__(self, answer_keys: AnswerKeyCache = answer_key_cache,
+                 versions: ContentVersions = content_versions,
+                 cache: ResultCache = result_cache):
+        self.answer_keys = answer_keys
+        self.versions = versions
+        self.cache = cache
+
     def create_test(self, topic_id: int, question: str, correct_answer: str,
                    option1: str, option2: str, option3: str) -> Optional[TestEntity]:
         """Creates a new test in the database."""
@@ -22,13 +33,54 @@ class TestDAO(BaseDAO):
             created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             params = (topic_id, question, correct_answer, option1, option2, option3, created_at)
             
-            test_id = self.insert(query, params)
+            with self.get_cursor() as cursor:
+                cursor.execute(query, params)
+                test_id = cursor.lastrowid
+                self.versions.bump(cursor, topic_id)
+            self.answer_keys.invalidate(topic_id)
+            self.versions.invalidate()
+            self.cache.invalidate(f'topic:{topic_id}')
             return TestEntity(test_id, topic_id, question, correct_answer, 
                             option1, option2, option3, created_at)
         except Exception as e:
             logger.error(f"Error creating test: {str(e)}")
             raise DatabaseError("Failed to create test")
 
+    def bulk_create(self, rows: List[Tuple[int, str, str, str, str, str]]) -> int:
+        """Inserts many (topic_id, question, correct_answer, option1, option2, option3) rows in one transaction."""
+        if not rows:
+            return 0
+        try:
+            query = """
+                INSERT INTO tests (topic_id, question, correct_answer, option1, option2, option3, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            topic_ids = sorted({row[0] for row in rows})
+            with self.get_cursor() as cursor:
+                cursor.executemany(query, [row + (created_at,) for row in rows])
+                for topic_id in topic_ids:
+                    self.versions.bump(cursor, topic_id)
+            for topic_id in topic_ids:
+                self.answer_keys.invalidate(topic_id)
+            self.versions.invalidate()
+            self.cache.invalidate(*(f'topic:{topic_id}' for topic_id in topic_ids))
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error bulk creating {len(rows)} tests: {str(e)}")
+            raise DatabaseError("Failed to bulk create tests")
+
+    def get_question_keys(self) -> Set[Tuple[int, str]]:
+        """(topic_id, case-folded question) of every test, for de-duplicating imports."""
+        try:
+            keys = set()
+            for rows in self.stream_query("SELECT topic_id, question FROM tests"):
+                keys.update((row[0], row[1].strip().casefold()) for row in rows)
+            return keys
+        except Exception as e:
+            logger.error(f"Error retrieving test keys: {str(e)}")
+            raise DatabaseError("Failed to retrieve test keys")
+
     def get_test_by_id(self, test_id: int) -> Optional[TestEntity]:
         """Retrieves a test by its ID."""
         try:
@@ -49,6 +101,21 @@ class TestDAO(BaseDAO):
             logger.error(f"Error retrieving tests for topic {topic_id}: {str(e)}")
             raise DatabaseError(f"Failed to retrieve tests for topic {topic_id}")
 
+    def get_answer_key(self, topic_id: int) -> AnswerKey:
+        """Retrieves the normalized answer key of a topic, from cache when possible."""
+        key = self.answer_keys.get(topic_id)
+        if key is not None:
+            return key
+        generation = self.answer_keys.generation
+        try:
+            query = "SELECT id, correct_answer FROM tests WHERE topic_id = %s"
+            key = AnswerKey.from_rows(self.fetch_all(query, (topic_id,)))
+        except Exception as e:
+            logger.error(f"Error retrieving answer key for topic {topic_id}: {str(e)}")
+            raise DatabaseError(f"Failed to retrieve answer key for topic {topic_id}")
+        self.answer_keys.put(topic_id, key, generation)
+        return key
+
     def update_test(self, test_id: int, question: str, correct_answer: str,
                    option1: str, option2: str, option3: str) -> bool:
         """Updates an existing test."""
@@ -59,7 +126,12 @@ class TestDAO(BaseDAO):
                 WHERE id = %s
             """
             params = (question, correct_answer, option1, option2, option3, test_id)
-            return self.execute(query, params)
+            with self.get_cursor() as cursor:
+                cursor.execute(query, params)
+                updated = cursor.rowcount > 0
+                topic_id = self.versions.bump_owner(cursor, 'tests', test_id) if updated else None
+            self._invalidate(test_id, topic_id)
+            return updated
         except Exception as e:
             logger.error(f"Error updating test {test_id}: {str(e)}")
             raise DatabaseError(f"Failed to update test {test_id}")
@@ -68,17 +140,41 @@ class TestDAO(BaseDAO):
         """Deletes a test by its ID."""
         try:
             query = "DELETE FROM tests WHERE id = %s"
-            return self.execute(query, (test_id,))
+            with self.get_cursor() as cursor:
+                # Look up the owning topic before the row is gone
+                topic_id = self.versions.bump_owner(cursor, 'tests', test_id)
+                cursor.execute(query, (test_id,))
+                deleted = cursor.rowcount > 0
+            self._invalidate(test_id, topic_id)
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting test {test_id}: {str(e)}")
             raise DatabaseError(f"Failed to delete test {test_id}")
 
-    def get_random_tests(self, topic_id: int, limit: int = 10) -> List[TestEntity]:
-        """Retrieves random tests for a specific topic."""
+    def _invalidate(self, test_id: int, topic_id: Optional[int]) -> None:
+        """Drops cached answer keys and reads of a changed test and of its topic."""
+        self.answer_keys.invalidate_test(test_id)
+        self.versions.invalidate()
+        tags = [f'test:{test_id}']
+        if topic_id is not None:
+            tags.append(f'topic:{topic_id}')
+        self.cache.invalidate(*tags)
+
+    def get_tests_by_ids(self, test_ids: List[int]) -> List[TestEntity]:
+        """Retrieves tests by primary key, in the order the IDs are given."""
+        if not test_ids:
+            return []
         try:
-            query = "SELECT * FROM tests WHERE topic_id = %s ORDER BY RAND() LIMIT %s"
-            rows = self.fetch_all(query, (topic_id, limit))
-            return [TestEntity.from_db_row(row) for row in rows]
+            placeholders = ', '.join(['%s'] * len(test_ids))
+            query = f"SELECT * FROM tests WHERE id IN ({placeholders})"
+            rows = self.fetch_all(query, tuple(test_ids))
+            by_id = {row[0]: TestEntity.from_db_row(row) for row in rows}
+            return [by_id[test_id] for test_id in test_ids if test_id in by_id]
         except Exception as e:
-            logger.error(f"Error retrieving random tests for topic {topic_id}: {str(e)}")
-            raise DatabaseError(f"Failed to retrieve random tests for topic {topic_id}") 
\ No newline at end of file
+            logger.error(f"Error retrieving tests {test_ids}: {str(e)}")
+            raise DatabaseError("Failed to retrieve tests")
+
+    def get_random_tests(self, topic_id: int, limit: int = 10, seed: Optional[int] = None) -> List[TestEntity]:
+        """Retrieves random tests for a specific topic; the same seed gives the same tests."""
+        question_ids = self.get_answer_key(topic_id).question_ids
+        return self.get_tests_by_ids(sample_ids(question_ids, limit, seed))
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+import logging
+from backend.database.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+class UnitOfWork:
+    """One database transaction shared by several DAO writes
+
+    DAO write methods that accept a ``uow`` run their statements on its
+    cursor and register their in-memory side effects (index updates, cache
+    invalidation) with ``after_commit``, so those happen only once every
+    write of the unit has committed, and not at all if it rolls back.
+
+    Usage:
+        with UnitOfWork() as uow:
+            test_result_dao.create(..., uow=uow)
+            leaderboard_dao.record_score(..., uow=uow)
+    """
+
+    def __init__(self):
+        self.cursor = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._connection = None
+        self._connection_context = None
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once the transaction has committed"""
+        self._callbacks.append(callback)
+
+    def __enter__(self) -> 'UnitOfWork':
+        self._connection_context = get_connection()
+        self._connection = self._connection_context.__enter__()
+        self.cursor = self._connection.cursor()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        committed = False
+        try:
+            if exc_type is None:
+                self._connection.commit()
+                committed = True
+        finally:
+            if not committed:
+                self._connection.rollback()
+            self.cursor.close()
+            self.cursor = None
+            self._connection_context.__exit__(exc_type, exc, tb)
+        if committed:
+            for callback in self._callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    # The data is committed; a stale cache or index entry expires on its own
+                    logger.error("After-commit callback failed: %s", e)
+        self._callbacks.clear()
+        return False
+
+@contextmanager
+def unit_of_work(uow: Optional[UnitOfWork] = None) -> Iterator[UnitOfWork]:
+    """Join ``uow`` when given, otherwise run a unit of work of its own"""
+    if uow is not None:
+        yield uow
+        return
+    with UnitOfWork() as own:
+        yield own
@@ -13,40 +13,38 @@ class User:
         self.id = id
         self.username = username
         self.email = email
-        self._password = self._hash_password(password) if not password.startswith('$2a$') and not password.startswith('$2b$') else password
+        self._password = password if self.is_password_hash(password) else self._hash_password(password)
         self.created_at = created_at or datetime.now()
         
+    @staticmethod
+    def is_password_hash(value: str) -> bool:
+        """Whether a value is already a bcrypt hash"""
+        return value.startswith('$2a$') or value.startswith('$2b$')
+        
     @staticmethod
     def _hash_password(password: str) -> str:
         """Hash password using bcrypt"""
         try:
-            logger.debug(f"Hashing password for user")
             salt = bcrypt.gensalt(rounds=10, prefix=b'2a')
             hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-            logger.debug(f"Password hashed successfully")
             return hashed.decode('utf-8')
         except Exception as e:
-            logger.error(f"Error hashing password: {str(e)}")
+            logger.error("Error hashing password: %s", e)
             raise
         
     def verify_password(self, password: str) -> bool:
         """Verify password"""
         try:
-            logger.debug(f"Verifying password for user {self.username}")
-            logger.debug(f"Stored password hash: {self._password}")
-            logger.debug(f"Input password: {password}")
-            
             # Convert stored hash and input password to bytes for bcrypt
             stored_hash = self._password.encode('utf-8')
             input_password = password.encode('utf-8')
             
             # Use bcrypt to verify the password
             result = bcrypt.checkpw(input_password, stored_hash)
-            logger.debug(f"Password verification result: {result}")
             return result
             
         except Exception as e:
-            logger.error(f"Error verifying password for user {self.username}: {str(e)}")
+            logger.error("Error verifying password for user %s: %s", self.username, e)
             return False
         
     def validate(self) -> bool:
@@ -74,8 +72,8 @@ class User:
         
     @password.setter
     def password(self, value: str):
-        """Set and hash password"""
-        self._password = self._hash_password(value)
+        """Set password, hashing it unless it is already a hash"""
+        self._password = value if self.is_password_hash(value) else self._hash_password(value)
         
     def to_dict(self) -> Dict:
         """
@@ -1,7 +1,8 @@
 from typing import List, Optional
 from datetime import datetime
+from contextlib import contextmanager
 import logging
-from backend.database.database import get_db
+from backend.database.database import get_connection
 from backend.config.config import TABLE_CONFIG
 from .user_interface import IUserDAO
 from .user_entity import UserEntity
@@ -14,15 +15,24 @@ class UserDAO(IUserDAO):
     """Implementation of User Data Access Object"""
     
     def __init__(self):
-        self.db = get_db()
         self.table = TABLE_CONFIG['users']
+
+    @contextmanager
+    def _cursor(self):
+        """Borrow a pooled connection and open a cursor on it"""
+        with get_connection() as db:
+            cursor = db.cursor()
+            try:
+                yield db, cursor
+            finally:
+                cursor.close()
         
     def get_all(self) -> List[User]:
         """Get all users"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute(f"SELECT id, username, email, password, created_at FROM {self.table}")
-            rows = cursor.fetchall()
+            with self._cursor() as (db, cursor):
+                cursor.execute(f"SELECT id, username, email, password, created_at FROM {self.table}")
+                rows = cursor.fetchall()
             return [User(
                 id=row[0],
                 username=row[1], 
@@ -38,23 +48,23 @@ class UserDAO(IUserDAO):
         try:
             # Đảm bảo user_id là kiểu số
             if isinstance(user_id, str):
-                logger.info(f"Converting user_id from string '{user_id}' to integer")
+                logger.debug("Converting user_id from string '%s' to integer", user_id)
                 try:
                     user_id = int(user_id)
                 except ValueError as e:
-                    logger.error(f"Cannot convert user_id to integer: {str(e)}")
+                    logger.error("Cannot convert user_id to integer: %s", e)
                     return None
                 
-            logger.info(f"Getting user by ID: {user_id} (type: {type(user_id)})")
-            
-            cursor = self.db.cursor()
-            cursor.execute(
-                f"SELECT id, username, email, password, created_at FROM {self.table} WHERE id = %s",
-                (user_id,)
-            )
-            row = cursor.fetchone()
+            logger.debug("Getting user by ID: %s (type: %s)", user_id, type(user_id))
+            
+            with self._cursor() as (db, cursor):
+                cursor.execute(
+                    f"SELECT id, username, email, password, created_at FROM {self.table} WHERE id = %s",
+                    (user_id,)
+                )
+                row = cursor.fetchone()
             if not row:
-                logger.info(f"User with ID {user_id} not found")
+                logger.debug("User with ID %s not found", user_id)
                 return None
                 
             user = User(
@@ -64,10 +74,10 @@ class UserDAO(IUserDAO):
                 password=row[3],
                 created_at=row[4]
             )
-            logger.info(f"Found user: {user.username}, id: {user.id}")
+            logger.debug("Found user: %s, id: %s", user.username, user.id)
             return user
         except Exception as e:
-            logger.error(f"Failed to get user by ID {user_id}: {str(e)}")
+            logger.error("Failed to get user by ID %s: %s", user_id, e)
             import traceback
             logger.error(traceback.format_exc())
             raise DatabaseError(f"Failed to get user: {str(e)}")
@@ -75,15 +85,15 @@ class UserDAO(IUserDAO):
     def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
         try:
-            logger.debug(f"Getting user by username: {username}")
-            cursor = self.db.cursor()
-            cursor.execute(
-                f"SELECT id, username, email, password, created_at FROM {self.table} WHERE username = %s",
-                (username,)
-            )
-            row = cursor.fetchone()
+            logger.debug("Getting user by username: %s", username)
+            with self._cursor() as (db, cursor):
+                cursor.execute(
+                    f"SELECT id, username, email, password, created_at FROM {self.table} WHERE username = %s",
+                    (username,)
+                )
+                row = cursor.fetchone()
             if not row:
-                logger.debug(f"User not found: {username}")
+                logger.debug("User not found: %s", username)
                 return None
                 
             user = User(
@@ -93,10 +103,10 @@ class UserDAO(IUserDAO):
                 password=row[3],
                 created_at=row[4]
             )
-            logger.debug(f"Found user: {user.username}, id: {user.id}")
+            logger.debug("Found user: %s, id: %s", user.username, user.id)
             return user
         except Exception as e:
-            logger.error(f"Failed to get user by username {username}: {str(e)}")
+            logger.error("Failed to get user by username %s: %s", username, e)
             raise DatabaseError(f"Failed to get user: {str(e)}")
         
     def create(self, user: User) -> Optional[User]:
@@ -111,37 +121,34 @@ class UserDAO(IUserDAO):
         Raises:
             DatabaseError: If database operation fails
         """
-        cursor = None
         try:
-            cursor = self.db.cursor()
-            logger.debug(f"Creating new user: {user.username}")
-            
-            # Insert user
-            cursor.execute(
-                f"INSERT INTO {self.table} (username, email, password, created_at) VALUES (%s, %s, %s, %s)",
-                (user.username, user.email, user.password, user.created_at or datetime.now())
-            )
-            
-            # Get inserted ID
-            user_id = cursor.lastrowid
-            
-            # Commit transaction
-            self.db.commit()
-            
+            with self._cursor() as (db, cursor):
+                logger.debug("Creating new user: %s", user.username)
+                try:
+                    # Insert user
+                    cursor.execute(
+                        f"INSERT INTO {self.table} (username, email, password, created_at) VALUES (%s, %s, %s, %s)",
+                        (user.username, user.email, user.password, user.created_at or datetime.now())
+                    )
+
+                    # Get inserted ID
+                    user_id = cursor.lastrowid
+
+                    # Commit transaction
+                    db.commit()
+                except Exception:
+                    # Rollback on error
+                    db.rollback()
+                    raise
+
             # Return user with ID
             user.id = user_id
-            logger.info(f"Created user successfully: {user.username}, id: {user.id}")
+            logger.info("Created user successfully: %s, id: %s", user.username, user.id)
             return user
                 
         except Exception as e:
-            # Rollback on error
-            if self.db:
-                self.db.rollback()
-            logger.error(f"Failed to create user {user.username}: {str(e)}")
+            logger.error("Failed to create user %s: %s", user.username, e)
             raise DatabaseError(f"Failed to create user: {str(e)}")
-        finally:
-            if cursor:
-                cursor.close()
         
     def update(self, user: User) -> bool:
         """Update user
@@ -155,61 +162,55 @@ class UserDAO(IUserDAO):
         Raises:
             DatabaseError: If database operation fails
         """
-        cursor = None
         try:
-            cursor = self.db.cursor()
-            
-            # Update user
-            cursor.execute(
-                f"UPDATE {self.table} SET username = %s, email = %s, password = %s WHERE id = %s",
-                (user.username, user.email, user.password, user.id)
-            )
-            
-            # Commit transaction
-            self.db.commit()
-            
-            return cursor.rowcount > 0
+            with self._cursor() as (db, cursor):
+                try:
+                    # Update user
+                    cursor.execute(
+                        f"UPDATE {self.table} SET username = %s, email = %s, password = %s WHERE id = %s",
+                        (user.username, user.email, user.password, user.id)
+                    )
+
+                    # Commit transaction
+                    db.commit()
+                except Exception:
+                    # Rollback on error
+                    db.rollback()
+                    raise
+
+                return cursor.rowcount > 0
                 
         except Exception as e:
-            # Rollback on error
-            if self.db:
-                self.db.rollback()
             raise DatabaseError(f"Failed to update user: {str(e)}")
-        finally:
-            if cursor:
-                cursor.close()
             
     def delete(self, user_id: int) -> bool:
         """Delete user"""
-        cursor = None
         try:
-            cursor = self.db.cursor()
-            
-            cursor.execute(f"DELETE FROM {self.table} WHERE id = %s", (user_id,))
-            
-            # Commit transaction
-            self.db.commit()
-            
-            return cursor.rowcount > 0
+            with self._cursor() as (db, cursor):
+                try:
+                    cursor.execute(f"DELETE FROM {self.table} WHERE id = %s", (user_id,))
+
+                    # Commit transaction
+                    db.commit()
+                except Exception:
+                    # Rollback on error
+                    db.rollback()
+                    raise
+
+                return cursor.rowcount > 0
                 
         except Exception as e:
-            # Rollback on error
-            if self.db:
-                self.db.rollback()
             raise DatabaseError(f"Failed to delete user: {str(e)}")
-        finally:
-            if cursor:
-                cursor.close()
 
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                f"SELECT id, username, email, password, created_at FROM {self.table} WHERE email = %s",
-                (email,)
-            )
-            row = cursor.fetchone()
+            with self._cursor() as (db, cursor):
+                cursor.execute(
+                    f"SELECT id, username, email, password, created_at FROM {self.table} WHERE email = %s",
+                    (email,)
+                )
+                row = cursor.fetchone()
             if not row:
                 return None
                 
@@ -1,9 +1,14 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import logging
+import threading
 
 from backend.dao.base_dao import BaseDAO
+from backend.dao.content_versions import ContentVersions, content_versions
 from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+from backend.dao.vocabularies.vocabulary_search_index import VocabularySearchIndex, vocabulary_search_index
+from backend.dao.vocabularies.vocabulary_suggester import VocabularySuggester, vocabulary_suggester
+from backend.utils.cache import ResultCache, result_cache
 from backend.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
@@ -11,6 +16,19 @@ logger = logging.getLogger(__name__)
 class VocabularyDAO(BaseDAO):
     """Data Access Object for vocabularies table."""
 
+    def __init__(self, versions: ContentVersions = content_versions,
+                 cache: ResultCache = result_cache,
+                 search_index: VocabularySearchIndex = vocabulary_search_index,
+                 suggester: VocabularySuggester = vocabulary_suggester):
+        self.versions = versions
+        self.cache = cache
+        self.search_index = search_index
+        self.suggester = suggester
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_pending = False
+        self._index_writes = 0
+
     def create_vocabulary(self, topic_id: int, word: str, meaning: str, phonetic: str) -> Optional[VocabularyEntity]:
         """Creates a new vocabulary in the database."""
         try:
@@ -21,8 +39,17 @@ class VocabularyDAO(BaseDAO):
             created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             params = (topic_id, word, meaning, phonetic, created_at)
             
-            vocabulary_id = self.insert(query, params)
-            return VocabularyEntity(vocabulary_id, topic_id, word, meaning, phonetic)
+            with self.get_cursor() as cursor:
+                cursor.execute(query, params)
+                vocabulary_id = cursor.lastrowid
+                self.versions.bump(cursor, topic_id)
+            self.versions.invalidate()
+            self.cache.invalidate(f'topic:{topic_id}')
+            vocabulary = VocabularyEntity(vocabulary_id, topic_id, word, meaning, phonetic, created_at)
+            self.search_index.add(vocabulary)
+            self.suggester.add(vocabulary)
+            self._index_changed()
+            return vocabulary
         except Exception as e:
             logger.error(f"Error creating vocabulary: {str(e)}")
             raise DatabaseError("Failed to create vocabulary")
@@ -56,7 +83,16 @@ class VocabularyDAO(BaseDAO):
                 WHERE id = %s
             """
             params = (word, meaning, phonetic, vocabulary_id)
-            return self.execute(query, params)
+            with self.get_cursor() as cursor:
+                cursor.execute(query, params)
+                updated = cursor.rowcount > 0
+                topic_id = self.versions.bump_owner(cursor, 'vocabularies', vocabulary_id) if updated else None
+            self._invalidate(vocabulary_id, topic_id)
+            if updated:
+                self.search_index.update(vocabulary_id, word, meaning, phonetic)
+                self.suggester.update(VocabularyEntity(vocabulary_id, topic_id, word, meaning, phonetic))
+                self._index_changed()
+            return updated
         except Exception as e:
             logger.error(f"Error updating vocabulary {vocabulary_id}: {str(e)}")
             raise DatabaseError(f"Failed to update vocabulary {vocabulary_id}")
@@ -65,23 +101,138 @@ class VocabularyDAO(BaseDAO):
         """Deletes a vocabulary by its ID."""
         try:
             query = "DELETE FROM vocabularies WHERE id = %s"
-            return self.execute(query, (vocabulary_id,))
+            with self.get_cursor() as cursor:
+                # Look up the owning topic before the row is gone
+                topic_id = self.versions.bump_owner(cursor, 'vocabularies', vocabulary_id)
+                cursor.execute(query, (vocabulary_id,))
+                deleted = cursor.rowcount > 0
+            self._invalidate(vocabulary_id, topic_id)
+            self.search_index.remove(vocabulary_id)
+            self.suggester.remove(vocabulary_id)
+            self._index_changed()
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting vocabulary {vocabulary_id}: {str(e)}")
             raise DatabaseError(f"Failed to delete vocabulary {vocabulary_id}")
 
-    def search_vocabularies(self, keyword: str) -> List[VocabularyEntity]:
-        """Searches vocabularies by keyword in word or meaning."""
+    def _invalidate(self, vocabulary_id: int, topic_id: Optional[int]) -> None:
+        """Drops cached reads of a changed vocabulary and of its topic."""
+        self.versions.invalidate()
+        tags = [f'vocabulary:{vocabulary_id}']
+        if topic_id is not None:
+            tags.append(f'topic:{topic_id}')
+        self.cache.invalidate(*tags)
+
+    def bulk_create(self, rows: List[Tuple[int, str, str, str]]) -> int:
+        """Inserts many (topic_id, word, meaning, phonetic) rows in one transaction.
+
+        The search index and suggester are not updated row by row; call
+        refresh_search_index once the whole import is done.
+        """
+        if not rows:
+            return 0
         try:
             query = """
-                SELECT * FROM vocabularies 
-                WHERE word LIKE %s OR meaning LIKE %s 
-                ORDER BY created_at DESC
+                INSERT INTO vocabularies (topic_id, word, meaning, phonetic, created_at)
+                VALUES (%s, %s, %s, %s, %s)
             """
-            search_pattern = f"%{keyword}%"
-            params = (search_pattern, search_pattern)
-            rows = self.fetch_all(query, params)
-            return [VocabularyEntity.from_db_tuple(row) for row in rows]
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            topic_ids = sorted({row[0] for row in rows})
+            with self.get_cursor() as cursor:
+                cursor.executemany(query, [row + (created_at,) for row in rows])
+                for topic_id in topic_ids:
+                    self.versions.bump(cursor, topic_id)
+            self.versions.invalidate()
+            self.cache.invalidate(*(f'topic:{topic_id}' for topic_id in topic_ids))
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error bulk creating {len(rows)} vocabularies: {str(e)}")
+            raise DatabaseError("Failed to bulk create vocabularies")
+
+    def get_word_keys(self) -> Set[Tuple[int, str]]:
+        """(topic_id, case-folded word) of every vocabulary, for de-duplicating imports."""
+        try:
+            keys = set()
+            for rows in self.stream_query("SELECT topic_id, word FROM vocabularies"):
+                keys.update((row[0], row[1].strip().casefold()) for row in rows)
+            return keys
         except Exception as e:
-            logger.error(f"Error searching vocabularies with keyword '{keyword}': {str(e)}")
-            raise DatabaseError("Failed to search vocabularies") 
\ No newline at end of file
+            logger.error(f"Error retrieving vocabulary keys: {str(e)}")
+            raise DatabaseError("Failed to retrieve vocabulary keys")
+
+    def rebuild_search_index(self) -> None:
+        """Reloads the in-memory search index and suggester from the database."""
+        if not self._rebuild():
+            # A write reached the old index while the rows were being read
+            self.refresh_search_index()
+
+    def _rebuild(self) -> bool:
+        """Reloads the index; False if a single-row write raced with the reload and may be missing."""
+        with self._refresh_lock:
+            writes = self._index_writes
+        try:
+            rows = self.fetch_all("SELECT * FROM vocabularies")
+        except Exception as e:
+            logger.error(f"Error rebuilding vocabulary search index: {str(e)}")
+            raise DatabaseError("Failed to rebuild vocabulary search index")
+        vocabularies = [VocabularyEntity.from_db_tuple(row) for row in rows]
+        self.search_index.load(vocabularies)
+        self.suggester.load(vocabularies)
+        with self._refresh_lock:
+            return self._index_writes == writes
+
+    def _index_changed(self) -> None:
+        """Counts a write applied to the index, so a reload that read the rows before it runs again."""
+        with self._refresh_lock:
+            self._index_writes += 1
+
+    def refresh_search_index(self) -> None:
+        """Rebuilds the search index and suggester on a background thread.
+
+        Searches and suggestions keep using the current index until the new
+        one is swapped in. A refresh requested while one is running, or a
+        write that lands during it, makes it run once more when it finishes.
+        """
+        with self._refresh_lock:
+            if self._refreshing:
+                self._refresh_pending = True
+                return
+            self._refreshing, self._refresh_pending = True, False
+
+        def rebuild():
+            while True:
+                try:
+                    current = self._rebuild()
+                except DatabaseError:
+                    # Logged by _rebuild; the next stale read retries
+                    with self._refresh_lock:
+                        self._refreshing = False
+                    return
+                with self._refresh_lock:
+                    if current and not self._refresh_pending:
+                        self._refreshing = False
+                        return
+                    self._refresh_pending = False
+
+        threading.Thread(target=rebuild, name='vocabulary-index-refresh', daemon=True).start()
+
+    def _ensure_loaded(self, structure) -> None:
+        """Loads the index on first use; an expired one keeps serving while it is refreshed."""
+        if structure.is_stale():
+            self.refresh_search_index()
+        elif not structure.is_loaded():
+            self.rebuild_search_index()
+
+    def search_ranked(self, keyword: str, topic_id: Optional[int] = None) -> List[Tuple[VocabularyEntity, str]]:
+        """Searches word, meaning and phonetic; returns (vocabulary, match tier) pairs, best first."""
+        self._ensure_loaded(self.search_index)
+        return self.search_index.search(keyword, topic_id)
+
+    def search_vocabularies(self, keyword: str) -> List[VocabularyEntity]:
+        """Searches vocabularies by keyword in word, meaning or phonetic, best matches first."""
+        return [vocabulary for vocabulary, _ in self.search_ranked(keyword)]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Completions of a prefix among words and meaning glosses, without a query."""
+        self._ensure_loaded(self.suggester)
+        return self.suggester.suggest(prefix, limit)
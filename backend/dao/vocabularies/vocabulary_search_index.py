@@ -0,0 +1,258 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import replace
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from backend.config.config import SEARCH_CONFIG
+from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+
+# Match tiers, best first
+EXACT = 'exact'
+PREFIX = 'prefix'
+SUBSTRING = 'substring'
+FUZZY = 'fuzzy'
+TIER_RANKS = {EXACT: 3, PREFIX: 2, SUBSTRING: 1, FUZZY: 0}
+
+# Within a tier a hit on the word beats one on the meaning or the phonetic
+FIELD_WEIGHTS = (('word', 3), ('meaning', 2), ('phonetic', 1))
+
+_NON_WORD = re.compile(r'\W+')
+GLOSS_SEPARATORS = re.compile(r'[,;/|]')
+# Every combining mark in the BMP, so diacritics go in one regex pass instead of a per-character loop
+_COMBINING = re.compile('[%s]' % ''.join(
+    re.escape(chr(code)) for code in range(0x10000) if unicodedata.combining(chr(code))))
+
+def fold(text: Optional[str]) -> str:
+    """Lower-case text and strip diacritics, so "Cảm ơn" and "cam on" compare equal
+
+    Punctuation becomes single spaces. đ/Đ have no Unicode decomposition
+    and are mapped to d explicitly.
+    """
+    if not text:
+        return ''
+    if text.isascii():
+        return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+    text = unicodedata.normalize('NFKD', text.replace('đ', 'd').replace('Đ', 'D'))
+    text = _COMBINING.sub('', text)
+    return ' '.join(_NON_WORD.sub(' ', text.casefold()).split())
+
+def trigrams(token: str) -> Set[str]:
+    """Trigrams of a token padded with one space on each side"""
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class _Document:
+    """Folded, searchable form of one vocabulary"""
+
+    __slots__ = ('entity', 'fields', 'tokens')
+
+    def __init__(self, entity: VocabularyEntity):
+        self.entity = entity
+        # Each field keeps its whole folded text plus every gloss of it,
+        # so "cảm ơn; cám ơn" is an exact match for either spelling
+        self.fields: Dict[str, Tuple[str, ...]] = {}
+        self.tokens: Set[str] = set()
+        for name, _ in FIELD_WEIGHTS:
+            value = getattr(entity, name) or ''
+            whole = fold(value)
+            parts = GLOSS_SEPARATORS.split(value)
+            glosses = [fold(part) for part in parts] if len(parts) > 1 else []
+            self.fields[name] = tuple(dict.fromkeys(v for v in [whole] + glosses if v))
+            self.tokens.update(whole.split())
+
+    def best_match(self, query: str) -> Tuple[str, int]:
+        """Best (tier, field weight) of a folded query against this document"""
+        best_tier, best_weight = FUZZY, 0
+        for name, weight in FIELD_WEIGHTS:
+            for value in self.fields[name]:
+                if value == query:
+                    tier = EXACT
+                elif value.startswith(query) or f" {query}" in value:
+                    tier = PREFIX
+                elif query in value:
+                    tier = SUBSTRING
+                else:
+                    continue
+                if (TIER_RANKS[tier], weight) > (TIER_RANKS[best_tier], best_weight):
+                    best_tier, best_weight = tier, weight
+        return best_tier, best_weight
+
+class VocabularySearchIndex:
+    """In-memory inverted and trigram index over word, meaning and phonetic
+
+    Folded tokens map to the vocabularies containing them; token trigrams
+    map to tokens, which finds substrings and misspellings without scanning.
+    Every query token must match (exactly, as a prefix, as a substring or
+    fuzzily) some token of a result. Results are ranked exact > prefix >
+    substring > fuzzy on the whole query, then by field and similarity.
+    The VocabularyDAO write methods keep the index current; it is reloaded
+    after ``ttl`` seconds so writes from other worker processes are picked up.
+    """
+
+    def __init__(self, ttl: float = 0, fuzzy_threshold: float = 0.4):
+        self.ttl = ttl
+        self.fuzzy_threshold = fuzzy_threshold
+        self._docs: Dict[int, _Document] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def is_loaded(self) -> bool:
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            return False
+        return not self.ttl or time.monotonic() - loaded_at < self.ttl
+
+    def is_stale(self) -> bool:
+        """Loaded once but past its ``ttl``, so searches may go on while it is reloaded"""
+        return self._loaded_at is not None and not self.is_loaded()
+
+    def load(self, entities: Iterable[VocabularyEntity]) -> None:
+        """Replace the whole index; it is built before the lock is taken"""
+        fresh = VocabularySearchIndex(self.ttl, self.fuzzy_threshold)
+        for entity in entities:
+            fresh._add(entity)
+        with self._lock:
+            self._docs, self._postings = fresh._docs, fresh._postings
+            self._grams, self._gram_counts = fresh._grams, fresh._gram_counts
+            self._sorted_tokens = None
+            self._loaded_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Forget everything so the index is reloaded on next use"""
+        with self._lock:
+            self.load(())
+            self._loaded_at = None
+
+    def add(self, entity: VocabularyEntity) -> None:
+        """Apply a committed insert; ignored until the index is loaded"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(entity.id)
+                self._add(entity)
+
+    def update(self, vocabulary_id: int, word: str, meaning: str, phonetic: str) -> None:
+        """Apply a committed update"""
+        with self._lock:
+            doc = self._docs.get(vocabulary_id)
+            if doc is not None:
+                self._remove(vocabulary_id)
+                self._add(replace(doc.entity, word=word, meaning=meaning, phonetic=phonetic))
+
+    def remove(self, vocabulary_id: int) -> None:
+        """Apply a committed delete"""
+        with self._lock:
+            self._remove(vocabulary_id)
+
+    def _add(self, entity: VocabularyEntity) -> None:
+        doc = _Document(entity)
+        self._docs[entity.id] = doc
+        for token in doc.tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                grams = trigrams(token)
+                self._gram_counts[token] = len(grams)
+                for gram in grams:
+                    self._grams.setdefault(gram, set()).add(token)
+                self._sorted_tokens = None
+            postings.add(entity.id)
+
+    def _remove(self, vocabulary_id: int) -> None:
+        doc = self._docs.pop(vocabulary_id, None)
+        if doc is None:
+            return
+        for token in doc.tokens:
+            postings = self._postings[token]
+            postings.discard(vocabulary_id)
+            if postings:
+                continue
+            del self._postings[token]
+            del self._gram_counts[token]
+            for gram in trigrams(token):
+                tokens = self._grams[gram]
+                tokens.discard(token)
+                if not tokens:
+                    del self._grams[gram]
+            self._sorted_tokens = None
+
+    def _tokens(self) -> List[str]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        return self._sorted_tokens
+
+    def _match_token(self, token: str) -> Dict[str, float]:
+        """Index tokens matching one query token, with a similarity in (0, 1]"""
+        matches: Dict[str, float] = {}
+        if token in self._postings:
+            matches[token] = 1.0
+        tokens = self._tokens()
+        i = bisect.bisect_left(tokens, token)
+        while i < len(tokens) and tokens[i].startswith(token):
+            matches.setdefault(tokens[i], 0.9)
+            i += 1
+        if len(token) < 3:
+            return matches
+
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        for candidate, count in shared.items():
+            if candidate in matches:
+                continue
+            if token in candidate:
+                matches[candidate] = 0.8
+                continue
+            similarity = count / (len(grams) + self._gram_counts[candidate] - count)
+            if similarity >= self.fuzzy_threshold:
+                matches[candidate] = 0.7 * similarity
+        return matches
+
+    def search(self, query: str, topic_id: Optional[int] = None) -> List[Tuple[VocabularyEntity, str]]:
+        """Ranked (vocabulary, match tier) pairs for a free-text query"""
+        folded = fold(query)
+        if not folded:
+            return []
+        with self._lock:
+            candidates: Optional[Dict[int, float]] = None
+            for token in folded.split():
+                scores: Dict[int, float] = {}
+                for matched, similarity in self._match_token(token).items():
+                    for doc_id in self._postings[matched]:
+                        if similarity > scores.get(doc_id, 0.0):
+                            scores[doc_id] = similarity
+                if candidates is None:
+                    candidates = scores
+                else:
+                    candidates = {doc_id: candidates[doc_id] + score
+                                  for doc_id, score in scores.items() if doc_id in candidates}
+                if not candidates:
+                    return []
+
+            ranked = []
+            for doc_id, similarity in candidates.items():
+                doc = self._docs[doc_id]
+                if topic_id is not None and doc.entity.topic_id != topic_id:
+                    continue
+                tier, weight = doc.best_match(folded)
+                sort_key = (-TIER_RANKS[tier], -weight, -similarity, len(doc.entity.word), doc_id)
+                ranked.append((sort_key, doc.entity, tier))
+        ranked.sort(key=itemgetter(0))
+        return [(entity, tier) for _, entity, tier in ranked]
+
+# Shared by every VocabularyDAO in the process
+vocabulary_search_index = VocabularySearchIndex(
+    ttl=SEARCH_CONFIG['index_ttl'],
+    fuzzy_threshold=SEARCH_CONFIG['fuzzy_threshold']
+)
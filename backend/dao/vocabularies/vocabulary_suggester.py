@@ -0,0 +1,228 @@
+import bisect
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.config.config import SEARCH_CONFIG
+from backend.dao.vocabularies.vocabulary_entity import VocabularyEntity
+from backend.dao.vocabularies.vocabulary_search_index import fold, GLOSS_SEPARATORS
+
+# Entry kinds
+WORD = 0
+MEANING = 1
+KIND_NAMES = ('word', 'meaning')
+
+# (folded key, display text, vocabulary id, kind), keys and texts UTF-8 encoded
+Entry = Tuple[bytes, bytes, int, int]
+
+def run_order(entry: Entry) -> Tuple[bytes, int, bytes, int]:
+    """Sort key of a SortedRun: duplicates of a (key, kind) pair are adjacent"""
+    key, text, vocabulary_id, kind = entry
+    return key, kind, text, vocabulary_id
+
+def entries_for(vocabulary: VocabularyEntity) -> List[Entry]:
+    """Completion entries of a vocabulary: its word and each gloss of its meaning"""
+    entries = []
+    word = (vocabulary.word or '').strip()
+    key = fold(word)
+    if key:
+        entries.append((key.encode('utf-8'), word.encode('utf-8'), vocabulary.id, WORD))
+    for gloss in GLOSS_SEPARATORS.split(vocabulary.meaning or ''):
+        gloss = gloss.strip()
+        key = fold(gloss)
+        if key:
+            entries.append((key.encode('utf-8'), gloss.encode('utf-8'), vocabulary.id, MEANING))
+    return entries
+
+class SortedRun:
+    """Immutable sorted entries packed into two byte blobs plus offset arrays
+
+    Entry ``i``'s key is ``keys[key_offsets[i]:key_offsets[i + 1]]``. One
+    blob and a few machine-word arrays cost a fraction of a list of
+    Python strings, and a binary search only slices ~log2(n) keys.
+    Entries must be sorted by (key, kind); ``group_ends[i]`` is the index
+    past the last entry sharing entry ``i``'s key and kind, so a lookup
+    steps over duplicate glosses ("xin chào" in hundreds of vocabularies)
+    in one jump instead of one at a time.
+    """
+
+    __slots__ = ('keys', 'key_offsets', 'texts', 'text_offsets', 'ids', 'kinds', 'group_ends')
+
+    def __init__(self, entries: Iterable[Entry]):
+        keys, texts = bytearray(), bytearray()
+        self.key_offsets = array('I', [0])
+        self.text_offsets = array('I', [0])
+        self.ids = array('I')
+        self.kinds = array('B')
+        self.group_ends = array('I')
+        group_start, previous = 0, None
+        for i, (key, text, vocabulary_id, kind) in enumerate(entries):
+            if (key, kind) != previous:
+                self.group_ends.extend([i] * (i - group_start))
+                group_start, previous = i, (key, kind)
+            keys += key
+            texts += text
+            self.key_offsets.append(len(keys))
+            self.text_offsets.append(len(texts))
+            self.ids.append(vocabulary_id)
+            self.kinds.append(kind)
+        self.group_ends.extend([len(self.ids)] * (len(self.ids) - group_start))
+        self.keys = bytes(keys)
+        self.texts = bytes(texts)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def key(self, i: int) -> bytes:
+        return self.keys[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def entry(self, i: int) -> Entry:
+        return (self.key(i), self.texts[self.text_offsets[i]:self.text_offsets[i + 1]],
+                self.ids[i], self.kinds[i])
+
+    def lower_bound(self, prefix: bytes) -> int:
+        """Index of the first key not less than ``prefix``"""
+        lo, hi = 0, len(self.ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __iter__(self):
+        return (self.entry(i) for i in range(len(self.ids)))
+
+    def memory_bytes(self) -> int:
+        return sum(sys.getsizeof(part) for part in
+                   (self.keys, self.texts, self.key_offsets, self.text_offsets, self.ids,
+                    self.kinds, self.group_ends))
+
+class VocabularySuggester:
+    """Prefix completions over vocabulary words and folded meaning glosses
+
+    Completions come from a compact SortedRun built at load time plus a
+    small sorted list of entries written since. Deleted or edited
+    vocabularies are masked out of the run by ID. Once the recent list
+    passes ``compact_threshold`` it is merged into a new run. Like the
+    search index, the whole structure is rebuilt from the database after
+    ``ttl`` seconds so writes from other worker processes are picked up.
+    """
+
+    def __init__(self, ttl: float = 0, compact_threshold: int = 10000):
+        self.ttl = ttl
+        self.compact_threshold = compact_threshold
+        self._run = SortedRun(())
+        self._recent: List[Entry] = []
+        self._masked: set = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._run) + len(self._recent)
+
+    def is_loaded(self) -> bool:
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            return False
+        return not self.ttl or time.monotonic() - loaded_at < self.ttl
+
+    def is_stale(self) -> bool:
+        """Loaded once but past its ``ttl``, so lookups may go on while it is reloaded"""
+        return self._loaded_at is not None and not self.is_loaded()
+
+    def load(self, vocabularies: Iterable[VocabularyEntity]) -> None:
+        """Replace every entry; the run is built before the lock is taken"""
+        entries = []
+        for vocabulary in vocabularies:
+            entries.extend(entries_for(vocabulary))
+        entries.sort(key=run_order)
+        run = SortedRun(entries)
+        with self._lock:
+            self._run, self._recent, self._masked = run, [], set()
+            self._loaded_at = time.monotonic()
+
+    def add(self, vocabulary: VocabularyEntity) -> None:
+        """Apply a committed insert; ignored until the suggester is loaded"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for entry in entries_for(vocabulary):
+                bisect.insort(self._recent, entry)
+            if len(self._recent) > self.compact_threshold:
+                self._compact()
+
+    def update(self, vocabulary: VocabularyEntity) -> None:
+        """Apply a committed update"""
+        self.remove(vocabulary.id)
+        self.add(vocabulary)
+
+    def remove(self, vocabulary_id: int) -> None:
+        """Apply a committed delete"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._masked.add(vocabulary_id)
+            self._recent = [entry for entry in self._recent if entry[2] != vocabulary_id]
+
+    def _compact(self) -> None:
+        """Merge recent entries into a new run; caller holds the lock"""
+        masked = self._masked
+        live = (entry for entry in self._run if entry[2] not in masked)
+        entries = sorted(list(live) + self._recent, key=run_order)
+        self._run, self._recent, self._masked = SortedRun(entries), [], set()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Up to ``limit`` distinct completions of a prefix, in folded alphabetical order"""
+        folded = fold(prefix).encode('utf-8')
+        if not folded or limit <= 0:
+            return []
+        suggestions: List[Dict] = []
+        seen = set()
+        with self._lock:
+            run, recent, masked = self._run, self._recent, self._masked
+            i = run.lower_bound(folded)
+            j = bisect.bisect_left(recent, (folded,))
+            while len(suggestions) < limit:
+                if i < len(run) and run.ids[i] in masked:
+                    i += 1
+                    continue
+                run_key = run.key(i) if i < len(run) else None
+                recent_key = recent[j][0] if j < len(recent) else None
+                if recent_key is not None and (run_key is None or recent_key < run_key):
+                    entry = recent[j]
+                    j += 1
+                elif run_key is not None:
+                    entry = run.entry(i)
+                    # Later duplicates of this key and kind would be skipped anyway
+                    i = run.group_ends[i]
+                else:
+                    break
+                key, text, vocabulary_id, kind = entry
+                if not key.startswith(folded):
+                    break
+                if (key, kind) in seen:
+                    continue
+                seen.add((key, kind))
+                suggestions.append({
+                    'text': text.decode('utf-8'),
+                    'type': KIND_NAMES[kind],
+                    'vocabulary_id': vocabulary_id
+                })
+        return suggestions
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the run and the recent entries"""
+        with self._lock:
+            recent = sys.getsizeof(self._recent) + sum(
+                sys.getsizeof(entry) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+                for entry in self._recent)
+            return self._run.memory_bytes() + recent + sys.getsizeof(self._masked)
+
+# Shared by every VocabularyDAO in the process
+vocabulary_suggester = VocabularySuggester(
+    ttl=SEARCH_CONFIG['index_ttl'],
+    compact_threshold=SEARCH_CONFIG['suggest_compact_threshold']
+)
@@ -1,10 +1,17 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from backend.dao.base_dao import BaseDAO
+from backend.dao.content_versions import ContentVersions, TOPIC_LIST, content_versions
 from backend.dao.vocabulary_topics.vocabulary_topic_entity import VocabularyTopicEntity
+from backend.utils.cache import ResultCache, result_cache
 
 class VocabularyTopicDAO(BaseDAO):
     """Data Access Object for vocabulary topic operations"""
     
+    def __init__(self, versions: ContentVersions = content_versions,
+                 cache: ResultCache = result_cache):
+        self.versions = versions
+        self.cache = cache
+        
     def get_all(self) -> List[VocabularyTopicEntity]:
         """Get all vocabulary topics"""
         query = "SELECT id, name, description FROM vocabulary_topics"
@@ -20,7 +27,25 @@ class VocabularyTopicDAO(BaseDAO):
     def create(self, name: str, description: str) -> int:
         """Create new vocabulary topic"""
         query = "INSERT INTO vocabulary_topics (name, description) VALUES (%s, %s)"
-        return self.insert(query, (name, description))
+        with self.get_cursor() as cursor:
+            cursor.execute(query, (name, description))
+            topic_id = cursor.lastrowid
+            self.versions.bump(cursor, topic_id, include_list=True)
+        self.versions.invalidate()
+        self.cache.invalidate('topics', f'topic:{topic_id}')
+        return topic_id
+        
+    def bulk_create(self, rows: List[Tuple[str, str]]) -> int:
+        """Create many (name, description) topics in one transaction"""
+        if not rows:
+            return 0
+        query = "INSERT INTO vocabulary_topics (name, description) VALUES (%s, %s)"
+        with self.get_cursor() as cursor:
+            cursor.executemany(query, rows)
+            self.versions.bump(cursor, TOPIC_LIST)
+        self.versions.invalidate()
+        self.cache.invalidate('topics')
+        return len(rows)
         
     def update(self, topic_id: int, name: str, description: str) -> bool:
         """Update vocabulary topic"""
@@ -29,9 +54,20 @@ class VocabularyTopicDAO(BaseDAO):
             SET name = %s, description = %s
             WHERE id = %s
         """
-        return self.execute(query, (name, description, topic_id))
+        return self._write_topic(topic_id, query, (name, description, topic_id))
         
     def delete(self, topic_id: int) -> bool:
         """Delete vocabulary topic"""
         query = "DELETE FROM vocabulary_topics WHERE id = %s"
-        return self.execute(query, (topic_id,)) 
\ No newline at end of file
+        return self._write_topic(topic_id, query, (topic_id,))
+        
+    def _write_topic(self, topic_id: int, query: str, params: tuple) -> bool:
+        """Run an UPDATE/DELETE on one topic and bump its version and the list's"""
+        with self.get_cursor() as cursor:
+            cursor.execute(query, params)
+            changed = cursor.rowcount > 0
+            if changed:
+                self.versions.bump(cursor, topic_id, include_list=True)
+        self.versions.invalidate()
+        self.cache.invalidate('topics', f'topic:{topic_id}')
+        return changed 
\ No newline at end of file
@@ -1,66 +1,241 @@
-import mysql.connector
-from mysql.connector import Error
-from typing import Optional
-
-class DatabaseConnection:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance.connection = None
-        return cls._instance
-    
-    def connect(self):
-        """Create database connection"""
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from backend.utils.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """A DB-API connection checked out from a ConnectionPool"""
+
+    def __init__(self, raw: Any, pool: 'ConnectionPool'):
+        self.raw = raw
+        self.pool = pool
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    def cursor(self, *args, **kwargs):
+        """Create a cursor on the underlying connection"""
+        return self.raw.cursor(*args, **kwargs)
+
+    def streaming_cursor(self):
+        """Create an unbuffered cursor on the underlying connection"""
+        return self.raw.streaming_cursor()
+
+    def commit(self) -> None:
+        """Commit the current transaction"""
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        """Roll back the current transaction"""
+        self.raw.rollback()
+
+    def close(self) -> None:
+        """Return the connection to its pool"""
+        self.pool.release(self)
+
+    def is_expired(self, max_uses: int, max_age: float) -> bool:
+        """Check whether the connection should be recycled"""
+        if max_uses and self.uses >= max_uses:
+            return True
+        if max_age and time.monotonic() - self.created_at >= max_age:
+            return True
+        return False
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections
+
+    Connections are created by ``creator`` on demand up to ``max_size``.
+    Borrowers wait up to ``timeout`` seconds for a free connection, every
+    connection is health-checked when it is borrowed, and connections are
+    recycled after ``recycle_uses`` checkouts or ``recycle_seconds`` of age.
+    """
+
+    def __init__(self, creator: Callable[[], Any], min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, recycle_uses: int = 0, recycle_seconds: float = 0,
+                 health_check: Optional[Callable[[Any], bool]] = None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.creator = creator
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_uses = recycle_uses
+        self.recycle_seconds = recycle_seconds
+        self.health_check = health_check or self._default_health_check
+
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._stats = {'checkouts': 0, 'timeouts': 0, 'recycled': 0, 'failed_checks': 0}
+
+    @staticmethod
+    def _default_health_check(raw: Any) -> bool:
+        """Ping the server with a trivial query"""
+        cursor = raw.cursor()
         try:
-            if self.connection is None:
-                self.connection = mysql.connector.connect(
-                    host='localhost',
-                    port=3306,
-                    user='root',
-                    password='12345678',
-                    database='vocabulary_learning'
-                )
-                print("Successfully connected to the database")
-        except Error as e:
-            print(f"Error connecting to MySQL Database: {e}")
-            raise
-    
-    def get_connection(self):
-        """Get the database connection"""
-        if self.connection is None:
-            self.connect()
-        return self.connection
-    
-    def close_connection(self):
-        """Close the database connection"""
-        if self.connection is not None:
-            self.connection.close()
-            self.connection = None
-            print("Database connection closed")
-    
-    def execute_query(self, query: str, params: tuple = None) -> Optional[list]:
-        """Execute a query and return results if any"""
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        finally:
+            cursor.close()
+
+    def fill(self) -> None:
+        """Open connections until the pool holds ``min_size`` of them"""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._create()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                self._idle.append(conn)
+                self._available.notify()
+
+    def _create(self) -> PooledConnection:
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-                
-            if query.lower().strip().startswith('select'):
-                result = cursor.fetchall()
-                return result
+            return PooledConnection(self.creator(), self)
+        except Exception as e:
+            logger.error("Failed to open database connection: %s", e)
+            raise DatabaseError(f"Failed to connect to database: {str(e)}")
+
+    def _discard(self, conn: PooledConnection) -> None:
+        try:
+            conn.raw.close()
+        except Exception as e:
+            logger.debug("Error closing pooled connection: %s", e)
+
+    def _is_usable(self, conn: PooledConnection) -> bool:
+        if conn.is_expired(self.recycle_uses, self.recycle_seconds):
+            with self._lock:
+                self._stats['recycled'] += 1
+            return False
+        try:
+            if self.health_check(conn.raw):
+                return True
+        except Exception as e:
+            logger.warning("Pooled connection failed health check: %s", e)
+        with self._lock:
+            self._stats['failed_checks'] += 1
+        return False
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Borrow a connection, waiting up to ``timeout`` seconds
+
+        Raises:
+            DatabaseError: If the pool is closed or no connection became available in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                conn = None
+                while conn is None:
+                    if self._closed:
+                        raise DatabaseError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats['timeouts'] += 1
+                            raise DatabaseError(
+                                f"Timed out after {timeout:.1f}s waiting for a database connection")
+                        self._waiting += 1
+                        try:
+                            self._available.wait(remaining)
+                        finally:
+                            self._waiting -= 1
+
+            if conn is None:
+                # A slot was reserved above; open the connection outside the lock
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                with self._lock:
+                    self._size -= 1
+                    self._available.notify()
+                continue
+
+            conn.uses += 1
+            with self._lock:
+                self._stats['checkouts'] += 1
+            return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        """Return a borrowed connection to the pool"""
+        try:
+            # Never hand a half-finished transaction (or its snapshot) to the next borrower
+            conn.rollback()
+            reusable = not conn.is_expired(self.recycle_uses, self.recycle_seconds)
+        except Exception as e:
+            logger.warning("Discarding pooled connection after failed rollback: %s", e)
+            reusable = False
+
+        with self._lock:
+            if reusable and not self._closed:
+                self._idle.append(conn)
             else:
-                connection.commit()
-                return None
-                
-        except Error as e:
-            print(f"Error executing query: {e}")
-            connection.rollback()
-            raise
+                self._size -= 1
+                if not self._closed:
+                    self._stats['recycled'] += 1
+            self._available.notify()
+        if not reusable or self._closed:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for the duration of a ``with`` block"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
         finally:
-            cursor.close() 
\ No newline at end of file
+            self.release(conn)
+
+    def dispose(self) -> None:
+        """Close all idle connections and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._available.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool gauges and counters"""
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                'max_size': self.max_size,
+                **self._stats
+            }
@@ -1,51 +1,106 @@
-import mysql.connector
+import threading
 import logging
-from mysql.connector import Error
-from typing import Any
-from backend.config.config import DB_CONFIG
+from contextlib import contextmanager
+from flask import g, has_app_context
+from backend.config.config import SQLALCHEMY_DATABASE_URL, POOL_CONFIG
+from backend.database.connection import ConnectionPool, PooledConnection
+from backend.database.engine import Engine
 from backend.utils.exceptions import DatabaseError
 
 logger = logging.getLogger(__name__)
 
-_db_connection = None
+_engine = None
+_engine_lock = threading.Lock()
 
-def get_db():
+def get_engine() -> Engine:
     """
-    Get database connection singleton
-    
+    Get the process-wide database engine, creating it on first use
+
     Returns:
-        Database connection object
-        
+        Engine for SQLALCHEMY_DATABASE_URL (MySQL or a local SQLite file)
+    """
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = Engine(SQLALCHEMY_DATABASE_URL, POOL_CONFIG)
+                logger.info("Created %s engine (pool min=%s, max=%s)", _engine.dialect,
+                            POOL_CONFIG['min_size'], POOL_CONFIG['max_size'])
+                try:
+                    _engine.pool.fill()
+                except DatabaseError as e:
+                    # Connections are still opened on demand once the database is up
+                    logger.warning("Could not open %s pooled connections up front: %s",
+                                   POOL_CONFIG['min_size'], e)
+    return _engine
+
+def set_engine(engine: Engine) -> None:
+    """Replace the process-wide engine, e.g. with a seeded SQLite database"""
+    global _engine
+
+    with _engine_lock:
+        previous, _engine = _engine, engine
+    if previous is not None and previous is not engine:
+        previous.dispose()
+
+def get_pool() -> ConnectionPool:
+    """
+    Get the connection pool of the process-wide engine
+
+    Returns:
+        ConnectionPool shared by all DAOs
+    """
+    return get_engine().pool
+
+def get_db() -> PooledConnection:
+    """
+    Get the connection bound to the current Flask app context
+
+    The connection is checked out from the pool on first use and returned
+    by ``close_request_connection`` when the app context tears down.
+
+    Returns:
+        Pooled database connection
+
     Raises:
-        DatabaseError: If connection fails
-    """
-    global _db_connection
-    
-    try:
-        logger.debug(f"Connecting to database with config: {DB_CONFIG}")
-        if _db_connection is None:
-            _db_connection = mysql.connector.connect(
-                host=DB_CONFIG['host'],
-                port=DB_CONFIG['port'],
-                user=DB_CONFIG['user'],
-                password=DB_CONFIG['password'],
-                database=DB_CONFIG['database']
-            )
-            
-        if not _db_connection.is_connected():
-            _db_connection.reconnect()
-            
-        logger.info("Database connection successful")
-        return _db_connection
-        
-    except Error as e:
-        logger.error(f"Failed to connect to database: {str(e)}")
-        raise DatabaseError(f"Failed to connect to database: {str(e)}")
-        
+        DatabaseError: If no connection can be obtained
+        RuntimeError: If called outside an app context
+    """
+    if 'db_connection' not in g:
+        g.db_connection = get_pool().acquire()
+    return g.db_connection
+
+@contextmanager
+def get_connection():
+    """
+    Borrow a database connection
+
+    Inside a Flask app context the request-scoped connection is reused;
+    elsewhere (CLI, scripts, background threads) a connection is checked
+    out for the duration of the ``with`` block.
+    """
+    if has_app_context():
+        yield get_db()
+    else:
+        with get_pool().connection() as connection:
+            yield connection
+
+def close_request_connection(exception=None) -> None:
+    """Return the app context's connection to the pool"""
+    connection = g.pop('db_connection', None)
+    if connection is not None:
+        connection.close()
+
+def init_app(app) -> None:
+    """Register per-request connection handling on a Flask app"""
+    app.teardown_appcontext(close_request_connection)
+
 def close_db() -> None:
-    """Close database connection"""
-    global _db_connection
-    
-    if _db_connection:
-        _db_connection.close()
-        _db_connection = None 
\ No newline at end of file
+    """Close all pooled connections"""
+    global _engine
+
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.dispose()
@@ -0,0 +1,251 @@
+import os
+import re
+import sqlite3
+import time
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from backend.database.connection import ConnectionPool
+from backend.database.query_stats import query_monitor
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'sqlite_schema.sql')
+
+# MySQL spellings that SQLite knows under another name
+_SQLITE_REWRITES = [
+    (re.compile(r'\bRAND\(\)', re.IGNORECASE), 'RANDOM()'),
+    (re.compile(r'\bNOW\(\)', re.IGNORECASE), 'CURRENT_TIMESTAMP'),
+    (re.compile(r'\bLEAST\(', re.IGNORECASE), 'MIN('),
+    (re.compile(r'\bGREATEST\(', re.IGNORECASE), 'MAX('),
+]
+
+def _register_sqlite_types() -> None:
+    """Make SQLite round-trip timestamps the way MySQL drivers do"""
+    sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+    sqlite3.register_converter(
+        'TIMESTAMP',
+        lambda value: datetime.fromisoformat(value.decode('utf-8').replace('T', ' ')[:19])
+    )
+
+class EngineCursor:
+    """DB-API cursor that compiles statements for the engine's dialect
+
+    Statements are timed and reported to the query monitor.
+    """
+
+    def __init__(self, cursor: Any, engine: 'Engine', connection: 'EngineConnection',
+                 streaming: bool = False):
+        self._cursor = cursor
+        self._engine = engine
+        self._connection = connection
+        self.streaming = streaming
+        # Where the rows fetched for the last statement are counted, when it is recorded
+        self._statement = None
+
+    def execute(self, query: str, params: Optional[tuple] = None):
+        """Execute a statement written with %s placeholders"""
+        sql = self._engine.compile(query)
+        if not query_monitor.enabled:
+            return self._cursor.execute(sql) if params is None else self._cursor.execute(sql, params)
+        started = time.perf_counter()
+        result = self._cursor.execute(sql) if params is None else self._cursor.execute(sql, params)
+        self._statement = query_monitor.record(self, query, sql, params, time.perf_counter() - started)
+        return result
+
+    def executemany(self, query: str, seq_of_params):
+        """Execute a statement once per parameter tuple"""
+        sql = self._engine.compile(query)
+        if not query_monitor.enabled:
+            return self._cursor.executemany(sql, seq_of_params)
+        started = time.perf_counter()
+        result = self._cursor.executemany(sql, seq_of_params)
+        self._statement = query_monitor.record(self, query, sql, None, time.perf_counter() - started)
+        return result
+
+    def explain(self, sql: str, params: Optional[tuple] = None) -> Optional[list]:
+        """Plan of a compiled SELECT, read on a cursor of its own; None if it cannot be explained"""
+        prefix = 'EXPLAIN QUERY PLAN ' if self._engine.is_sqlite else 'EXPLAIN '
+        cursor = self._connection.raw.cursor()
+        try:
+            if params is None:
+                cursor.execute(prefix + sql)
+            else:
+                cursor.execute(prefix + sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.debug("Could not explain statement: %s", e)
+            return None
+        finally:
+            cursor.close()
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._statement is not None:
+            self._statement.rows += 1
+        return row
+
+    def fetchmany(self, size: int = None):
+        rows = self._cursor.fetchmany() if size is None else self._cursor.fetchmany(size)
+        if self._statement is not None:
+            self._statement.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._statement is not None:
+            self._statement.rows += len(rows)
+        return rows
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+class EngineConnection:
+    """DB-API connection whose cursors go through the engine"""
+
+    def __init__(self, raw: Any, engine: 'Engine'):
+        self.raw = raw
+        self.engine = engine
+
+    def cursor(self, *args, **kwargs) -> EngineCursor:
+        return EngineCursor(self.raw.cursor(*args, **kwargs), self.engine, self)
+
+    def streaming_cursor(self) -> EngineCursor:
+        """Cursor that reads rows from the server as they are fetched"""
+        if self.engine.is_sqlite:
+            # sqlite3 cursors already step through a result lazily
+            return EngineCursor(self.raw.cursor(), self.engine, self, streaming=True)
+        from pymysql.cursors import SSCursor
+        return EngineCursor(self.raw.cursor(SSCursor), self.engine, self, streaming=True)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+class Engine:
+    """Database engine shared by every DAO
+
+    The database URL picks the dialect and DB-API driver through SQLAlchemy
+    (``mysql+pymysql://...`` in production, ``sqlite:///path.db`` for local
+    benchmarks and load tests). DAOs keep writing MySQL-flavoured SQL with
+    ``%s`` placeholders; ``compile`` translates each statement once for the
+    active dialect and caches the result.
+    """
+
+    def __init__(self, url: str, pool_config: Optional[Dict[str, Any]] = None):
+        self.url = make_url(url)
+        self.dialect = self.url.get_backend_name()
+
+        connect_args = {}
+        if self.dialect == 'sqlite':
+            _register_sqlite_types()
+            connect_args = {
+                'check_same_thread': False,
+                'timeout': 30,
+                'detect_types': sqlite3.PARSE_DECLTYPES
+            }
+        elif self.dialect != 'mysql':
+            raise ValueError(f"Unsupported database dialect: {self.dialect}")
+
+        self._sa_engine = create_engine(self.url, poolclass=NullPool, connect_args=connect_args)
+        self.compile = lru_cache(maxsize=1024)(self._compile)
+        self.pool = ConnectionPool(self._connect, **(pool_config or {}))
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.dialect == 'sqlite'
+
+    def _connect(self) -> EngineConnection:
+        raw = self._sa_engine.raw_connection()
+        if self.is_sqlite:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("PRAGMA foreign_keys = ON")
+                cursor.execute("PRAGMA journal_mode = WAL")
+            finally:
+                cursor.close()
+        return EngineConnection(raw, self)
+
+    def _compile(self, query: str) -> str:
+        """Translate a %s-style MySQL statement for this dialect"""
+        if not self.is_sqlite:
+            return query
+        sql = query.replace('%s', '?').replace('%%', '%')
+        for pattern, replacement in _SQLITE_REWRITES:
+            sql = pattern.sub(replacement, sql)
+        return sql
+
+    def upsert_clause(self, *keys: str) -> str:
+        """Conflict clause for an INSERT that updates the row matching ``keys``
+
+        Assignments that follow it refer to the existing row by bare column
+        name on both dialects.
+        """
+        if self.is_sqlite:
+            return f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET"
+        return "ON DUPLICATE KEY UPDATE"
+
+    def inserted(self, column: str) -> str:
+        """The value an upsert tried to insert into ``column``, for use in its assignments"""
+        if self.is_sqlite:
+            return f"excluded.{column}"
+        return f"VALUES({column})"
+
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a pooled connection for a ``with`` block"""
+        return self.pool.connection(timeout)
+
+    def create_schema(self) -> None:
+        """Create the application tables on a SQLite database
+
+        MySQL databases are provisioned from ``mysql.sql`` instead.
+        """
+        if not self.is_sqlite:
+            raise ValueError("create_schema() is only available for SQLite databases")
+        with open(SQLITE_SCHEMA_FILE, encoding='utf-8') as f:
+            script = f.read()
+        raw = self._sa_engine.raw_connection()
+        try:
+            raw.executescript(script)
+            raw.commit()
+        finally:
+            raw.close()
+        logger.info("Created SQLite schema at %s", self.url.database)
+
+    def dispose(self) -> None:
+        """Close every pooled connection"""
+        self.pool.dispose()
+        self._sa_engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool gauges plus statement cache counters"""
+        cache = self.compile.cache_info()
+        return {
+            'dialect': self.dialect,
+            'pool': self.pool.stats(),
+            'statement_cache': {'hits': cache.hits, 'misses': cache.misses, 'size': cache.currsize}
+        }
@@ -0,0 +1,202 @@
+import os
+import re
+import sys
+import time
+import random
+import logging
+import threading
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from flask import g, request
+from backend.config.config import QUERY_STATS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+# Frames in these files are plumbing; the caller is the first frame outside them
+_DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_PLUMBING_FILES = ('base_dao.py', 'unit_of_work.py', 'contextlib.py')
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    """Statement with literals and placeholder lists folded, so repeats of one query compare equal"""
+    sql = _WHITESPACE.sub(' ', query).strip()
+    sql = _LITERALS.sub('?', sql).replace('%s', '?')
+    return _VALUE_LISTS.sub('(...)', sql)
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_DATABASE_DIR) and not filename.endswith(_PLUMBING_FILES):
+            name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+            return f"{frame.f_globals.get('__name__')}.{name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return '?'
+
+class StatementStats:
+    """Executions of one statement fingerprint within a request"""
+
+    __slots__ = ('count', 'seconds', 'rows', 'caller')
+
+    def __init__(self, caller: str):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.caller = caller
+
+class RequestQueryStats:
+    """Statements run while serving one sampled request, grouped by fingerprint"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def add(self, query: str, seconds: float) -> StatementStats:
+        key = fingerprint(query)
+        statement = self.statements.get(key)
+        if statement is None:
+            statement = self.statements[key] = StatementStats(_caller())
+        statement.count += 1
+        statement.seconds += seconds
+        self.queries += 1
+        self.seconds += seconds
+        return statement
+
+    def summary(self, repeat_threshold: int) -> Dict[str, Any]:
+        repeated = [{
+            'statement': key,
+            'count': statement.count,
+            'db_ms': round(statement.seconds * 1000, 2),
+            'caller': statement.caller
+        } for key, statement in self.statements.items() if statement.count >= repeat_threshold]
+        return {
+            'queries': self.queries,
+            'distinct_queries': len(self.statements),
+            'db_ms': round(self.seconds * 1000, 2),
+            'rows': sum(statement.rows for statement in self.statements.values()),
+            'repeated': sorted(repeated, key=lambda item: -item['count'])
+        }
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar('query_stats', default=None)
+
+class QueryMonitor:
+    """Times every statement and records sampled requests statement by statement
+
+    Every statement is timed, and those slower than ``slow_query_ms`` are
+    logged with their caller and, for SELECTs, the plan from EXPLAIN.
+    A ``sample_rate`` share of requests also records each statement's
+    fingerprint, duration, rows and caller; their summary lands on
+    ``g.query_stats``, in a Server-Timing header and in the log, with
+    statements run ``repeat_threshold`` times or more flagged as a likely
+    N+1. Unsampled requests cost a context variable lookup per statement.
+    """
+
+    def __init__(self, enabled: bool = True, sample_rate: float = 0.05, slow_query_ms: float = 200,
+                 explain_slow: bool = True, explain_interval: float = 300, repeat_threshold: int = 5):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_query_ms / 1000
+        self.explain_slow = explain_slow
+        self.explain_interval = explain_interval
+        self.repeat_threshold = repeat_threshold
+        self._explained: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sampled_requests = 0
+        self._flagged_requests = 0
+        self._slow_statements = 0
+
+    def begin_request(self) -> None:
+        """Start recording the current request if it is sampled"""
+        if self.enabled and random.random() < self.sample_rate:
+            _current.set(RequestQueryStats())
+
+    def end_request(self) -> Optional[Dict[str, Any]]:
+        """Stop recording and return the request's summary, if it was sampled"""
+        stats = _current.get()
+        if stats is None:
+            return None
+        _current.set(None)
+        summary = stats.summary(self.repeat_threshold)
+        with self._lock:
+            self._sampled_requests += 1
+            if summary['repeated']:
+                self._flagged_requests += 1
+        return summary
+
+    def record(self, cursor, query: str, sql: str, params, seconds: float) -> Optional[StatementStats]:
+        """Account for one executed statement; returns where to count its fetched rows"""
+        if seconds >= self.slow_seconds:
+            self._log_slow(cursor, query, sql, params, seconds)
+        stats = _current.get()
+        if stats is None:
+            return None
+        statement = stats.add(query, seconds)
+        if not _is_select(sql) and cursor.rowcount > 0:
+            statement.rows += cursor.rowcount
+        return statement
+
+    def _log_slow(self, cursor, query: str, sql: str, params, seconds: float) -> None:
+        key = fingerprint(query)
+        with self._lock:
+            self._slow_statements += 1
+            now = time.monotonic()
+            explain = (self.explain_slow and not cursor.streaming and _is_select(sql)
+                       and now - self._explained.get(key, -self.explain_interval) >= self.explain_interval)
+            if explain:
+                self._explained[key] = now
+        plan = cursor.explain(sql, params) if explain else None
+        logger.warning("Slow query (%.1f ms) from %s: %s%s", seconds * 1000, _caller(), key,
+                       f"\nEXPLAIN: {plan}" if plan is not None else "")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_rate': self.sample_rate,
+                'sampled_requests': self._sampled_requests,
+                'repeat_flagged_requests': self._flagged_requests,
+                'slow_statements': self._slow_statements
+            }
+
+def _is_select(sql: str) -> bool:
+    return sql.lstrip()[:6].upper() == 'SELECT'
+
+# Shared by every engine cursor in the process
+query_monitor = QueryMonitor(**QUERY_STATS_CONFIG)
+
+def _begin_request() -> None:
+    query_monitor.begin_request()
+
+def _end_request(response):
+    summary = query_monitor.end_request()
+    if summary is None:
+        return response
+    g.query_stats = summary
+    response.headers['Server-Timing'] = f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"'
+    if summary['repeated']:
+        logger.warning("%s %s ran %s queries in %.1f ms; likely N+1: %s", request.method, request.path,
+                       summary['queries'], summary['db_ms'],
+                       '; '.join(f"{item['count']}x {item['statement']} from {item['caller']}"
+                                 for item in summary['repeated']))
+    else:
+        logger.info("%s %s ran %s queries in %.1f ms", request.method, request.path,
+                    summary['queries'], summary['db_ms'])
+    return response
+
+def _discard_request(exception=None) -> None:
+    # Requests that failed before after_request still must not leak into the next one
+    _current.set(None)
+
+def init_app(app) -> None:
+    """Record query statistics for a share of an app's requests"""
+    if not query_monitor.enabled:
+        return
+    app.before_request(_begin_request)
+    app.after_request(_end_request)
+    app.teardown_request(_discard_request)
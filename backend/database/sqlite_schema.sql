@@ -0,0 +1,91 @@
+-- SQLite stand-in for the schema in mysql.sql, used for local benchmarks and load tests.
+-- Keep column order identical to mysql.sql: several DAOs read rows with SELECT *.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS vocabulary_topics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS vocabularies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic_id INT NOT NULL REFERENCES vocabulary_topics(id),
+    word VARCHAR(255) NOT NULL,
+    meaning TEXT NOT NULL,
+    phonetic VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic_id INT NOT NULL REFERENCES vocabulary_topics(id),
+    question TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    option1 TEXT NOT NULL,
+    option2 TEXT NOT NULL,
+    option3 TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS test_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(id),
+    topic_id INT NOT NULL REFERENCES vocabulary_topics(id),
+    score INT NOT NULL,
+    completion_time INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS leaderboards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL REFERENCES users(id),
+    topic_id INT NOT NULL REFERENCES vocabulary_topics(id),
+    total_score INT NOT NULL DEFAULT 0,
+    tests_completed INT NOT NULL DEFAULT 0,
+    average_score FLOAT NOT NULL DEFAULT 0,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, topic_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    tests_taken INT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_min INT,
+    score_max INT,
+    completion_time_sum BIGINT NOT NULL DEFAULT 0,
+    last_attempt_at TIMESTAMP NULL
+);
+
+CREATE TABLE IF NOT EXISTS topic_stats (
+    topic_id INTEGER PRIMARY KEY REFERENCES vocabulary_topics(id),
+    tests_taken INT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_min INT,
+    score_max INT,
+    completion_time_sum BIGINT NOT NULL DEFAULT 0,
+    last_attempt_at TIMESTAMP NULL
+);
+
+CREATE TABLE IF NOT EXISTS content_versions (
+    topic_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_vocab_topic ON vocabularies (topic_id);
+CREATE INDEX IF NOT EXISTS idx_test_topic ON tests (topic_id);
+CREATE INDEX IF NOT EXISTS idx_result_user ON test_results (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_result_topic ON test_results (topic_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_result_user_topic ON test_results (user_id, topic_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_topic_score ON leaderboards (topic_id, average_score, id);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_score ON leaderboards (total_score DESC);
@@ -57,48 +57,58 @@ CREATE TABLE IF NOT EXISTS leaderboards (
     topic_id INT NOT NULL,
     total_score INT NOT NULL DEFAULT 0,
     tests_completed INT NOT NULL DEFAULT 0,
-    average_score FLOAT NOT NULL DEFAULT 0,
+    average_score DOUBLE NOT NULL DEFAULT 0,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     UNIQUE KEY unique_user_topic (user_id, topic_id),
     FOREIGN KEY (user_id) REFERENCES users(id),
     FOREIGN KEY (topic_id) REFERENCES vocabulary_topics(id)
 );
 
+-- Rollups of test_results, maintained by TestResultDAO.create
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INT PRIMARY KEY,
+    tests_taken INT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_min INT,
+    score_max INT,
+    completion_time_sum BIGINT NOT NULL DEFAULT 0,
+    last_attempt_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS topic_stats (
+    topic_id INT PRIMARY KEY,
+    tests_taken INT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_min INT,
+    score_max INT,
+    completion_time_sum BIGINT NOT NULL DEFAULT 0,
+    last_attempt_at TIMESTAMP NULL,
+    FOREIGN KEY (topic_id) REFERENCES vocabulary_topics(id)
+);
+
+-- Content version counters behind the ETags of topic/vocabulary/test reads.
+-- Bumped by the vocabulary, test and topic DAO writes; topic_id 0 is the topic list.
+CREATE TABLE IF NOT EXISTS content_versions (
+    topic_id INT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Add indexes for better query performance
 ALTER TABLE vocabularies ADD INDEX idx_vocab_topic (topic_id);
 ALTER TABLE tests ADD INDEX idx_test_topic (topic_id);
-ALTER TABLE test_results ADD INDEX idx_result_user (user_id);
-ALTER TABLE test_results ADD INDEX idx_result_topic (topic_id);
-ALTER TABLE leaderboards ADD INDEX idx_leaderboard_topic (topic_id);
+-- Result and leaderboard listings are paged on (created_at, id) and (average_score, id)
+ALTER TABLE test_results ADD INDEX idx_result_user (user_id, created_at, id);
+ALTER TABLE test_results ADD INDEX idx_result_topic (topic_id, created_at, id);
+ALTER TABLE test_results ADD INDEX idx_result_user_topic (user_id, topic_id, created_at, id);
+ALTER TABLE leaderboards ADD INDEX idx_leaderboard_topic_score (topic_id, average_score, id);
 ALTER TABLE leaderboards ADD INDEX idx_leaderboard_score (total_score DESC);
 
--- Drop existing trigger if exists
+-- Leaderboard entries are upserted by LeaderboardDAO.record_score in the
+-- submission transaction; drop the old trigger that re-aggregated them
 DROP TRIGGER IF EXISTS update_leaderboard_after_test;
 
--- Create trigger for updating leaderboard
-DELIMITER //
-
-CREATE TRIGGER update_leaderboard_after_test
-AFTER INSERT ON test_results
-FOR EACH ROW
-BEGIN
-    INSERT INTO leaderboards (user_id, topic_id, total_score, tests_completed, average_score)
-    SELECT 
-        NEW.user_id,
-        NEW.topic_id,
-        SUM(score),
-        COUNT(*),
-        AVG(score)
-    FROM test_results
-    WHERE user_id = NEW.user_id AND topic_id = NEW.topic_id
-    ON DUPLICATE KEY UPDATE
-        total_score = VALUES(total_score),
-        tests_completed = VALUES(tests_completed),
-        average_score = VALUES(average_score);
-END //
-
-DELIMITER ;
-
 -- Insert sample users
 INSERT INTO users (username, password, email) VALUES
 ('john_doe', '$2a$10$xP1XhU7KFVrqFX8JbHkKX.u7vE9iVYQXbHp3DhHYgcHAEZrCTivXi', 'john@example.com'),
@@ -218,4 +228,26 @@ INSERT INTO test_results (user_id, topic_id, score, completion_time) VALUES
 (1, 2, 85, 320),
 (2, 1, 95, 280),
 (2, 2, 88, 310),
-(3, 1, 92, 290);
\ No newline at end of file
+(3, 1, 92, 290);
+
+-- Seed the rollups and leaderboard entries from the sample results
+INSERT INTO user_stats (user_id, tests_taken, score_sum, score_min, score_max, completion_time_sum, last_attempt_at)
+SELECT user_id, COUNT(*), SUM(score), MIN(score), MAX(score), SUM(completion_time), MAX(created_at)
+FROM test_results
+GROUP BY user_id;
+
+INSERT INTO topic_stats (topic_id, tests_taken, score_sum, score_min, score_max, completion_time_sum, last_attempt_at)
+SELECT topic_id, COUNT(*), SUM(score), MIN(score), MAX(score), SUM(completion_time), MAX(created_at)
+FROM test_results
+GROUP BY topic_id;
+
+INSERT INTO leaderboards (user_id, topic_id, total_score, tests_completed, average_score, last_updated)
+SELECT user_id, topic_id, SUM(score), COUNT(*), AVG(score), MAX(created_at)
+FROM test_results
+GROUP BY user_id, topic_id;
+
+-- Seed the content versions of the sample topics and of the topic list
+INSERT INTO content_versions (topic_id, version, updated_at)
+SELECT id, 1, NOW() FROM vocabulary_topics
+UNION ALL
+SELECT 0, 1, NOW();
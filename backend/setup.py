@@ -8,6 +8,7 @@ setup(
         'flask',
         'flask-cors',
         'pymysql',
+        'sqlalchemy',
         'python-dotenv',
         'bcrypt'
     ]
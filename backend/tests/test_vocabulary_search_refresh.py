@@ -0,0 +1,77 @@
+"""Writes and imports that land while the vocabulary search index is being rebuilt
+
+    pytest backend/tests
+"""
+import threading
+import time
+import pytest
+from backend.business_layer.services.content_import_service import ContentImportService
+from backend.dao.content_versions import ContentVersions
+from backend.dao.tests.test_dao import TestDAO as QuestionDAO  # not a pytest class
+from backend.dao.vocabularies.vocabulary_dao import VocabularyDAO
+from backend.dao.vocabularies.vocabulary_search_index import VocabularySearchIndex
+from backend.dao.vocabularies.vocabulary_suggester import VocabularySuggester
+from backend.dao.vocabulary_topics.vocabulary_topic_dao import VocabularyTopicDAO
+from backend.database.database import get_engine, set_engine
+from backend.database.engine import Engine
+from backend.utils.cache import ResultCache
+
+class HeldRefreshDAO(VocabularyDAO):
+    """Holds the next index rebuild between reading the rows and swapping them in"""
+
+    def __init__(self):
+        super().__init__(ContentVersions(), ResultCache(), VocabularySearchIndex(), VocabularySuggester())
+        self.read = threading.Event()
+        self.release = threading.Event()
+        self.hold = False
+
+    def fetch_all(self, query, params=None):
+        rows = super().fetch_all(query, params)
+        if self.hold and query.startswith("SELECT * FROM vocabularies"):
+            self.hold = False
+            self.read.set()
+            assert self.release.wait(5)
+        return rows
+
+    def refresh_held(self):
+        """Start a background refresh and return once it has read the rows"""
+        self.hold = True
+        self.refresh_search_index()
+        assert self.read.wait(5)
+
+@pytest.fixture
+def dao(tmp_path):
+    set_engine(Engine(f"sqlite:///{tmp_path / 'vocab.db'}"))
+    get_engine().create_schema()
+    VocabularyTopicDAO().bulk_create([('Animals', 'Words for animals')])
+    dao = HeldRefreshDAO()
+    dao.rebuild_search_index()
+    yield dao
+    dao.release.set()
+    get_engine().dispose()
+
+def searchable(dao, word, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not dao._refreshing and any(vocabulary.word == word for vocabulary, _ in dao.search_ranked(word)):
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_import_during_refresh_becomes_searchable(dao):
+    dao.refresh_held()
+    service = ContentImportService(VocabularyTopicDAO(), dao, QuestionDAO())
+    report = service.import_records('vocabularies', [
+        (1, {'topic_id': '1', 'word': 'otter', 'meaning': 'rái cá'}),
+        (2, {'topic_id': '1', 'word': 'heron', 'meaning': 'con diệc'})
+    ])
+    assert report.inserted == 2
+    dao.release.set()
+    assert searchable(dao, 'otter')
+    assert searchable(dao, 'heron')
+
+def test_create_during_refresh_stays_searchable(dao):
+    dao.refresh_held()
+    dao.create_vocabulary(1, 'badger', 'con lửng', None)
+    dao.release.set()
+    assert searchable(dao, 'badger')
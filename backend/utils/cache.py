@@ -0,0 +1,279 @@
+import inspect
+import logging
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from backend.config.config import CACHE_CONFIG
+from backend.utils.resp_client import RespClient
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """In-process store: size-bounded LRU with per-entry expiry
+
+    Tag version counters live apart from the entries so LRU eviction can
+    never reset one.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                counter = self._counters.get(key)
+                if counter is not None:
+                    values.append(counter)
+                    continue
+                entry = self._entries.get(key)
+                if entry is None:
+                    values.append(None)
+                elif entry[0] <= now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+        return values
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def init_counter(self, key: str, value: int) -> None:
+        with self._lock:
+            self._counters.setdefault(key, value)
+
+    def incr(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'tags': len(self._counters),
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+class RedisBackend:
+    """Store shared by every worker through a Redis-protocol server
+
+    Expiry and eviction are left to the server (``maxmemory-policy
+    allkeys-lru`` gives the same LRU behaviour as the memory backend).
+    """
+
+    name = 'redis'
+
+    def __init__(self, client: RespClient, prefix: str = 'vocab:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self.client.mget(*[self.prefix + key for key in keys])
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+
+    def init_counter(self, key: str, value: int) -> None:
+        self.client.set(self.prefix + key, value, nx=True)
+
+    def incr(self, key: str) -> None:
+        self.client.incr(self.prefix + key)
+
+    def clear(self) -> None:
+        # Only this cache's keys: the database may be shared with other prefixes
+        pattern = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix) + '*'
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor, match=pattern, count=1000)
+            if keys:
+                self.client.delete(*keys)
+            if cursor == 0:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {'url': f"redis://{self.client.host}:{self.client.port}/{self.client.db}"}
+
+class ResultCache:
+    """Read-through cache of service results with tag-based invalidation
+
+    Each entry records the version of every tag it depends on (for example
+    ``topic:5``); ``invalidate`` bumps tag versions, which makes every entry
+    stored under the old versions a miss. Values are pickled so callers
+    always get their own copy, whichever backend is used. Backend errors
+    are logged and treated as misses, and reads skip the backend for
+    ``retry_interval`` seconds afterwards, so a cache outage never fails
+    or stalls a request.
+    """
+
+    def __init__(self, backend=None, default_ttl: float = 300, retry_interval: float = 5):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.retry_interval = retry_interval
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._invalidations = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return 'tag:' + tag
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _failed(self, action: str, key: str, error: Exception) -> None:
+        self._count('_errors')
+        self._down_until = time.monotonic() + self.retry_interval
+        logger.warning("Result cache %s failed for %s: %s", action, key, error)
+
+    def get_or_load(self, key: str, tags: Iterable[str], loader: Callable[[], Any],
+                    ttl: Optional[float] = None) -> Any:
+        """Cached value of ``key``, or ``loader()`` stored under the current tag versions"""
+        if self.backend is None or time.monotonic() < self._down_until:
+            return loader()
+
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            values = self.backend.get_many(['entry:' + key] + tag_keys)
+            entry, versions = values[0], values[1:]
+            if None in versions:
+                # First use of a tag: start its counter at an arbitrary value so an
+                # evicted counter can never come back at a version seen before
+                for tag_key, version in zip(tag_keys, versions):
+                    if version is None:
+                        self.backend.init_counter(tag_key, time.time_ns())
+                versions = self.backend.get_many(tag_keys)
+            versions = tuple(int(version) for version in versions)
+            if entry is not None:
+                stored_versions, value = pickle.loads(entry)
+                if stored_versions == versions:
+                    self._count('_hits')
+                    return value
+                self._count('_stale')
+        except Exception as e:
+            self._failed('read', key, e)
+            return loader()
+
+        self._count('_misses')
+        value = loader()
+        if value is not None:
+            try:
+                data = pickle.dumps((versions, value), protocol=pickle.HIGHEST_PROTOCOL)
+                self.backend.set('entry:' + key, data, ttl or self.default_ttl)
+            except Exception as e:
+                self._failed('write', key, e)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry that depends on any of the tags"""
+        if self.backend is None:
+            return
+        for tag in tags:
+            try:
+                self.backend.incr(self._tag_key(tag))
+                self._count('_invalidations')
+            except Exception as e:
+                self._count('_errors')
+                logger.error("Result cache invalidation of %s failed: %s", tag, e)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                'backend': self.backend.name if self.backend else None,
+                'hits': self._hits,
+                'misses': self._misses,
+                'stale': self._stale,
+                'invalidations': self._invalidations,
+                'errors': self._errors
+            }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+def cached(tags: Sequence[str] = (), ttl: Optional[float] = None):
+    """
+    Cache a service read method in ``self.cache``
+
+    The key is the method's qualified name plus its bound arguments; tags
+    are format strings over the argument names, e.g. ``'topic:{topic_id}'``.
+    None results are not cached.
+
+    Args:
+        tags: Invalidation tags of the result
+        ttl: Seconds to keep the result; defaults to the cache's default TTL
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: ResultCache = self.cache
+            if not cache.enabled:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self')
+            key = f"{method.__qualname__}({', '.join(f'{v!r}' for v in arguments.values())})"
+            return cache.get_or_load(
+                key,
+                [tag.format(**arguments) for tag in tags],
+                lambda: method(self, *args, **kwargs),
+                ttl
+            )
+        return wrapper
+    return decorator
+
+def create_result_cache(config: Dict[str, Any] = CACHE_CONFIG) -> ResultCache:
+    """Build the result cache selected by CACHE_BACKEND (memory, redis or none)"""
+    backend_name = config['backend']
+    if backend_name == 'memory':
+        backend = MemoryBackend(config['max_entries'])
+    elif backend_name == 'redis':
+        backend = RedisBackend(RespClient(config['redis_url'], config['redis_timeout']), config['prefix'])
+    elif backend_name == 'none':
+        backend = None
+    else:
+        raise ValueError(f"Unknown cache backend: {backend_name}")
+    return ResultCache(backend, config['default_ttl'], config['retry_interval'])
+
+result_cache = create_result_cache()
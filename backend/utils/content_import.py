@@ -0,0 +1,86 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+from backend.utils.exceptions import ValidationError
+
+IMPORT_KINDS = ('topics', 'vocabularies', 'tests')
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Open import files with this error handler: bytes that are not UTF-8 then
+# reach read_records as lone surrogates, and only their line is rejected
+DECODE_ERRORS = 'surrogateescape'
+
+# (line number, record); the record is None when the line could not be decoded or parsed
+ImportRecord = Tuple[int, Optional[Dict]]
+
+@dataclass
+class ImportReport:
+    """Progress and outcome of one content import"""
+    kind: str
+    dry_run: bool = False
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[Dict] = field(default_factory=list)
+
+    def reject(self, line: int, message: str, max_errors: int) -> None:
+        """Count a rejected record, keeping the first ``max_errors`` reasons"""
+        self.rejected += 1
+        if len(self.errors) < max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'dry_run': self.dry_run,
+            'read': self.read,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.read / self.seconds) if self.seconds else None,
+            'errors': self.errors
+        }
+
+def import_format(fmt: Optional[str], filename: Optional[str] = None) -> str:
+    """Validated import format, guessed from the file extension when not given"""
+    if not fmt and filename:
+        fmt = 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+    fmt = (fmt or 'ndjson').lower()
+    if fmt not in IMPORT_FORMATS:
+        raise ValidationError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    return fmt
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[ImportRecord]:
+    """Records of a CSV file with a header row, or of an NDJSON file, one at a time"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            decoded = all(_decoded(value) for value in record.values() if isinstance(value, str))
+            yield reader.line_num, record if decoded else None
+        return
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not _decoded(line):
+            yield line_number, None
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+def _decoded(text: str) -> bool:
+    """False when ``text`` holds bytes that were not valid UTF-8"""
+    try:
+        text.encode('utf-8')
+        return True
+    except UnicodeEncodeError:
+        return False
@@ -0,0 +1,156 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+import bcrypt
+from backend.config.config import HASHER_CONFIG
+from backend.utils.exceptions import CapacityError
+
+logger = logging.getLogger(__name__)
+
+def _hash_password(password: str, rounds: int) -> Tuple[str, float]:
+    """Hash a password; returns the hash and the seconds spent hashing"""
+    started = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds, prefix=b'2a'))
+    return hashed.decode('utf-8'), time.perf_counter() - started
+
+def _check_password(password: str, hashed: str) -> Tuple[bool, float]:
+    """Check a password against a hash; returns the result and the seconds spent"""
+    started = time.perf_counter()
+    try:
+        result = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        result = False
+    return result, time.perf_counter() - started
+
+class CredentialHasher:
+    """Runs bcrypt off the request threads with bounded admission
+
+    Hashing happens in a pool of ``workers`` processes so a burst of logins
+    cannot hold the GIL or every request thread. At most ``max_pending``
+    operations are admitted at once; beyond that callers get a
+    CapacityError straight away instead of queueing behind the burst.
+    ``workers=0`` hashes inline on the calling thread, for scripts and CLI
+    commands.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float = 10.0,
+                 rounds: int = 10, retry_after: int = 1):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rounds = rounds
+        self.retry_after = retry_after
+        self._admission = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hash_total = 0.0
+        self._hash_max = 0.0
+
+    def hash(self, password: str) -> str:
+        """Hash a password with bcrypt"""
+        return self._run(_hash_password, password, self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Check a password against a stored bcrypt hash"""
+        if not password or not hashed:
+            return False
+        return self._run(_check_password, password, hashed)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    logger.info("Started credential hasher with %s worker processes", self.workers)
+        return self._executor
+
+    def _run(self, func: Callable, *args) -> Any:
+        if not self._admission.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            logger.warning("Credential hasher saturated (%s pending)", self.max_pending)
+            raise CapacityError('Too many sign-in requests, please retry shortly',
+                                retry_after=self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                result, hash_seconds = func(*args)
+            else:
+                future = self._get_executor().submit(func, *args)
+                try:
+                    result, hash_seconds = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    with self._lock:
+                        self._timeouts += 1
+                    logger.warning("Credential hash timed out after %ss", self.timeout)
+                    raise CapacityError('Sign-in timed out, please retry shortly',
+                                        retry_after=self.retry_after)
+                except BrokenProcessPool:
+                    # A worker died; start a fresh pool on the next call
+                    logger.error("Credential hasher worker pool broke, restarting it")
+                    self.shutdown()
+                    raise
+            self._record(time.perf_counter() - started - hash_seconds, hash_seconds)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._admission.release()
+
+    def _record(self, wait_seconds: float, hash_seconds: float) -> None:
+        wait_seconds = max(wait_seconds, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait_seconds
+            self._wait_max = max(self._wait_max, wait_seconds)
+            self._hash_total += hash_seconds
+            self._hash_max = max(self._hash_max, hash_seconds)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Admission counters and wait/hash timings in seconds"""
+        with self._lock:
+            completed = self._completed
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'completed': completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'wait_seconds_avg': self._wait_total / completed if completed else 0.0,
+                'wait_seconds_max': self._wait_max,
+                'hash_seconds_avg': self._hash_total / completed if completed else 0.0,
+                'hash_seconds_max': self._hash_max
+            }
+
+credential_hasher = CredentialHasher(
+    workers=HASHER_CONFIG['workers'],
+    max_pending=HASHER_CONFIG['max_pending'],
+    timeout=HASHER_CONFIG['timeout'],
+    rounds=HASHER_CONFIG['rounds']
+)
+atexit.register(credential_hasher.shutdown)
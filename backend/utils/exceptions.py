@@ -47,4 +47,10 @@ class ConfigurationError(BaseError):
 class ExternalServiceError(BaseError):
     """Raised when an external service call fails."""
     def __init__(self, message: str = "External service error"):
+        super().__init__(message)
+
+class CapacityError(BaseError):
+    """Raised when a bounded resource is saturated and the caller should retry later."""
+    def __init__(self, message: str = "Service is busy", retry_after: int = 1):
+        self.retry_after = retry_after
         super().__init__(message) 
\ No newline at end of file
@@ -1,72 +1,173 @@
+import atexit
+import itertools
+import json
 import logging
 import logging.handlers
 import os
-from typing import Optional
-from datetime import datetime
+import queue
+import threading
+from typing import Dict, Optional
 
 from backend.config import LOG_CONFIG
 
-def setup_logger(name: str, log_file: Optional[str] = None,
-                level: str = LOG_CONFIG['level']) -> logging.Logger:
-    """Sets up a logger with console and file handlers."""
-    # Create logger
+# Loggers that get the queue handler; everything else propagates into them
+APP_LOGGER_NAMES = ('backend', 'vocabulary_app')
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+FILE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s'
+
+_queue: 'queue.SimpleQueue' = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records below WARNING for the configured logger prefixes"""
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = rates
+        self._rate_by_name: Dict[str, int] = {}
+        self._counters: Dict[str, itertools.count] = {}
+
+    def _rate_for(self, name: str) -> int:
+        rate = self._rate_by_name.get(name)
+        if rate is None:
+            matches = [prefix for prefix in self.rates
+                       if name == prefix or name.startswith(prefix + '.')]
+            rate = self.rates[max(matches, key=len)] if matches else 1
+            self._rate_by_name[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate_for(record.name)
+        if rate <= 1:
+            return True
+        counter = self._counters.setdefault(record.name, itertools.count())
+        return next(counter) % rate == 0
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps the exception text separate from the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _make_formatter(default_format: str) -> logging.Formatter:
+    if LOG_CONFIG['format'] == 'json':
+        return JsonFormatter()
+    return logging.Formatter(default_format)
+
+def configure_logging() -> None:
+    """Route application loggers through a background queue listener
+
+    Callers only pay for the level check and for putting the record on a
+    queue; formatting and console/file I/O happen on the listener thread.
+    Safe to call more than once.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(_make_formatter(TEXT_FORMAT))
+        handlers = [console_handler]
+
+        log_file = LOG_CONFIG.get('file')
+        if log_file:
+            # Create logs directory if it doesn't exist
+            log_dir = os.path.dirname(log_file)
+            if log_dir and not os.path.exists(log_dir):
+                os.makedirs(log_dir)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=10*1024*1024,  # 10MB
+                backupCount=5
+            )
+            file_handler.setFormatter(_make_formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+
+        queue_handler = _QueueHandler(_queue)
+        queue_handler.addFilter(SamplingFilter(LOG_CONFIG['sampling']))
+
+        for name in APP_LOGGER_NAMES:
+            app_logger = logging.getLogger(name)
+            app_logger.setLevel(LOG_CONFIG['level'].upper())
+            app_logger.addHandler(queue_handler)
+            app_logger.propagate = False
+
+        for name, level in LOG_CONFIG['levels'].items():
+            logging.getLogger(name).setLevel(level.upper())
+
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
+    """Gets a logger that writes through the shared logging pipeline."""
+    configure_logging()
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)  # Always set to DEBUG to capture all levels
-    
-    # Prevent adding duplicate handlers
-    if logger.handlers:
-        return logger
-    
-    # Create formatters
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(pathname)s:%(lineno)d - %(message)s'
-    )
-    
-    # Create console handler with DEBUG level
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
-    # Create file handler if log file is specified
-    if log_file:
-        # Create logs directory if it doesn't exist
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        # Create rotating file handler with DEBUG level
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-    
+    if level:
+        logger.setLevel(level.upper())
     return logger
 
 def log_function_call(logger: logging.Logger, func_name: str, args: tuple,
                      kwargs: dict) -> None:
     """Logs function call with arguments."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     args_str = ', '.join([str(arg) for arg in args])
     kwargs_str = ', '.join([f"{k}={v}" for k, v in kwargs.items()])
     params = f"{args_str}{', ' if args_str and kwargs_str else ''}{kwargs_str}"
-    logger.debug(f"Calling {func_name}({params})")
+    logger.debug("Calling %s(%s)", func_name, params)
 
 def log_function_result(logger: logging.Logger, func_name: str,
                        result: any) -> None:
     """Logs function result."""
-    logger.debug(f"{func_name} returned: {result}")
+    logger.debug("%s returned: %s", func_name, result)
 
 def log_exception(logger: logging.Logger, exc: Exception,
                  context: Optional[str] = None) -> None:
     """Logs exception with context."""
-    message = f"Exception occurred"
+    message = "Exception occurred"
     if context:
         message = f"{message} in {context}"
     logger.exception(message, exc_info=exc)
@@ -74,37 +175,37 @@ def log_exception(logger: logging.Logger, exc: Exception,
 def log_api_request(logger: logging.Logger, method: str, path: str,
                    params: dict, body: dict) -> None:
     """Logs API request details."""
-    logger.info(f"API Request: {method} {path}")
-    logger.debug(f"Parameters: {params}")
-    logger.debug(f"Body: {body}")
+    logger.info("API Request: %s %s", method, path)
+    logger.debug("Parameters: %s", params)
+    logger.debug("Body: %s", body)
 
 def log_api_response(logger: logging.Logger, status_code: int,
                     response_body: dict, duration: float) -> None:
     """Logs API response details."""
-    logger.info(f"API Response: {status_code} (took {duration:.2f}s)")
-    logger.debug(f"Response body: {response_body}")
+    logger.info("API Response: %s (took %.2fs)", status_code, duration)
+    logger.debug("Response body: %s", response_body)
 
 def log_database_query(logger: logging.Logger, query: str,
                       params: tuple) -> None:
     """Logs database query with parameters."""
-    logger.debug(f"Executing query: {query}")
-    logger.debug(f"Parameters: {params}")
+    logger.debug("Executing query: %s", query)
+    logger.debug("Parameters: %s", params)
 
 def log_authentication(logger: logging.Logger, user_id: int,
                       action: str) -> None:
     """Logs authentication events."""
-    logger.info(f"User {user_id}: {action}")
+    logger.info("User %s: %s", user_id, action)
 
 def log_error(logger: logging.Logger, message: str,
               error_code: Optional[str] = None) -> None:
     """Logs error with optional error code."""
     if error_code:
-        logger.error(f"[{error_code}] {message}")
+        logger.error("[%s] %s", error_code, message)
     else:
         logger.error(message)
 
 # Create and export loggers
-logger = setup_logger('vocabulary_app', LOG_CONFIG.get('file'))
+logger = setup_logger('vocabulary_app')
 api_logger = setup_logger('vocabulary_app.api')
 db_logger = setup_logger('vocabulary_app.database')
 auth_logger = setup_logger('vocabulary_app.auth')
@@ -112,4 +213,5 @@ auth_logger = setup_logger('vocabulary_app.auth')
 __all__ = ['logger', 'api_logger', 'db_logger', 'auth_logger',
            'log_function_call', 'log_function_result', 'log_exception',
            'log_api_request', 'log_api_response', 'log_database_query',
-           'log_authentication', 'log_error', 'setup_logger'] 
\ No newline at end of file
+           'log_authentication', 'log_error', 'setup_logger',
+           'configure_logging', 'shutdown_logging', 'JsonFormatter', 'SamplingFilter']
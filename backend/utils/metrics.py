@@ -0,0 +1,171 @@
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, doubling from 1 ms to about 33 s
+LATENCY_BUCKETS = tuple(0.001 * 2 ** i for i in range(16))
+
+# Upper bounds in bytes, quadrupling from 64 B to 16 MB
+SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(10))
+
+# (name, type, help, [(labels, value)]) as returned by a collector
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+class _Shard:
+    """Counters and histograms written by one thread"""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        # Per-bucket counts (the last one is +Inf) followed by the sum
+        self.histograms: Dict[Tuple[str, tuple], list] = {}
+
+    def merge(self, other: '_Shard') -> None:
+        for key, value in other.counters.copy().items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, series in other.histograms.copy().items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                self.histograms[key] = list(series)
+            else:
+                for i, value in enumerate(series):
+                    mine[i] += value
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class MetricsRegistry:
+    """Counters and histograms in Prometheus text format
+
+    Each thread writes to a shard of its own, so recording a sample takes
+    no lock; shards are merged when the registry is rendered. Shards of
+    threads that have exited are folded into one so thread-per-request
+    servers do not grow the registry. Gauges come from collectors, which
+    are called at render time.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._families: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        """Declare a counter"""
+        self._families[name] = ('counter', help_text, tuple(labels))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float],
+                  labels: Sequence[str] = ()) -> None:
+        """Declare a histogram with fixed bucket upper bounds"""
+        self._families[name] = ('histogram', help_text, tuple(labels))
+        self._buckets[name] = tuple(buckets)
+
+    def register_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """Add a function returning (name, type, help, samples) families at render time
+
+        Registering the same function again is a no-op, so apps created
+        more than once in a process do not render duplicate families.
+        """
+        with self._lock:
+            if collect not in self._collectors:
+                self._collectors.append(collect)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1) -> None:
+        """Add to a counter"""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()) -> None:
+        """Record one sample in a histogram"""
+        buckets = self._buckets[name]
+        histograms = self._shard().histograms
+        key = (name, labels)
+        series = histograms.get(key)
+        if series is None:
+            series = histograms[key] = [0] * (len(buckets) + 2)
+        series[bisect.bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self) -> _Shard:
+        """All shards merged into one"""
+        total = _Shard()
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._retired.merge(shard)
+            self._shards = live
+            total.merge(self._retired)
+        for _, shard in live:
+            total.merge(shard)
+        return total
+
+    def render(self) -> str:
+        """Every metric in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, (kind, help_text, label_names) in sorted(self._families.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (series_name, values), value in sorted(snapshot.counters.items()):
+                    if series_name == name:
+                        lines.append(f'{name}{_labels(label_names, values)} {_number(value)}')
+                continue
+            buckets = self._buckets[name]
+            for (series_name, values), series in sorted(snapshot.histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), series):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                    lines.append(f'{name}_bucket{_labels(label_names, values, le)} {cumulative}')
+                lines.append(f'{name}_sum{_labels(label_names, values)} {_number(series[-1])}')
+                lines.append(f'{name}_count{_labels(label_names, values)} {cumulative}')
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", getattr(collect, '__name__', collect), e)
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(list(labels), list(labels.values()))} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+# Shared by the whole process
+metrics = MetricsRegistry()
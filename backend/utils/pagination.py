@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+from backend.utils.exceptions import ValidationError
+
+T = TypeVar('T')
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing"""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+def _plain(value):
+    # Timestamps are compared as 'YYYY-MM-DD HH:MM:SS', the format the DAOs write
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+def encode_cursor(*values) -> str:
+    """Opaque token for the sort key of the last row of a page"""
+    raw = json.dumps([_plain(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token: Optional[str], *types: type) -> Optional[Tuple]:
+    """Sort key carried by a cursor token, or None for the first page
+
+    Raises:
+        ValidationError: If the token was not produced by encode_cursor for this listing
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, ValueError):
+        raise ValidationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValidationError("Invalid cursor")
+    try:
+        return tuple(kind(value) for kind, value in zip(types, values))
+    except (TypeError, ValueError):
+        raise ValidationError("Invalid cursor")
+
+def paginate(rows: Sequence[T], limit: int, sort_key: Callable[[T], Tuple]) -> Page[T]:
+    """Page of up to ``limit`` rows out of ``limit + 1`` fetched
+
+    The extra row only tells whether another page exists; the cursor points
+    at the last row returned.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*sort_key(items[-1])) if len(rows) > limit and items else None
+    return Page(items, next_cursor)
@@ -0,0 +1,236 @@
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from flask import g, request
+from backend.config.config import PROFILE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+
+# <started>-<pid>-<method>-<route>-<duration>ms.folded
+_PROFILE_NAME = re.compile(r'^(\d{8}T\d{9})-(\d+)-([A-Z]+)-(\w+)-(\d+)ms\.folded$')
+
+# Code object -> "module:qualified.name", filled as stacks are seen
+_frame_labels: Dict[Any, str] = {}
+
+def _collapse(frame) -> str:
+    """One stack as root-first, semicolon-separated function names"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        label = _frame_labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = _frame_labels[code] = f"{frame.f_globals.get('__name__', '?')}:{name}"
+        labels.append(label)
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+class StackSampler:
+    """Samples the stacks of registered threads from one background thread
+
+    The profiled code runs untouched: every ``interval`` seconds the
+    sampler reads the current frame of each registered thread and counts
+    the collapsed stack. The thread only runs while a request is being
+    profiled.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._targets: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int) -> Counter:
+        """Start sampling a thread; returns the stack counts it will fill"""
+        counts = Counter()
+        with self._lock:
+            self._targets[thread_id] = counts
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        return counts
+
+    def stop(self, thread_id: int) -> Counter:
+        """Stop sampling a thread and return its stack counts"""
+        with self._lock:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self) -> None:
+        try:
+            while True:
+                time.sleep(self.interval)
+                with self._lock:
+                    if not self._targets:
+                        return
+                    targets = list(self._targets.items())
+                frames = sys._current_frames()
+                for thread_id, counts in targets:
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[_collapse(frame)] += 1
+        except Exception:
+            logger.exception("Stack sampler stopped")
+        finally:
+            # Let the next start() launch a new sampler, even after a crash
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+class ProfileStore:
+    """Collapsed-stack profiles in a directory holding at most ``max_files``"""
+
+    def __init__(self, directory: str, max_files: int = 100):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, started: datetime, method: str, route: str, seconds: float, counts: Counter) -> str:
+        """Write one profile and delete the oldest beyond the limit; returns its name"""
+        slug = re.sub(r'\W+', '_', route).strip('_') or 'root'
+        name = (f"{started.strftime('%Y%m%dT%H%M%S')}{started.microsecond // 1000:03d}-{os.getpid()}"
+                f"-{method}-{slug}-{round(seconds * 1000)}ms.folded")
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(path + '.tmp', path)
+        self._trim()
+        return name
+
+    def _names(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.directory) if _PROFILE_NAME.match(name))
+        except FileNotFoundError:
+            return []
+
+    def _trim(self) -> None:
+        names = self._names()
+        for name in names[:max(len(names) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Another worker trimmed it first
+                pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first"""
+        profiles = []
+        for name in reversed(self._names()):
+            started, pid, method, route, duration = _PROFILE_NAME.match(name).groups()
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append({
+                'name': name,
+                'started_at': datetime.strptime(started[:15], '%Y%m%dT%H%M%S')
+                .replace(microsecond=int(started[15:]) * 1000).isoformat(),
+                'pid': int(pid),
+                'method': method,
+                'route': route,
+                'duration_ms': int(duration),
+                'size': size
+            })
+        return profiles
+
+    def path(self, name: str) -> Optional[str]:
+        """Path of a stored profile, or None for unknown or malformed names"""
+        if not _PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+class RequestProfiler:
+    """Decides which requests are profiled and stores their stacks
+
+    A request is profiled when it carries an ``X-Profile`` header of the
+    form ``<expires>.<signature>`` (see ``sign``), or when it is picked at
+    ``sample_rate``.
+    """
+
+    def __init__(self, enabled: bool = False, secret: str = '', sample_rate: float = 0,
+                 interval_ms: float = 5, directory: str = 'profiles', max_files: int = 100):
+        self.enabled = enabled
+        self.secret = secret.encode('utf-8')
+        self.sample_rate = sample_rate
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.store = ProfileStore(directory, max_files)
+
+    def _signature(self, expires: int) -> str:
+        return hmac.new(self.secret, str(expires).encode('ascii'), hashlib.sha256).hexdigest()
+
+    def sign(self, ttl: int = 900) -> str:
+        """X-Profile header value valid for ``ttl`` seconds"""
+        if not self.secret:
+            raise ValueError("PROFILE_SECRET is not set")
+        expires = int(time.time()) + ttl
+        return f"{expires}.{self._signature(expires)}"
+
+    def verify(self, value: str) -> bool:
+        """Whether an X-Profile header value is signed and not expired"""
+        if not self.secret:
+            return False
+        expires, _, signature = value.partition('.')
+        if not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(int(expires)))
+
+    def wanted(self, header: Optional[str]) -> bool:
+        if header is not None:
+            if self.verify(header):
+                return True
+            logger.warning("Ignoring invalid or expired %s header", PROFILE_HEADER)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+# Shared by the whole process
+request_profiler = RequestProfiler(**PROFILE_CONFIG)
+
+def _begin_request() -> None:
+    if request_profiler.wanted(request.headers.get(PROFILE_HEADER)):
+        g.profile_started = (datetime.now(), time.perf_counter())
+        request_profiler.sampler.start(threading.get_ident())
+
+def _end_request(response):
+    started = g.pop('profile_started', None)
+    if started is None:
+        return response
+    counts = request_profiler.sampler.stop(threading.get_ident())
+    seconds = time.perf_counter() - started[1]
+    if not counts:
+        logger.info("%s %s finished before its first stack sample", request.method, request.path)
+        return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    try:
+        name = request_profiler.store.save(started[0], request.method, route, seconds, counts)
+    except OSError as e:
+        logger.error("Could not save profile of %s %s: %s", request.method, request.path, e)
+        return response
+    response.headers['X-Profile-Id'] = name
+    logger.info("Profiled %s %s (%.1f ms, %s samples) as %s", request.method, request.path,
+                seconds * 1000, sum(counts.values()), name)
+    return response
+
+def _discard_request(exception=None) -> None:
+    # Requests that failed before after_request must not stay registered with the sampler
+    if g.pop('profile_started', None) is not None:
+        request_profiler.sampler.stop(threading.get_ident())
+
+def init_app(app) -> None:
+    """Profile an app's requests on demand; adds no hooks when profiling is disabled"""
+    if not request_profiler.enabled:
+        return
+    app.before_request(_begin_request)
+    app.after_request(_end_request)
+    app.teardown_request(_discard_request)
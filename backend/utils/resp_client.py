@@ -0,0 +1,132 @@
+import socket
+import threading
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+    pass
+
+class RespClient:
+    """Minimal client for servers speaking the Redis protocol (RESP2)
+
+    Only what the result cache needs: one command at a time per thread over
+    a persistent socket, reconnecting after a failure. Works with Redis,
+    Valkey, KeyDB or any local stand-in that implements the commands used.
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', timeout: float = 0.25):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile('rb')
+        try:
+            if self.password:
+                self._call('AUTH', self.password)
+            if self.db:
+                self._call('SELECT', self.db)
+        except BaseException:
+            # Never keep a connection that is unauthenticated or on the wrong database
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            self._local.sock = None
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+
+    def execute(self, *args) -> Any:
+        """Send one command and return its decoded reply"""
+        if getattr(self._local, 'sock', None) is None:
+            self._connect()
+        try:
+            return self._call(*args)
+        except (OSError, ConnectionError):
+            self.close()
+            raise
+
+    def _call(self, *args) -> Any:
+        self._local.sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._local.reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by server')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RespError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f'Unexpected reply: {line!r}')
+
+    # Commands
+    def ping(self) -> bool:
+        return self.execute('PING') == 'PONG'
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute('GET', key)
+
+    def mget(self, *keys: str) -> list:
+        return self.execute('MGET', *keys)
+
+    def set(self, key: str, value: Any, px: Optional[int] = None, nx: bool = False) -> bool:
+        args = ['SET', key, value]
+        if px:
+            args += ['PX', px]
+        if nx:
+            args.append('NX')
+        return self.execute(*args) == 'OK'
+
+    def incr(self, key: str) -> int:
+        return self.execute('INCR', key)
+
+    def delete(self, *keys: str) -> int:
+        return self.execute('DEL', *keys)
+
+    def scan(self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None) -> tuple:
+        """One SCAN step: (next cursor, keys); the cursor is 0 once the scan is complete"""
+        args = ['SCAN', cursor]
+        if match is not None:
+            args += ['MATCH', match]
+        if count:
+            args += ['COUNT', count]
+        cursor, keys = self.execute(*args)
+        return int(cursor), keys